@@ -1,5 +1,13 @@
+import os
+
 import reflex as rx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+from app.metrics import PROMETHEUS_CONTENT_TYPE, get_metrics
 from app.states.dspy_state import DSPyState
+from app.warmup import warm_up_on_startup
 from app.components.sidebar import sidebar
 from app.components.main_content import main_content
 
@@ -12,7 +20,32 @@ def index() -> rx.Component:
     )
 
 
+# Clients that may scrape /metrics unless TWEET_METRICS_PUBLIC is set.
+LOCAL_HOSTS = ("127.0.0.1", "::1", "localhost")
+
+
+def metrics_public() -> bool:
+    """Whether /metrics is served to any client (TWEET_METRICS_PUBLIC=1/true/yes)."""
+    return os.getenv("TWEET_METRICS_PUBLIC", "").strip().lower() in ("1", "true", "yes")
+
+
+async def metrics(request: Request) -> Response:
+    """
+    Prometheus scrape endpoint for LLM call latency, tokens and spend.
+
+    Spend is not for the public, so only local clients get it unless
+    TWEET_METRICS_PUBLIC is set; everyone else gets a 404.
+    """
+    client = request.client.host if request.client else None
+    if client not in LOCAL_HOSTS and not metrics_public():
+        return Response(status_code=404)
+    return Response(
+        get_metrics().render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE
+    )
+
+
 app = rx.App(
+    api_transformer=Starlette(routes=[Route("/metrics", metrics)]),
     theme=rx.theme(appearance="light"),
     head_components=[
         rx.el.link(rel="preconnect", href="https://fonts.googleapis.com"),
@@ -23,4 +56,5 @@ app = rx.App(
         ),
     ],
 )
-app.add_page(index)
\ No newline at end of file
+app.register_lifespan_task(warm_up_on_startup)
+app.add_page(index)
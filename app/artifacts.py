@@ -0,0 +1,138 @@
+import json
+import logging
+import os
+import re
+import time
+from typing import Any
+
+import dspy
+
+DEFAULT_ARTIFACT_DIR = "artifacts"
+_VERSION_FILE = re.compile(r"^v(\d+)\.json$")
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactStore:
+    """
+    Versioned compiled DSPy programs, one directory per predictor role.
+
+    ``<root>/<role>/v0003.json`` holds the program state written by
+    ``dspy.Module.save`` (demos and instructions) and ``v0003.meta.json``
+    describes how it was compiled. Versions only ever increase, so an older
+    artifact can be pinned or rolled back to at any time.
+    """
+
+    def __init__(self, root: str = DEFAULT_ARTIFACT_DIR):
+        self.root = root
+
+    def path(self, role: str, version: int) -> str:
+        return os.path.join(self.root, role, f"v{version:04d}.json")
+
+    def versions(self, role: str) -> list[int]:
+        """Saved versions of ``role``, oldest first."""
+        try:
+            names = os.listdir(os.path.join(self.root, role))
+        except FileNotFoundError:
+            return []
+        return sorted(
+            int(match.group(1))
+            for match in map(_VERSION_FILE.match, names)
+            if match is not None
+        )
+
+    def latest(self, role: str) -> int | None:
+        versions = self.versions(role)
+        return versions[-1] if versions else None
+
+    def metadata(self, role: str, version: int) -> dict[str, Any]:
+        """Compilation details saved with a version (empty if none were)."""
+        try:
+            with open(
+                self.path(role, version)[: -len(".json")] + ".meta.json",
+                encoding="utf-8",
+            ) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def save(self, role: str, program: dspy.Module, metadata: dict[str, Any]) -> int:
+        """Write ``program`` as the next version of ``role``; returns the version."""
+        version = (self.latest(role) or 0) + 1
+        path = self.path(role, version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        program.save(path)
+        with open(path[: -len(".json")] + ".meta.json", "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "role": role,
+                    "version": version,
+                    "created_at": time.time(),
+                    **metadata,
+                },
+                f,
+                indent=2,
+            )
+        return version
+
+    def load(
+        self, role: str, program: dspy.Module, version: int | None = None
+    ) -> int | None:
+        """
+        Load a saved version of ``role`` (the latest by default) into ``program``.
+
+        Returns:
+            int | None: The version loaded, or None if there is none.
+        """
+        version = self.latest(role) if version is None else version
+        if version is None:
+            return None
+        program.load(self.path(role, version))
+        return version
+
+
+_artifacts: ArtifactStore | None = None
+
+
+def get_artifact_store() -> ArtifactStore:
+    """
+    Get or create the process-wide compiled program store.
+
+    Rooted at TWEET_ARTIFACT_DIR (default ./artifacts).
+
+    Returns:
+        ArtifactStore: Shared artifact store.
+    """
+    global _artifacts
+    if _artifacts is None:
+        _artifacts = ArtifactStore(
+            os.getenv("TWEET_ARTIFACT_DIR", DEFAULT_ARTIFACT_DIR)
+        )
+    return _artifacts
+
+
+def load_compiled(role: str, program: dspy.Module) -> str:
+    """
+    Load the compiled artifact selected by TWEET_ARTIFACT_VERSION into ``program``.
+
+    TWEET_ARTIFACT_VERSION is "latest" (default), "none" to run uncompiled,
+    or a version number to pin. A missing or unreadable artifact leaves the
+    program uncompiled.
+
+    Returns:
+        str: Version tag of what was loaded ("v3"), or "" if nothing was.
+    """
+    setting = os.getenv("TWEET_ARTIFACT_VERSION", "latest").strip().lower()
+    if setting == "none":
+        return ""
+    try:
+        version = get_artifact_store().load(
+            role, program, None if setting == "latest" else int(setting)
+        )
+    except Exception:
+        logger.exception(f"Could not load compiled {role} artifact")
+        return ""
+    if version is None:
+        return ""
+    logger.info(f"Loaded compiled {role} program v{version}")
+    return f"v{version}"
@@ -45,6 +45,81 @@ def score_display(
     )
 
 
+def metrics_bar() -> rx.Component:
+    """
+    Create the row of LLM call metrics for the current run.
+
+    Shows call count and cache hits, prompt/completion tokens, estimated
+    cost, p50/p99 latency and retries; hidden until the first event arrives.
+
+    Returns:
+        rx.Component: Metric tiles for the current run.
+    """
+    return rx.el.div(
+        rx.foreach(
+            DSPyState.metric_tiles,
+            lambda tile: rx.el.div(
+                rx.el.p(tile["label"], class_name="text-xs text-gray-500"),
+                rx.el.p(
+                    tile["value"],
+                    class_name="text-sm font-mono font-semibold text-white",
+                ),
+                class_name="p-3 bg-gray-800 rounded-lg",
+            ),
+        ),
+        class_name="grid grid-cols-2 md:grid-cols-5 gap-2 mt-4",
+    )
+
+
+def score_history_chart() -> rx.Component:
+    """
+    Create the chart of round totals and the best total over the run.
+
+    Plots the state's bounded ``score_history`` (the most recent rounds
+    only), hidden until the first tweet is scored.
+
+    Returns:
+        rx.Component: Score history line chart.
+    """
+    return rx.cond(
+        DSPyState.score_history.length() > 0,
+        rx.el.div(
+            rx.el.h3(
+                "Score History", class_name="text-lg font-semibold mb-3 text-white"
+            ),
+            rx.recharts.responsive_container(
+                rx.recharts.line_chart(
+                    rx.recharts.line(
+                        data_key="total",
+                        name="Round best",
+                        stroke="#f87171",
+                        dot=False,
+                        is_animation_active=False,
+                    ),
+                    rx.recharts.line(
+                        data_key="best",
+                        name="Best so far",
+                        type_="stepAfter",
+                        stroke="#4ade80",
+                        stroke_width=2,
+                        dot=False,
+                        is_animation_active=False,
+                    ),
+                    rx.recharts.x_axis(
+                        data_key="iteration", allow_decimals=False, stroke="#6b7280"
+                    ),
+                    rx.recharts.y_axis(allow_decimals=False, stroke="#6b7280"),
+                    rx.recharts.graphing_tooltip(),
+                    data=DSPyState.score_history,
+                ),
+                width="100%",
+                height=200,
+            ),
+            class_name="bg-black/50 p-4 rounded-xl border border-gray-800 mt-8",
+        ),
+    )
+
+
 def main_content() -> rx.Component:
     """
     Create the main content area with tweet optimization interface.
@@ -53,8 +128,11 @@ def main_content() -> rx.Component:
     - Header with sidebar toggle and application title
     - Input textarea for base text
     - Start/Stop optimization button
+    - Run progress line (iteration, patience, pre-filter savings, warm start)
+    - LLM call metrics for the run (calls, tokens, cost, latency)
     - Side-by-side display of current vs. best tweet
     - Score comparison cards for current vs. best scores
+    - Score history chart of recent rounds
     - Real-time progress updates during optimization
 
     Returns:
@@ -108,6 +186,29 @@ def main_content() -> rx.Component:
                 ),
                 class_name="mt-4",
             ),
+            rx.el.p(
+                "Iteration ",
+                DSPyState.iteration_count,
+                " · patience ",
+                DSPyState.patience_counter,
+                "/",
+                DSPyState.patience,
+                " · ",
+                DSPyState.evaluations_saved,
+                " candidates skipped by pre-filter",
+                rx.cond(
+                    DSPyState.screened_out > 0,
+                    rx.fragment(" · ", DSPyState.screened_out, " screened out"),
+                    "",
+                ),
+                rx.cond(
+                    DSPyState.warm_start_seeds > 0,
+                    " · warm start from past runs",
+                    "",
+                ),
+                class_name="text-xs text-gray-500 font-mono mt-2 text-center",
+            ),
+            metrics_bar(),
             class_name="mb-8",
         ),
         rx.el.div(
@@ -150,5 +251,6 @@ def main_content() -> rx.Component:
             score_display(DSPyState.best_scores, "Best Scores", "text-green-400"),
             class_name="grid md:grid-cols-2 gap-8",
         ),
+        score_history_chart(),
         class_name="flex-1 p-8 overflow-y-auto bg-gray-900",
-    )
\ No newline at end of file
+    )
@@ -1,9 +1,16 @@
 import reflex as rx
+from app.optimizer import STRATEGIES
 from app.states.dspy_state import DSPyState
 
+STRATEGY_NAMES = list(STRATEGIES)
+
 
 def config_slider(
-    label: str, value: rx.Var[int], on_change: rx.event.EventHandler
+    label: str,
+    value: rx.Var[int],
+    on_change: rx.event.EventHandler,
+    min_value: int = 1,
+    max_value: int = 20,
 ) -> rx.Component:
     """
     Create a configuration slider component with label and value display.
@@ -12,6 +19,8 @@ def config_slider(
         label: Display label for the slider (e.g., "Iterations (n)").
         value: Reflex variable holding the current slider value.
         on_change: Event handler called when slider value changes.
+        min_value: Lowest selectable value.
+        max_value: Highest selectable value.
 
     Returns:
         rx.Component: Styled slider component with label and value indicator.
@@ -21,8 +30,8 @@ def config_slider(
         rx.el.div(
             rx.el.input(
                 type="range",
-                min=1,
-                max=20,
+                min=min_value,
+                max=max_value,
                 key=label,
                 default_value=value.to_string(),
                 on_change=on_change.throttle(100),
@@ -35,6 +44,62 @@ def config_slider(
     )
 
 
+def config_toggle(
+    label: str, checked: rx.Var[bool], on_change: rx.event.EventHandler
+) -> rx.Component:
+    """
+    Create a labelled checkbox for boolean configuration options.
+
+    Args:
+        label: Display label for the checkbox (e.g., "Bypass cache").
+        checked: Reflex variable holding the current value.
+        on_change: Event handler called when the checkbox is toggled.
+
+    Returns:
+        rx.Component: Styled checkbox row.
+    """
+    return rx.el.label(
+        rx.el.input(
+            type="checkbox",
+            checked=checked,
+            on_change=on_change,
+            class_name="h-4 w-4 accent-red-600 cursor-pointer",
+        ),
+        rx.el.span(label, class_name="text-sm font-medium text-gray-300 ml-2"),
+        class_name="flex items-center cursor-pointer",
+    )
+
+
+def config_select(
+    label: str,
+    value: rx.Var[str],
+    options: list[str],
+    on_change: rx.event.EventHandler,
+) -> rx.Component:
+    """
+    Create a labelled dropdown for choosing one of several options.
+
+    Args:
+        label: Display label for the dropdown (e.g., "Search strategy").
+        value: Reflex variable holding the selected option.
+        options: Selectable option values.
+        on_change: Event handler called with the newly selected value.
+
+    Returns:
+        rx.Component: Styled select component with label.
+    """
+    return rx.el.div(
+        rx.el.label(label, class_name="text-sm font-medium text-gray-300"),
+        rx.el.select(
+            rx.foreach(options, lambda option: rx.el.option(option, value=option)),
+            value=value,
+            on_change=on_change,
+            class_name="w-full mt-2 bg-gray-700 border border-gray-600 text-white text-sm rounded-md p-2 focus:ring-red-500 focus:border-red-500 outline-none",
+        ),
+        class_name="w-full",
+    )
+
+
 def category_manager() -> rx.Component:
     """
     Create the category management interface for tweet scoring.
@@ -97,7 +162,8 @@ def sidebar() -> rx.Component:
 
     The sidebar contains:
     - Application branding (DSPy Tweeter - Pop-Punk Edition)
-    - Configuration sliders for iterations and patience parameters
+    - Configuration sliders for iterations, patience and population search
+    - Search strategy selector (beam, annealing, halving, bandit)
     - Category management interface for custom scoring categories
     - Collapsible functionality controlled by sidebar_open state
 
@@ -122,6 +188,73 @@ def sidebar() -> rx.Component:
                     "Iterations (n)", DSPyState.iterations, DSPyState.set_iterations
                 ),
                 config_slider("Patience", DSPyState.patience, DSPyState.set_patience),
+                config_slider(
+                    "Parallel candidates",
+                    DSPyState.population_size,
+                    DSPyState.set_population_size,
+                    max_value=10,
+                ),
+                config_slider(
+                    "Beam width",
+                    DSPyState.beam_width,
+                    DSPyState.set_beam_width,
+                    max_value=5,
+                ),
+                config_select(
+                    "Search strategy",
+                    DSPyState.strategy,
+                    STRATEGY_NAMES,
+                    DSPyState.set_strategy,
+                ),
+                config_toggle(
+                    "Bypass cache",
+                    DSPyState.bypass_cache,
+                    DSPyState.toggle_bypass_cache,
+                ),
+                config_toggle(
+                    "Pre-filter candidates",
+                    DSPyState.prefilter,
+                    DSPyState.toggle_prefilter,
+                ),
+                config_toggle(
+                    "Warm start from past runs",
+                    DSPyState.warm_start,
+                    DSPyState.toggle_warm_start,
+                ),
+                config_toggle(
+                    "Noise-aware acceptance",
+                    DSPyState.noise_aware,
+                    DSPyState.toggle_noise_aware,
+                ),
+                config_toggle(
+                    "Fast scorer (no reasoning)",
+                    DSPyState.fast_scorer,
+                    DSPyState.toggle_fast_scorer,
+                ),
+                config_toggle(
+                    "Cascade (cheap model screens first)",
+                    DSPyState.cascade,
+                    DSPyState.toggle_cascade,
+                ),
+                rx.cond(
+                    DSPyState.cascade,
+                    config_slider(
+                        "Cascade finalists",
+                        DSPyState.cascade_finalists,
+                        DSPyState.set_cascade_finalists,
+                        max_value=10,
+                    ),
+                ),
+                config_toggle(
+                    "Speculative pipelining",
+                    DSPyState.speculative,
+                    DSPyState.toggle_speculative,
+                ),
+                config_toggle(
+                    "Multi-variant generation (one call per tweet)",
+                    DSPyState.multi_variant,
+                    DSPyState.toggle_multi_variant,
+                ),
                 class_name="space-y-4",
             ),
             category_manager(),
@@ -132,4 +265,4 @@ def sidebar() -> rx.Component:
             "w-80 bg-black text-white h-screen flex flex-col border-r border-gray-800 transition-all duration-300 ease-in-out",
             "w-0 -translate-x-full transition-all duration-300 ease-in-out",
         ),
-    )
\ No newline at end of file
+    )
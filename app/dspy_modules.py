@@ -1,36 +1,138 @@
-import dspy
 import os
-from typing import Optional
+import re
+import threading
+from collections.abc import Callable
+from typing import Any
+
+import dspy
+import httpx
+import json_repair
+import litellm
+import pydantic
+
+from app.artifacts import load_compiled
+from app.metrics import get_metrics
+from app.prediction_cache import CachedPredictor, get_prediction_cache
+from app.scheduler import MAX_IN_FLIGHT, get_scheduler
+
+SCORE_MIN = 1
+SCORE_MAX = 9
+
+DEFAULT_MODEL = "openai/anthropic/claude-3.5-sonnet"
+OPENROUTER_API_BASE = "https://openrouter.ai/api/v1"
+LM_ROLES = ("generator", "screener", "evaluator")
+
+_lms: dict[str, dspy.BaseLM] = {}
+_build_lock = threading.Lock()
+_FIELD_HEADER_PATTERN = re.compile(r"\[\[ ## (\w+) ## \]\]")
+
+
+def _configure_http_pool():
+    """Give litellm one pooled keep-alive HTTP client for all async requests."""
+    if litellm.aclient_session is None:
+        litellm.aclient_session = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_IN_FLIGHT,
+                max_keepalive_connections=MAX_IN_FLIGHT,
+                keepalive_expiry=60,
+            ),
+            timeout=httpx.Timeout(120.0, connect=10.0),
+        )
 
-_lm: Optional[dspy.LM] = None
+
+def lm_model(role: str) -> str:
+    """Model name used for ``role``: TWEET_LM_MODEL_<ROLE>, else TWEET_LM_MODEL."""
+    return os.getenv(
+        f"TWEET_LM_MODEL_{role.upper()}", os.getenv("TWEET_LM_MODEL", DEFAULT_MODEL)
+    )
+
+
+def _build_lm(role: str) -> dspy.BaseLM:
+    backend = os.getenv("TWEET_LM_BACKEND", "openrouter")
+    if backend == "mock":
+        from app.mock_lm import MockLM
+
+        return MockLM.from_env(role)
+    if backend != "openrouter":
+        raise ValueError(
+            f"Unknown TWEET_LM_BACKEND {backend!r}. Use 'openrouter' or 'mock'."
+        )
+    api_key = os.getenv("OPENROUTER_API_KEY")
+    if not api_key:
+        raise ValueError(
+            "OPENROUTER_API_KEY environment variable not set. "
+            "Please set it with: export OPENROUTER_API_KEY='your-key-here'"
+        )
+    _configure_http_pool()
+    return dspy.LM(
+        model=lm_model(role),
+        api_key=api_key,
+        api_base=OPENROUTER_API_BASE,
+        headers={"HTTP-Referer": "http://localhost:3000"},
+        cache=False,
+    )
 
 
-def _get_lm() -> dspy.LM:
+def get_lm(role: str = "generator") -> dspy.BaseLM:
     """
-    Get or create a cached DSPy language model instance configured for OpenRouter.
+    Get or create the cached DSPy language model for one LM role.
+
+    Roles are "generator" (initial tweets and mutations), "screener" (cheap
+    first-pass scoring in cascade mode) and "evaluator" (final scores).
+    The backend is chosen with TWEET_LM_BACKEND: "openrouter" (default) builds
+    an OpenRouter client for ``lm_model(role)``; "mock" builds a deterministic
+    local MockLM configured from MOCK_LM_* variables (with per-role
+    MOCK_LM_*_<ROLE> overrides), for offline runs and benchmarks. Roles that
+    resolve to the same model share one instance.
+
+    Args:
+        role: One of LM_ROLES.
 
     Returns:
-        dspy.LM: Configured language model instance using Claude Sonnet 4.5 via OpenRouter.
+        dspy.BaseLM: Configured language model instance.
 
     Raises:
-        ValueError: If OPENROUTER_API_KEY environment variable is not set.
-    """
-    global _lm
-    if _lm is None:
-        api_key = os.getenv("OPENROUTER_API_KEY")
-        if not api_key:
-            raise ValueError(
-                "OPENROUTER_API_KEY environment variable not set. "
-                "Please set it with: export OPENROUTER_API_KEY='your-key-here'"
-            )
-        _lm = dspy.LM(
-            model="openai/anthropic/claude-3.5-sonnet",
-            api_key=api_key,
-            api_base="https://openrouter.ai/api/v1",
-            headers={"HTTP-Referer": "http://localhost:3000"},
-            cache=False,
-        )
-    return _lm
+        ValueError: If OPENROUTER_API_KEY is not set for the OpenRouter backend,
+            or TWEET_LM_BACKEND names an unknown backend.
+    """
+    if role not in _lms:
+        lm = _build_lm(role)
+        shared = next((m for m in _lms.values() if m.model == lm.model), None)
+        _lms[role] = shared or lm
+    return _lms[role]
+
+
+def set_lm(lm: dspy.BaseLM | None, role: str | None = None):
+    """
+    Replace the LM of one role (or of every role) and drop the cached predictors.
+
+    Used by benchmarks and tools that swap backends within one process;
+    pass None to rebuild from the environment on next use.
+    """
+    global _generator, _mutator, _variant_generator, _evaluator, _batch_evaluator
+    global _fast_evaluator, _fast_batch_evaluator, _screener, _batch_screener
+    for name in LM_ROLES if role is None else (role,):
+        if lm is None:
+            _lms.pop(name, None)
+        else:
+            _lms[name] = lm
+    _generator = _mutator = _variant_generator = _evaluator = _batch_evaluator = None
+    _fast_evaluator = _fast_batch_evaluator = _screener = _batch_screener = None
+
+
+class CategoryScore(pydantic.BaseModel):
+    """One category's score; numeric scores outside 1-9 are rounded and clamped."""
+
+    category: str
+    score: int
+
+    @pydantic.field_validator("score", mode="before")
+    @classmethod
+    def _clamp(cls, value: Any) -> int:
+        if isinstance(value, bool):
+            # pydantic reports ValueError as a validation error; TypeError escapes.
+            raise ValueError("score must be a number")  # noqa: TRY004
+        return max(SCORE_MIN, min(SCORE_MAX, round(float(value))))
 
 
 class TweetGeneratorSignature(dspy.Signature):
@@ -44,6 +146,32 @@ class TweetGeneratorSignature(dspy.Signature):
     )
 
 
+class TweetMutatorSignature(dspy.Signature):
+    """Rewrite a tweet following a specific improvement instruction."""
+
+    input_text: str = dspy.InputField(desc="The current tweet to improve.")
+    instruction: str = dspy.InputField(desc="How to change the tweet in this rewrite.")
+    tweet: str = dspy.OutputField(
+        desc="Rewritten tweet (max 280 characters). Should be catchy and include relevant hashtags."
+    )
+
+
+class TweetVariantsSignature(dspy.Signature):
+    """Rewrite a tweet into several variants, one per improvement instruction, each clearly different from the current tweet and from the other variants."""
+
+    input_text: str = dspy.InputField(desc="The current tweet to improve.")
+    variant_instructions: list[str] = dspy.InputField(
+        desc="How to change the tweet in each variant; an empty instruction leaves the direction open."
+    )
+    tweets: list[str] = dspy.OutputField(
+        desc=(
+            "Exactly one rewritten tweet per instruction, in order (max 280 characters "
+            "each). Each should be catchy and include relevant hashtags; none may "
+            "repeat the current tweet or another variant."
+        )
+    )
+
+
 class TweetEvaluatorSignature(dspy.Signature):
     """Evaluate a tweet based on a set of categories, providing a score from 1 to 9 for each."""
 
@@ -51,44 +179,440 @@ class TweetEvaluatorSignature(dspy.Signature):
     categories: str = dspy.InputField(
         desc="A semicolon-separated list of categories to score the tweet on."
     )
-    scores: str = dspy.OutputField(
-        desc="A JSON list of objects, each with a 'category' and a 'score' (integer 1-9)."
+    scores: list[CategoryScore] = dspy.OutputField(
+        desc="One entry per category, each with the 'category' name and a 'score' (integer 1-9)."
+    )
+
+
+class TweetBatchEvaluatorSignature(dspy.Signature):
+    """Evaluate several tweets on the same set of categories, providing a score from 1 to 9 for each tweet and category."""
+
+    tweets: list[str] = dspy.InputField(desc="The candidate tweets to evaluate.")
+    categories: str = dspy.InputField(
+        desc="A semicolon-separated list of categories to score every tweet on."
+    )
+    scores: list[list[CategoryScore]] = dspy.OutputField(
+        desc=(
+            "Exactly one entry per input tweet, in input order. Each entry lists "
+            "every category with its 'category' name and a 'score' (integer 1-9)."
+        )
     )
 
 
-_generator: Optional[dspy.ChainOfThought] = None
-_evaluator: Optional[dspy.ChainOfThought] = None
+class FastTweetEvaluatorSignature(TweetEvaluatorSignature):
+    """Evaluate a tweet based on a set of categories, providing a score from 1 to 9 for each. Answer with the scores only."""
+
+
+class FastTweetBatchEvaluatorSignature(TweetBatchEvaluatorSignature):
+    """Evaluate several tweets on the same set of categories, providing a score from 1 to 9 for each tweet and category. Answer with the scores only."""
+
+
+def _salvage_scores(value: Any) -> list[dict]:
+    """Keep the entries of one score list that validate, dropping the rest."""
+    if isinstance(value, dict):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+    salvaged = []
+    for item in value:
+        try:
+            salvaged.append(CategoryScore.model_validate(item).model_dump())
+        except pydantic.ValidationError:
+            continue
+    return salvaged
+
+
+def _field_text(raw: str, name: str) -> str | None:
+    """The ``name`` section of a whole adapter response (``raw`` itself if it has no field headers)."""
+    sections = _FIELD_HEADER_PATTERN.split(raw)
+    if len(sections) == 1:
+        return raw
+    names = sections[1::2]
+    if name not in names:
+        return None
+    return sections[2 + 2 * names.index(name)]
+
+
+def _load_scores(raw: Any) -> Any:
+    """
+    Decode ``scores`` output: typed values pass through, text is repaired.
+
+    Text may be a whole adapter response (the ``scores`` section is cut out
+    of it), wrapped in code fences, or truncated JSON; json_repair closes
+    open brackets and strings so the complete entries can still be used.
+    """
+    if isinstance(raw, pydantic.BaseModel):
+        return raw.model_dump()
+    if isinstance(raw, list):
+        return [_load_scores(item) for item in raw]
+    if not isinstance(raw, str):
+        return raw
+    raw = _field_text(raw, "scores")
+    if raw is None:
+        return None
+    parsed = json_repair.loads(raw.strip())
+    return parsed if parsed != "" else None
 
 
-def get_generator() -> dspy.ChainOfThought:
+def parse_scores(raw: Any) -> list[dict]:
+    """
+    Validate the single evaluator's ``scores`` output.
+
+    Args:
+        raw: Typed CategoryScore list, cached JSON, or raw (possibly partial)
+            LM text for TweetEvaluatorSignature.
+
+    Returns:
+        list[dict]: Valid ``{"category", "score"}`` entries with scores clamped
+        to 1-9; entries that cannot be repaired are dropped, so the caller can
+        retry just the categories that are missing.
+    """
+    return _salvage_scores(_load_scores(raw))
+
+
+def parse_batch_scores(raw: Any, expected: int) -> list[list[dict]] | None:
+    """
+    Validate the batch evaluator's ``scores`` output.
+
+    Args:
+        raw: Typed score lists, cached JSON, or raw (possibly partial) LM
+            text for TweetBatchEvaluatorSignature.
+        expected: Number of tweets that were sent for scoring.
+
+    Returns:
+        list[list[dict]] | None: One list of valid entries per tweet (see
+        ``parse_scores``), or None if the output cannot be matched to the
+        tweets. A truncated output keeps the tweets it completed; the rest
+        come back empty.
+    """
+    parsed = _load_scores(raw)
+    if not isinstance(parsed, list) or not 0 < len(parsed) <= expected:
+        return None
+    if not all(isinstance(entry, list) for entry in parsed):
+        return None
+    score_lists = [_salvage_scores(entry) for entry in parsed]
+    return score_lists + [[] for _ in range(expected - len(score_lists))]
+
+
+def parse_variants(raw: Any, parent: str, expected: int) -> list[str | None]:
+    """
+    Validate the variant generator's ``tweets`` output.
+
+    Args:
+        raw: Typed list, cached JSON, or raw (possibly partial) LM text for
+            TweetVariantsSignature, e.g. the ``lm_response`` of an
+            AdapterParseError.
+        parent: The tweet the variants rewrite.
+        expected: Number of variants that were asked for.
+
+    Returns:
+        list[str | None]: One entry per requested variant, in order. Blank
+        variants and ones that repeat ``parent`` or an earlier variant
+        (ignoring case and whitespace) are None, as are missing ones.
+    """
+    if isinstance(raw, str):
+        text = _field_text(raw, "tweets")
+        raw = json_repair.loads(text.strip()) if text is not None else None
+    seen = {" ".join(parent.lower().split())}
+    variants: list[str | None] = []
+    for item in raw[:expected] if isinstance(raw, list) else []:
+        text = item.strip() if isinstance(item, str) else ""
+        key = " ".join(text.lower().split())
+        if not text or key in seen:
+            variants.append(None)
+            continue
+        seen.add(key)
+        variants.append(text)
+    return variants + [None] * (expected - len(variants))
+
+
+def _no_fallback_adapter() -> dspy.ChatAdapter:
+    """
+    Adapter for list outputs: no JSONAdapter fallback on malformed output.
+
+    A parse failure re-runs the whole prompt under the fallback; the Scorer
+    repairs the raw text with ``parse_scores`` and re-asks only for what is
+    missing instead, and the variant generator keeps whatever
+    ``parse_variants`` recovers.
+    """
+    return dspy.ChatAdapter(use_json_adapter_fallback=False)
+
+
+PROGRAMS: dict[str, Callable[[], dspy.Module]] = {
+    "generator": lambda: dspy.ChainOfThought(TweetGeneratorSignature),
+    "mutator": lambda: dspy.ChainOfThought(TweetMutatorSignature),
+    "variant_generator": lambda: dspy.ChainOfThought(TweetVariantsSignature),
+    "evaluator": lambda: dspy.ChainOfThought(TweetEvaluatorSignature),
+    "batch_evaluator": lambda: dspy.ChainOfThought(TweetBatchEvaluatorSignature),
+    "fast_evaluator": lambda: dspy.Predict(FastTweetEvaluatorSignature),
+    "fast_batch_evaluator": lambda: dspy.Predict(FastTweetBatchEvaluatorSignature),
+    "screener": lambda: dspy.Predict(FastTweetEvaluatorSignature),
+    "batch_screener": lambda: dspy.Predict(FastTweetBatchEvaluatorSignature),
+}
+
+PROGRAM_LM_ROLES: dict[str, str] = {
+    "generator": "generator",
+    "mutator": "generator",
+    "variant_generator": "generator",
+    "evaluator": "evaluator",
+    "batch_evaluator": "evaluator",
+    "fast_evaluator": "evaluator",
+    "fast_batch_evaluator": "evaluator",
+    "screener": "screener",
+    "batch_screener": "screener",
+}
+
+
+def _load_program(role: str) -> tuple[dspy.Module, str]:
+    """Build ``role``'s program and load its compiled artifact, if there is one."""
+    program = PROGRAMS[role]()
+    return program, load_compiled(role, program)
+
+
+def _build_predictor(
+    role: str, signature: type[dspy.Signature], **kwargs
+) -> CachedPredictor:
+    """
+    Build ``role``'s CachedPredictor on the LM of its PROGRAM_LM_ROLES entry.
+
+    The LM is bound to the program itself (after its artifact is loaded), so
+    predictors on different LM roles can run side by side; their requests
+    share the scheduler but queue in their LM role's lane. DSPy settings are
+    configured by the first build only: they may only be changed again from
+    the same thread and task, and predictors can be built from a warm-up
+    thread (see ``app.warmup``) as well as from event handlers.
+    """
+    lm_role = PROGRAM_LM_ROLES[role]
+    with _build_lock:
+        lm = get_lm(lm_role)
+        if not dspy.settings.track_usage:
+            dspy.configure(lm=lm, track_usage=True)
+        program, version = _load_program(role)
+        program.set_lm(lm)
+    return CachedPredictor(
+        program,
+        signature,
+        lm.model,
+        get_prediction_cache(),
+        scheduler=get_scheduler(),
+        role=role,
+        metrics=get_metrics(),
+        version=version,
+        lane=lm_role,
+        **kwargs,
+    )
+
+
+_generator: CachedPredictor | None = None
+_mutator: CachedPredictor | None = None
+_variant_generator: CachedPredictor | None = None
+_evaluator: CachedPredictor | None = None
+_batch_evaluator: CachedPredictor | None = None
+_fast_evaluator: CachedPredictor | None = None
+_fast_batch_evaluator: CachedPredictor | None = None
+_screener: CachedPredictor | None = None
+_batch_screener: CachedPredictor | None = None
+
+
+def get_generator() -> CachedPredictor:
     """
     Get a cached instance of the tweet generator predictor.
 
     The generator uses DSPy's ChainOfThought module to convert input text
     into engaging, concise tweets (max 280 characters) with relevant hashtags.
+    Predictions go through the on-disk prediction cache; callers that need a
+    fresh sample (e.g. mutations) pass ``bypass_cache=True``. Await ``acall``
+    for the async-native path, with ``on_partial`` to receive the tweet text
+    as it streams in. Like every predictor here, it starts from the compiled
+    program saved by ``python -m app.optimizer.compile`` when there is one (see
+    TWEET_ARTIFACT_VERSION). It runs on the "generator" LM.
 
     Returns:
-        dspy.ChainOfThought: Configured tweet generator instance.
+        CachedPredictor: Configured tweet generator instance.
     """
     global _generator
     if _generator is None:
-        dspy.configure(lm=_get_lm())
-        _generator = dspy.ChainOfThought(TweetGeneratorSignature)
+        _generator = _build_predictor(
+            "generator", TweetGeneratorSignature, stream_field="tweet"
+        )
     return _generator
 
 
-def get_evaluator() -> dspy.ChainOfThought:
+def get_mutator() -> CachedPredictor:
+    """
+    Get a cached instance of the instructed tweet mutator predictor.
+
+    Like the generator, but the rewrite follows an explicit instruction
+    (e.g. "make it more concise"), so search strategies can choose how each
+    candidate is mutated. Streams the tweet like the generator and runs on
+    the same "generator" LM.
+
+    Returns:
+        CachedPredictor: Configured tweet mutator instance.
+    """
+    global _mutator
+    if _mutator is None:
+        _mutator = _build_predictor(
+            "mutator", TweetMutatorSignature, stream_field="tweet"
+        )
+    return _mutator
+
+
+def get_variant_generator() -> CachedPredictor:
+    """
+    Get a cached instance of the multi-variant tweet mutator predictor.
+
+    One call rewrites a tweet into one variant per instruction (see
+    ``parse_variants``), so a round's mutations of the same parent share a
+    single prompt instead of re-sending it per mutation. Runs on the
+    "generator" LM; the list output is not streamed. Malformed output raises
+    AdapterParseError instead of falling back to a second (JSON) call; use
+    ``parse_variants`` on its ``lm_response``.
+
+    Returns:
+        CachedPredictor: Configured variant generator instance.
+    """
+    global _variant_generator
+    if _variant_generator is None:
+        _variant_generator = _build_predictor(
+            "variant_generator",
+            TweetVariantsSignature,
+            adapter=_no_fallback_adapter(),
+        )
+    return _variant_generator
+
+
+def get_evaluator() -> CachedPredictor:
     """
     Get a cached instance of the tweet evaluator predictor.
 
     The evaluator uses DSPy's ChainOfThought module to score tweets
-    on custom categories (1-9 scale) and return structured JSON results.
+    on custom categories (1-9 scale) and return a typed CategoryScore list.
+    Re-scoring an identical tweet against identical categories is answered
+    from the on-disk prediction cache. Malformed output raises
+    AdapterParseError without a second full call; use ``parse_scores`` on
+    the result or on the error's ``lm_response``. It runs on the
+    "evaluator" LM, like every evaluator below except the screeners.
 
     Returns:
-        dspy.ChainOfThought: Configured tweet evaluator instance.
+        CachedPredictor: Configured tweet evaluator instance.
     """
     global _evaluator
     if _evaluator is None:
-        dspy.configure(lm=_get_lm())
-        _evaluator = dspy.ChainOfThought(TweetEvaluatorSignature)
-    return _evaluator
\ No newline at end of file
+        _evaluator = _build_predictor(
+            "evaluator",
+            TweetEvaluatorSignature,
+            adapter=_no_fallback_adapter(),
+        )
+    return _evaluator
+
+
+def get_batch_evaluator() -> CachedPredictor:
+    """
+    Get a cached instance of the batch tweet evaluator predictor.
+
+    Scores a whole population of candidate tweets in one ChainOfThought call,
+    so the category prompt and reasoning overhead are paid once per round
+    instead of once per candidate. Use ``parse_batch_scores`` on its output
+    (or on the ``lm_response`` of an AdapterParseError).
+
+    Returns:
+        CachedPredictor: Configured batch evaluator instance.
+    """
+    global _batch_evaluator
+    if _batch_evaluator is None:
+        _batch_evaluator = _build_predictor(
+            "batch_evaluator",
+            TweetBatchEvaluatorSignature,
+            adapter=_no_fallback_adapter(),
+        )
+    return _batch_evaluator
+
+
+def get_fast_evaluator() -> CachedPredictor:
+    """
+    Get a cached instance of the fast (no reasoning) tweet evaluator predictor.
+
+    Same output as ``get_evaluator`` from a plain Predict module, so no
+    rationale tokens are generated or paid for. Scores are noisier than the
+    ChainOfThought evaluator's and are cached separately.
+
+    Returns:
+        CachedPredictor: Configured fast tweet evaluator instance.
+    """
+    global _fast_evaluator
+    if _fast_evaluator is None:
+        _fast_evaluator = _build_predictor(
+            "fast_evaluator",
+            FastTweetEvaluatorSignature,
+            adapter=_no_fallback_adapter(),
+        )
+    return _fast_evaluator
+
+
+def get_fast_batch_evaluator() -> CachedPredictor:
+    """
+    Get a cached instance of the fast (no reasoning) batch evaluator predictor.
+
+    Returns:
+        CachedPredictor: Configured fast batch evaluator instance.
+    """
+    global _fast_batch_evaluator
+    if _fast_batch_evaluator is None:
+        _fast_batch_evaluator = _build_predictor(
+            "fast_batch_evaluator",
+            FastTweetBatchEvaluatorSignature,
+            adapter=_no_fallback_adapter(),
+        )
+    return _fast_batch_evaluator
+
+
+def get_screener() -> CachedPredictor:
+    """
+    Get a cached instance of the screening tweet evaluator predictor.
+
+    The fast (no reasoning) evaluator program on the "screener" LM, usually
+    a cheaper model than the evaluator's. In cascade mode it ranks a round's
+    mutations so only the finalists are scored by the evaluator.
+
+    Returns:
+        CachedPredictor: Configured screening evaluator instance.
+    """
+    global _screener
+    if _screener is None:
+        _screener = _build_predictor(
+            "screener",
+            FastTweetEvaluatorSignature,
+            adapter=_no_fallback_adapter(),
+        )
+    return _screener
+
+
+def get_batch_screener() -> CachedPredictor:
+    """
+    Get a cached instance of the batch screening evaluator predictor.
+
+    Returns:
+        CachedPredictor: Configured batch screening evaluator instance.
+    """
+    global _batch_screener
+    if _batch_screener is None:
+        _batch_screener = _build_predictor(
+            "batch_screener",
+            FastTweetBatchEvaluatorSignature,
+            adapter=_no_fallback_adapter(),
+        )
+    return _batch_screener
+
+
+PREDICTOR_GETTERS: tuple[Callable[[], CachedPredictor], ...] = (
+    get_generator,
+    get_mutator,
+    get_variant_generator,
+    get_evaluator,
+    get_batch_evaluator,
+    get_fast_evaluator,
+    get_fast_batch_evaluator,
+    get_screener,
+    get_batch_screener,
+)
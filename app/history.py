@@ -0,0 +1,75 @@
+import hashlib
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+DEFAULT_HISTORY_CAPACITY = 60
+
+
+def tweet_id(tweet: str) -> int:
+    """Compact 32-bit id of a tweet, so history records never hold the text."""
+    return int.from_bytes(
+        hashlib.blake2b(tweet.encode("utf-8"), digest_size=4).digest()
+    )
+
+
+@dataclass(slots=True)
+class HistoryRecord:
+    """One scored round of a run."""
+
+    iteration: int
+    tweet_id: int
+    total: float
+    accepted: bool
+
+
+class HistoryRing:
+    """
+    Fixed-size ring buffer of the most recent HistoryRecords of a run.
+
+    Storage is allocated once and old records are overwritten, so a
+    session's history costs the same whether the run is 10 rounds long or
+    10,000.
+    """
+
+    __slots__ = ("_next", "_records", "_size", "capacity")
+
+    def __init__(self, capacity: int = DEFAULT_HISTORY_CAPACITY):
+        self.capacity = max(1, capacity)
+        self._records: list[HistoryRecord | None] = [None] * self.capacity
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[HistoryRecord]:
+        """Records from oldest to newest."""
+        start = (self._next - self._size) % self.capacity
+        for i in range(self._size):
+            yield self._records[(start + i) % self.capacity]
+
+    def append(self, record: HistoryRecord):
+        self._records[self._next] = record
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def clear(self):
+        self._records = [None] * self.capacity
+        self._next = self._size = 0
+
+    def chart_points(self) -> list[dict[str, float]]:
+        """
+        Chart rows for the records kept: the round's total and the best so far.
+
+        The running best starts from the oldest record kept and only moves on
+        accepted rounds.
+        """
+        points = []
+        best: float | None = None
+        for record in self:
+            if best is None or record.accepted:
+                best = record.total
+            points.append(
+                {"iteration": record.iteration, "total": record.total, "best": best}
+            )
+        return points
@@ -0,0 +1,267 @@
+import bisect
+import functools
+import http.server
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CallRecord:
+    """Measurements of one predictor call, cache hits included."""
+
+    role: str
+    latency_s: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    retries: int = 0
+    cache_hit: bool = False
+    error: bool = False
+    cancelled: bool = False
+
+
+@functools.cache
+def token_prices(model: str) -> tuple[float, float]:
+    """
+    USD price per prompt and completion token for ``model``.
+
+    TWEET_LM_PROMPT_PRICE_PER_MTOK / TWEET_LM_COMPLETION_PRICE_PER_MTOK
+    override litellm's price map. OpenRouter models addressed through the
+    OpenAI-compatible route (``openai/<vendor>/<model>``) are looked up under
+    ``openrouter/<vendor>/<model>``; unknown models cost 0.
+    """
+    prompt_price = os.getenv("TWEET_LM_PROMPT_PRICE_PER_MTOK")
+    completion_price = os.getenv("TWEET_LM_COMPLETION_PRICE_PER_MTOK")
+    if prompt_price or completion_price:
+        return (
+            float(prompt_price or 0) / 1_000_000,
+            float(completion_price or 0) / 1_000_000,
+        )
+    import litellm  # deferred: its import takes seconds and only prices need it
+
+    candidates = [model]
+    if model.count("/") >= 2:
+        candidates.append("openrouter/" + model.split("/", 1)[1])
+    for name in candidates:
+        prices = litellm.model_cost.get(name)
+        if prices:
+            return (
+                prices.get("input_cost_per_token", 0.0),
+                prices.get("output_cost_per_token", 0.0),
+            )
+    return 0.0, 0.0
+
+
+def usage_cost(model: str, usage: dict) -> float:
+    """Cost of one call: the provider-reported ``cost`` if any, else priced tokens."""
+    if isinstance(usage.get("cost"), (int, float)):
+        return float(usage["cost"])
+    prompt_price, completion_price = token_prices(model)
+    return (
+        usage.get("prompt_tokens", 0) * prompt_price
+        + usage.get("completion_tokens", 0) * completion_price
+    )
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class RunMetrics:
+    """
+    Calls made during one optimization run.
+
+    Threaded through the predictors by the engine, so concurrent runs (UI
+    sessions, bulk jobs) each get their own totals.
+    """
+
+    def __init__(self):
+        self.records: list[CallRecord] = []
+
+    def record(self, record: CallRecord):
+        self.records.append(record)
+
+    def summary(self) -> dict[str, float]:
+        """
+        Totals for the run.
+
+        Latency percentiles cover calls that reached the LLM; cache hits are
+        counted separately.
+        """
+        llm_latencies = [r.latency_s for r in self.records if not r.cache_hit]
+        return {
+            "calls": len(self.records),
+            "cache_hits": sum(r.cache_hit for r in self.records),
+            "errors": sum(r.error for r in self.records),
+            "cancelled": sum(r.cancelled for r in self.records),
+            "retries": sum(r.retries for r in self.records),
+            "prompt_tokens": sum(r.prompt_tokens for r in self.records),
+            "completion_tokens": sum(r.completion_tokens for r in self.records),
+            "cost_usd": sum(r.cost_usd for r in self.records),
+            "latency_p50_s": percentile(llm_latencies, 0.5),
+            "latency_p99_s": percentile(llm_latencies, 0.99),
+        }
+
+
+class _RoleStats:
+    def __init__(self):
+        self.calls = 0
+        self.cache_hits = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.latency_count = 0
+
+
+class MetricsRegistry:
+    """
+    Process-wide call metrics per predictor role, rendered for Prometheus.
+
+    Latency is kept as a cumulative histogram of LLM calls (cache hits
+    excluded) so p50/p99 can be derived with ``histogram_quantile``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._roles: dict[str, _RoleStats] = {}
+        self.started_at = time.time()
+
+    def record(self, record: CallRecord):
+        with self._lock:
+            stats = self._roles.setdefault(record.role, _RoleStats())
+            stats.calls += 1
+            stats.cache_hits += record.cache_hit
+            stats.errors += record.error
+            stats.cancelled += record.cancelled
+            stats.retries += record.retries
+            stats.prompt_tokens += record.prompt_tokens
+            stats.completion_tokens += record.completion_tokens
+            stats.cost_usd += record.cost_usd
+            if not record.cache_hit:
+                stats.bucket_counts[
+                    bisect.bisect_left(LATENCY_BUCKETS, record.latency_s)
+                ] += 1
+                stats.latency_sum += record.latency_s
+                stats.latency_count += 1
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        counters = [
+            ("tweet_lm_calls_total", "Predictor calls, cache hits included.", "calls"),
+            (
+                "tweet_lm_cache_hits_total",
+                "Predictor calls answered from the prediction cache.",
+                "cache_hits",
+            ),
+            ("tweet_lm_errors_total", "Predictor calls that raised.", "errors"),
+            (
+                "tweet_lm_cancelled_total",
+                "Predictor calls cancelled while in flight.",
+                "cancelled",
+            ),
+            ("tweet_lm_retries_total", "Transient-error retries.", "retries"),
+            (
+                "tweet_lm_prompt_tokens_total",
+                "Prompt tokens sent to the LLM.",
+                "prompt_tokens",
+            ),
+            (
+                "tweet_lm_completion_tokens_total",
+                "Completion tokens returned by the LLM.",
+                "completion_tokens",
+            ),
+            ("tweet_lm_cost_usd_total", "Estimated LLM spend in USD.", "cost_usd"),
+        ]
+        with self._lock:
+            roles = sorted(self._roles.items())
+            lines = []
+            for name, help_text, attr in counters:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for role, stats in roles:
+                    lines.append(f'{name}{{role="{role}"}} {getattr(stats, attr)}')
+            name = "tweet_lm_call_duration_seconds"
+            lines.append(
+                f"# HELP {name} Latency of predictor calls that reached the LLM."
+            )
+            lines.append(f"# TYPE {name} histogram")
+            for role, stats in roles:
+                cumulative = 0
+                for bound, count in zip(
+                    (*LATENCY_BUCKETS, "+Inf"), stats.bucket_counts
+                ):
+                    cumulative += count
+                    lines.append(
+                        f'{name}_bucket{{role="{role}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(f'{name}_sum{{role="{role}"}} {stats.latency_sum}')
+                lines.append(f'{name}_count{{role="{role}"}} {stats.latency_count}')
+        lines.append(
+            "# HELP tweet_process_start_time_seconds Unix time the metrics registry was created."
+        )
+        lines.append("# TYPE tweet_process_start_time_seconds gauge")
+        lines.append(f"tweet_process_start_time_seconds {self.started_at}")
+        return "\n".join(lines) + "\n"
+
+
+_registry: MetricsRegistry | None = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Get or create the process-wide metrics registry.
+
+    Returns:
+        MetricsRegistry: Shared per-role call metrics.
+    """
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> http.server.HTTPServer:
+    """
+    Serve ``/metrics`` from a daemon thread, for processes without the Reflex backend.
+
+    Returns:
+        HTTPServer: The running server; call ``shutdown()`` to stop it.
+    """
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = get_metrics().render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return server
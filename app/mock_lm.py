@@ -0,0 +1,309 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+import dspy
+import litellm
+
+MOCK_VOCABULARY = [
+    "fast",
+    "simple",
+    "powerful",
+    "Python",
+    "ship",
+    "today",
+    "#python",
+    "#webdev",
+    "#buildinpublic",
+    "🚀",
+    "no JavaScript",
+    "full-stack",
+]
+
+STREAM_CHUNK_CHARS = 4
+
+_FIELD_PATTERN = re.compile(
+    r"\[\[ ## (\w+) ## \]\]\n(.*?)(?=\n\n\[\[ ## |\n\nRespond with |\Z)", re.DOTALL
+)
+_OUTPUT_FIELD_PATTERN = re.compile(r"^\d+\. `(\w+)`", re.MULTILINE)
+
+
+class MockLMError(litellm.ServiceUnavailableError):
+    """
+    Transient failure injected by MockLM to mimic provider errors.
+
+    A litellm ServiceUnavailableError, so the scheduler retries it like a
+    real provider outage.
+    """
+
+    def __init__(self, message: str):
+        super().__init__(message, llm_provider="mock", model="mock/tweet-lm")
+
+
+class MockLM(dspy.BaseLM):
+    """
+    Deterministic local stand-in for the OpenRouter LM.
+
+    Answers the tweet generator and evaluator signatures without any network
+    access, so the optimization loop can be exercised and benchmarked
+    offline. Outputs depend only on the prompt, the seed and call order;
+    latency, failure rate and the score landscape are configurable.
+
+    Score modes:
+        - "hash": each (tweet, category) gets a fixed pseudo-random score,
+          a rugged landscape with no trend.
+        - "climb": longer mutations score higher, so hill climbing makes
+          steady progress until it saturates at 9.
+
+    With ``malformed_rate``, that fraction of ``scores`` outputs comes back
+    damaged the way real models damage JSON: truncated, wrapped in a code
+    fence, with a score out of range or with an entry missing its score.
+
+    One instance per LM role can stand in for a multi-model setup: a
+    "screener" with extra ``score_noise`` and low latency behaves like a
+    cheap, rough judge of the same landscape as a slow, exact "evaluator".
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        latency_ms: float = 0.0,
+        latency_jitter_ms: float = 0.0,
+        latency_distribution: str = "fixed",
+        failure_rate: float = 0.0,
+        score_mode: str = "hash",
+        score_noise: int = 0,
+        malformed_rate: float = 0.0,
+        model: str = "mock/tweet-lm",
+    ):
+        super().__init__(model=model, cache=False)
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.latency_distribution = latency_distribution
+        self.failure_rate = failure_rate
+        self.score_mode = score_mode
+        self.score_noise = score_noise
+        self.malformed_rate = malformed_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, role: str | None = None) -> "MockLM":
+        """
+        Build a MockLM from MOCK_LM_* environment variables.
+
+        Reads MOCK_LM_SEED, MOCK_LM_LATENCY_MS, MOCK_LM_LATENCY_JITTER_MS,
+        MOCK_LM_LATENCY_DISTRIBUTION, MOCK_LM_FAILURE_RATE, MOCK_LM_SCORE_MODE,
+        MOCK_LM_SCORE_NOISE and MOCK_LM_MALFORMED_RATE, falling back to the
+        constructor defaults. With a ``role``, MOCK_LM_<SETTING>_<ROLE> (e.g.
+        MOCK_LM_SCORE_NOISE_SCREENER) overrides a setting for that role only;
+        a role with any override gets its own model name, "mock/tweet-lm-<role>".
+        """
+        overridden = False
+
+        def setting(name: str, default: str) -> str:
+            nonlocal overridden
+            if role:
+                value = os.getenv(f"MOCK_LM_{name}_{role.upper()}")
+                if value is not None:
+                    overridden = True
+                    return value
+            return os.getenv(f"MOCK_LM_{name}", default)
+
+        return cls(
+            seed=int(setting("SEED", "0")),
+            latency_ms=float(setting("LATENCY_MS", "0")),
+            latency_jitter_ms=float(setting("LATENCY_JITTER_MS", "0")),
+            latency_distribution=setting("LATENCY_DISTRIBUTION", "fixed"),
+            failure_rate=float(setting("FAILURE_RATE", "0")),
+            score_mode=setting("SCORE_MODE", "hash"),
+            score_noise=int(setting("SCORE_NOISE", "0")),
+            malformed_rate=float(setting("MALFORMED_RATE", "0")),
+            model=f"mock/tweet-lm-{role}" if overridden else "mock/tweet-lm",
+        )
+
+    def _hash(self, *parts: str) -> int:
+        payload = "\x1f".join((str(self.seed),) + parts)
+        return int.from_bytes(hashlib.sha256(payload.encode("utf-8")).digest()[:8])
+
+    def _sample_latency(self) -> float:
+        """Latency in seconds for the next call."""
+        if self.latency_distribution == "uniform":
+            ms = self._rng.uniform(
+                self.latency_ms - self.latency_jitter_ms,
+                self.latency_ms + self.latency_jitter_ms,
+            )
+        elif self.latency_distribution == "lognormal":
+            sigma = self.latency_jitter_ms / max(self.latency_ms, 1e-9)
+            ms = self.latency_ms * self._rng.lognormvariate(0, sigma)
+        else:
+            ms = self.latency_ms
+        return max(ms, 0.0) / 1000
+
+    def _mutate(self, text: str, instruction: str = "") -> str:
+        """
+        Append vocabulary words to ``text``, keeping it under 280 chars.
+
+        Without an instruction one word is appended. Each instruction appends
+        a fixed 0-2 words, so some mutation prompts are reliably better than
+        others in "climb" mode (and 0 words yields a duplicate).
+        """
+        count = self._hash("instruction", instruction) % 3 if instruction else 1
+        words = [
+            MOCK_VOCABULARY[self._rng.randrange(len(MOCK_VOCABULARY))]
+            for _ in range(count)
+        ]
+        tweet = " ".join([text.strip(), *words])
+        if len(tweet) > 280:
+            tweet = tweet[-280:].lstrip()
+        return tweet
+
+    def score(self, tweet: str, category: str, noisy: bool = True) -> int:
+        """Deterministic 1-9 score for ``tweet`` on ``category`` (plus noise if ``noisy``)."""
+        h = self._hash(tweet, category)
+        if self.score_mode == "climb":
+            value = 1 + min(8, len(tweet.split()) // 3) + (h % 3) - 1
+        else:
+            value = 1 + h % 9
+        if noisy and self.score_noise:
+            value += self._rng.randint(-self.score_noise, self.score_noise)
+        return max(1, min(9, value))
+
+    def _scores_for(self, tweet: str, categories: str) -> list[dict]:
+        return [
+            {"category": category, "score": self.score(tweet, category)}
+            for category in (c.strip() for c in categories.split(";"))
+            if category
+        ]
+
+    def _damage(self, text: str) -> str:
+        """Break a JSON ``scores`` output in one of the ways real models do."""
+        kind = self._rng.randrange(4)
+        if kind == 0:
+            return text[: int(len(text) * self._rng.uniform(0.5, 0.95))]
+        if kind == 1:
+            return f"```json\n{text}\n```"
+        if kind == 2:
+            return re.sub(r'"score": \d+', '"score": 12', text, count=1)
+        return re.sub(r'"score": ', '"rating": ', text, count=1)
+
+    def _field_value(self, field: str, inputs: dict[str, str]) -> str:
+        if field == "reasoning":
+            return "Mock reasoning."
+        if field == "tweet":
+            return self._mutate(
+                inputs.get("input_text", ""), inputs.get("instruction", "")
+            )
+        if field == "tweets":
+            return json.dumps(
+                [
+                    self._mutate(inputs.get("input_text", ""), instruction)
+                    for instruction in json.loads(
+                        inputs.get("variant_instructions", "[]")
+                    )
+                ]
+            )
+        if field == "scores" and "tweets" in inputs:
+            tweets = json.loads(inputs["tweets"])
+            text = json.dumps(
+                [self._scores_for(t, inputs.get("categories", "")) for t in tweets]
+            )
+        elif field == "scores":
+            text = json.dumps(
+                self._scores_for(inputs.get("tweet", ""), inputs.get("categories", ""))
+            )
+        else:
+            return ""
+        if self._rng.random() < self.malformed_rate:
+            return self._damage(text)
+        return text
+
+    def _complete(self, messages: list[dict]) -> str:
+        """Answer a ChatAdapter-formatted request in the same format."""
+        system = messages[0]["content"] if messages else ""
+        output_section = system.split("Your output fields are:", 1)[-1].split(
+            "All interactions", 1
+        )[0]
+        output_fields = _OUTPUT_FIELD_PATTERN.findall(output_section)
+        inputs = {
+            name: value.strip()
+            for name, value in _FIELD_PATTERN.findall(messages[-1]["content"])
+        }
+        with self._lock:
+            self.calls += 1
+            if self._rng.random() < self.failure_rate:
+                raise MockLMError("Injected mock LM failure")
+            parts = [
+                f"[[ ## {field} ## ]]\n{self._field_value(field, inputs)}"
+                for field in output_fields
+            ]
+        return "\n\n".join(parts + ["[[ ## completed ## ]]"])
+
+    def _response(self, content: str, messages: list[dict]) -> SimpleNamespace:
+        prompt_chars = sum(len(m.get("content", "")) for m in messages)
+        usage = {
+            "prompt_tokens": prompt_chars // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": prompt_chars // 4 + len(content) // 4,
+        }
+        return SimpleNamespace(
+            choices=[
+                SimpleNamespace(
+                    message=SimpleNamespace(content=content), finish_reason="stop"
+                )
+            ],
+            usage=usage,
+            model=self.model,
+        )
+
+    def forward(self, prompt: str | None = None, messages=None, **kwargs):
+        messages = messages or [{"role": "user", "content": prompt or ""}]
+        with self._lock:
+            latency = self._sample_latency()
+        time.sleep(latency)
+        return self._response(self._complete(messages), messages)
+
+    async def _stream(self, content: str, latency: float):
+        """
+        Send ``content`` to DSPy's active stream in small chunks spread over ``latency``.
+
+        Mirrors what a streaming provider does under ``dspy.streamify``, so
+        stream listeners see the output arrive token by token.
+        """
+        stream = dspy.settings.send_stream
+        caller = dspy.settings.caller_predict
+        pieces = [
+            content[i : i + STREAM_CHUNK_CHARS]
+            for i in range(0, len(content), STREAM_CHUNK_CHARS)
+        ]
+        for piece in pieces:
+            await asyncio.sleep(latency / len(pieces))
+            chunk = litellm.ModelResponseStream(
+                model=self.model,
+                choices=[
+                    litellm.utils.StreamingChoices(
+                        delta=litellm.utils.Delta(content=piece)
+                    )
+                ],
+            )
+            chunk.predict_id = id(caller) if caller else None
+            await stream.send(chunk)
+
+    async def aforward(self, prompt: str | None = None, messages=None, **kwargs):
+        messages = messages or [{"role": "user", "content": prompt or ""}]
+        with self._lock:
+            latency = self._sample_latency()
+        if dspy.settings.send_stream is None:
+            await asyncio.sleep(latency)
+            return self._response(self._complete(messages), messages)
+        content = self._complete(messages)
+        await self._stream(content, latency)
+        return self._response(content, messages)
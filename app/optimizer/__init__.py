@@ -0,0 +1,117 @@
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.optimizer.engine import Optimizer, optimize
+    from app.optimizer.jobs import JobQueue, get_job_queue, use_job_queue
+    from app.optimizer.noise import NoiseModel, ScoreEstimate
+    from app.optimizer.prefilter import MinHasher, PreFilter
+    from app.optimizer.scoring import Scorer, align_scores, rescore
+    from app.optimizer.store import ResultStore, get_result_store, normalize_input
+    from app.optimizer.strategies import (
+        MUTATION_PROMPTS,
+        STRATEGIES,
+        BeamSearch,
+        Proposal,
+        SearchStrategy,
+        SimulatedAnnealing,
+        SuccessiveHalving,
+        UCBBandit,
+        make_strategy,
+    )
+    from app.optimizer.types import (
+        DEFAULT_CATEGORIES,
+        Candidate,
+        OptimizationResult,
+        OptimizerConfig,
+        ProgressEvent,
+        Score,
+        total_score,
+    )
+    from app.optimizer.worker import Worker
+
+# Exported names resolve to their submodule on first access, so importing the
+# package (e.g. for OptimizerConfig) does not load DSPy; only the engine,
+# scoring and worker modules do.
+_EXPORTS = {
+    "Optimizer": "app.optimizer.engine",
+    "optimize": "app.optimizer.engine",
+    "JobQueue": "app.optimizer.jobs",
+    "get_job_queue": "app.optimizer.jobs",
+    "use_job_queue": "app.optimizer.jobs",
+    "NoiseModel": "app.optimizer.noise",
+    "ScoreEstimate": "app.optimizer.noise",
+    "MinHasher": "app.optimizer.prefilter",
+    "PreFilter": "app.optimizer.prefilter",
+    "Scorer": "app.optimizer.scoring",
+    "align_scores": "app.optimizer.scoring",
+    "rescore": "app.optimizer.scoring",
+    "ResultStore": "app.optimizer.store",
+    "get_result_store": "app.optimizer.store",
+    "normalize_input": "app.optimizer.store",
+    "BeamSearch": "app.optimizer.strategies",
+    "MUTATION_PROMPTS": "app.optimizer.strategies",
+    "Proposal": "app.optimizer.strategies",
+    "STRATEGIES": "app.optimizer.strategies",
+    "SearchStrategy": "app.optimizer.strategies",
+    "SimulatedAnnealing": "app.optimizer.strategies",
+    "SuccessiveHalving": "app.optimizer.strategies",
+    "UCBBandit": "app.optimizer.strategies",
+    "make_strategy": "app.optimizer.strategies",
+    "Candidate": "app.optimizer.types",
+    "DEFAULT_CATEGORIES": "app.optimizer.types",
+    "OptimizationResult": "app.optimizer.types",
+    "OptimizerConfig": "app.optimizer.types",
+    "ProgressEvent": "app.optimizer.types",
+    "Score": "app.optimizer.types",
+    "total_score": "app.optimizer.types",
+    "Worker": "app.optimizer.worker",
+}
+
+__all__ = [
+    "DEFAULT_CATEGORIES",
+    "MUTATION_PROMPTS",
+    "STRATEGIES",
+    "BeamSearch",
+    "Candidate",
+    "JobQueue",
+    "MinHasher",
+    "NoiseModel",
+    "OptimizationResult",
+    "Optimizer",
+    "OptimizerConfig",
+    "PreFilter",
+    "ProgressEvent",
+    "Proposal",
+    "ResultStore",
+    "Score",
+    "ScoreEstimate",
+    "Scorer",
+    "SearchStrategy",
+    "SimulatedAnnealing",
+    "SuccessiveHalving",
+    "UCBBandit",
+    "Worker",
+    "align_scores",
+    "get_job_queue",
+    "get_result_store",
+    "make_strategy",
+    "normalize_input",
+    "optimize",
+    "rescore",
+    "total_score",
+    "use_job_queue",
+]
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,3 @@
+from app.optimizer.cli import main
+
+main()
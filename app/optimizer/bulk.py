@@ -0,0 +1,270 @@
+import asyncio
+import contextlib
+import csv
+import hashlib
+import itertools
+import json
+import logging
+import os
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator
+from dataclasses import asdict, replace
+
+from app.dspy_modules import (
+    get_batch_evaluator,
+    get_batch_screener,
+    get_evaluator,
+    get_fast_batch_evaluator,
+    get_fast_evaluator,
+    get_generator,
+    get_mutator,
+    get_screener,
+    get_variant_generator,
+)
+from app.optimizer.engine import optimize
+from app.optimizer.types import OptimizerConfig
+from app.scheduler import Priority, current_priority, get_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+def input_id(text: str) -> str:
+    """Stable identifier for an input text, used for checkpointing."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def iter_inputs(path: str) -> Iterator[tuple[str, str]]:
+    """
+    Stream ``(input_id, input_text)`` pairs from ``path`` without loading it whole.
+
+    ``.jsonl`` files hold one object per line with an "input_text" key, ``.csv``
+    files need an "input_text" column; both may carry an "id". Any other file
+    is read as one input text per non-empty line.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(f):
+                text = (row.get("input_text") or "").strip()
+                if text:
+                    yield row.get("id") or input_id(text), text
+            return
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if path.endswith(".jsonl"):
+                record = json.loads(line)
+                text = record["input_text"]
+                yield str(record.get("id") or input_id(text)), text
+            else:
+                yield input_id(line), line
+
+
+async def _read_batches(
+    inputs: Iterable[tuple[str, str]], size: int
+) -> AsyncIterator[list[tuple[str, str]]]:
+    """Pull ``inputs`` ``size`` items at a time in a worker thread."""
+    iterator = iter(inputs)
+    while batch := await asyncio.to_thread(list, itertools.islice(iterator, size)):
+        yield batch
+
+
+@contextlib.contextmanager
+def _bulk_priority(max_calls_per_minute: int | None):
+    """Run at bulk priority under an optional request limit, restoring both after."""
+    scheduler = get_scheduler()
+    requests = scheduler.requests
+    token = current_priority.set(Priority.BULK)
+    if max_calls_per_minute:
+        scheduler.set_limits(requests_per_minute=max_calls_per_minute)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+        scheduler.requests = requests
+
+
+async def _put(queue: asyncio.Queue, item, workers: list[asyncio.Task]):
+    """
+    Put ``item`` on ``queue``, re-raising the error of any worker that dies first.
+
+    Without this a dead worker leaves the queue full and the producer
+    blocked forever.
+    """
+    put = asyncio.ensure_future(queue.put(item))
+    running = set(workers)
+    try:
+        while not put.done():
+            done, _ = await asyncio.wait(
+                {put, *running}, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done - {put}:
+                running.discard(task)
+                if not task.cancelled() and task.exception():
+                    raise task.exception()
+    finally:
+        put.cancel()
+
+
+class BulkRunner:
+    """
+    Stream many input texts through concurrent hill-climbing jobs.
+
+    Inputs are read lazily into a bounded queue consumed by
+    ``max_concurrent_jobs`` workers, all sharing the process-wide predictors
+    and LM scheduler at bulk priority, so interactive sessions in the same
+    process are served first. ``max_calls_per_minute`` caps the scheduler's
+    request rate; the priority and limit are restored when the run ends.
+    Each result is appended to ``output_path`` as soon as it finishes and its
+    input id to ``checkpoint_path``, so a crashed run resumes where it
+    stopped. Inputs are read in a worker thread, and a worker that fails to
+    write its result stops the whole run.
+    """
+
+    def __init__(
+        self,
+        template: OptimizerConfig,
+        output_path: str,
+        checkpoint_path: str | None = None,
+        max_concurrent_jobs: int = 4,
+        max_calls_per_minute: int | None = None,
+        report_every: float = 30.0,
+    ):
+        self.template = template
+        self.output_path = output_path
+        self.checkpoint_path = checkpoint_path or f"{output_path}.ckpt"
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.report_every = report_every
+        self.max_calls_per_minute = max_calls_per_minute
+        self.calls = 0
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.cost_usd = 0.0
+        self._started_at = 0.0
+
+    def _load_checkpoint(self) -> set[str]:
+        if not os.path.exists(self.checkpoint_path):
+            return set()
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+
+    @staticmethod
+    def _write(out, checkpoint, record: dict):
+        """Append ``record`` to the output and, if it succeeded, checkpoint its id."""
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+        if "error" not in record:
+            checkpoint.write(record["id"] + "\n")
+            checkpoint.flush()
+
+    def throughput(self) -> dict[str, float]:
+        """
+        Inputs and predictor calls per minute since the run started, and spend so far.
+
+        Calls and spend are taken from each finished input's RunMetrics.
+        """
+        minutes = max(time.monotonic() - self._started_at, 1e-9) / 60
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "inputs_per_min": self.completed / minutes,
+            "calls_per_min": self.calls / minutes,
+            "cost_usd": self.cost_usd,
+        }
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(self.report_every)
+            stats = self.throughput()
+            logger.info(
+                f"bulk: {stats['completed']} done, {stats['failed']} failed, "
+                f"{stats['inputs_per_min']:.1f} inputs/min, "
+                f"{stats['calls_per_min']:.1f} calls/min, "
+                f"${stats['cost_usd']:.4f} spent"
+            )
+
+    async def run(self, inputs: Iterable[tuple[str, str]]) -> dict[str, float]:
+        """
+        Optimize every ``(input_id, input_text)`` pair not already checkpointed.
+
+        Returns:
+            dict[str, float]: Final throughput statistics.
+        """
+        with _bulk_priority(self.max_calls_per_minute):
+            return await self._run(inputs)
+
+    async def _run(self, inputs: Iterable[tuple[str, str]]) -> dict[str, float]:
+        done = await asyncio.to_thread(self._load_checkpoint)
+        fast = self.template.fast_scorer
+        roles = [
+            ("generator", get_generator()),
+            ("mutator", get_mutator()),
+            ("evaluator", get_fast_evaluator() if fast else get_evaluator()),
+            (
+                "batch_evaluator",
+                get_fast_batch_evaluator() if fast else get_batch_evaluator(),
+            ),
+        ]
+        if self.template.variants_per_call > 1:
+            roles.append(("variant_generator", get_variant_generator()))
+        if self.template.cascade:
+            roles += [
+                ("screener", get_screener()),
+                ("batch_screener", get_batch_screener()),
+            ]
+        predictors = dict(roles)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrent_jobs * 2)
+        write_lock = asyncio.Lock()
+        self._started_at = time.monotonic()
+
+        # Opened, written and closed off the event loop, so slow disks do not
+        # stall the optimizations in flight.
+        out = await asyncio.to_thread(open, self.output_path, "a", encoding="utf-8")
+        checkpoint = await asyncio.to_thread(
+            open, self.checkpoint_path, "a", encoding="utf-8"
+        )
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                job_id, text = item
+                config = replace(self.template, input_text=text)
+                try:
+                    record = asdict(await optimize(config, **predictors))
+                    self.completed += 1
+                    self.calls += record["metrics"].get("calls", 0)
+                    self.cost_usd += record["metrics"].get("cost_usd", 0.0)
+                except Exception as e:
+                    logger.exception(f"Error optimizing input {job_id}")
+                    record = {"input_text": text, "error": str(e)}
+                    self.failed += 1
+                record["id"] = job_id
+                async with write_lock:
+                    await asyncio.to_thread(self._write, out, checkpoint, record)
+
+        workers = [
+            asyncio.create_task(worker()) for _ in range(self.max_concurrent_jobs)
+        ]
+        reporter = asyncio.create_task(self._report())
+        try:
+            async for batch in _read_batches(inputs, queue.maxsize):
+                for job_id, text in batch:
+                    if job_id in done:
+                        self.skipped += 1
+                        continue
+                    done.add(job_id)
+                    await _put(queue, (job_id, text), workers)
+            for _ in workers:
+                await _put(queue, None, workers)
+            await asyncio.gather(*workers)
+        finally:
+            reporter.cancel()
+            for task in workers:
+                task.cancel()
+            await asyncio.to_thread(out.close)
+            await asyncio.to_thread(checkpoint.close)
+        return self.throughput()
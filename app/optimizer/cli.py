@@ -0,0 +1,152 @@
+import argparse
+import asyncio
+import json
+import logging
+
+from app.metrics import start_metrics_server
+from app.optimizer.bulk import BulkRunner, iter_inputs
+from app.optimizer.strategies import STRATEGIES
+from app.optimizer.types import DEFAULT_CATEGORIES, OptimizerConfig
+
+logger = logging.getLogger(__name__)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.optimizer",
+        description=(
+            "Optimize a stream of input texts into tweets, appending JSONL results "
+            "as they finish. Re-running with the same output resumes from its checkpoint."
+        ),
+    )
+    parser.add_argument(
+        "input",
+        help="Text file (one input per line), JSONL file or CSV with an input_text column.",
+    )
+    parser.add_argument(
+        "-o", "--output", default="results.jsonl", help="JSONL file to append to."
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="File of completed input ids (default: <output>.ckpt).",
+    )
+    parser.add_argument(
+        "-c",
+        "--category",
+        action="append",
+        dest="categories",
+        help="Scoring category (repeatable). Defaults to the app's default categories.",
+    )
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--patience", type=int, default=3)
+    parser.add_argument("--population-size", type=int, default=1)
+    parser.add_argument("--beam-width", type=int, default=1)
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="beam")
+    parser.add_argument("--bypass-cache", action="store_true")
+    parser.add_argument(
+        "--no-warm-start",
+        dest="warm_start",
+        action="store_false",
+        help="Always generate a fresh initial tweet instead of reusing past runs.",
+    )
+    parser.add_argument(
+        "--noise-aware",
+        action="store_true",
+        help="Re-sample close scores and only accept statistically dominant improvements.",
+    )
+    parser.add_argument(
+        "--max-samples",
+        type=int,
+        default=4,
+        help="Evaluations per candidate allowed in noise-aware mode.",
+    )
+    parser.add_argument(
+        "--fast-scorer",
+        action="store_true",
+        help="Score with the no-reasoning evaluator: fewer tokens, noisier scores.",
+    )
+    parser.add_argument(
+        "--cascade",
+        action="store_true",
+        help="Screen mutations with the cheap screener model; only finalists reach the evaluator.",
+    )
+    parser.add_argument(
+        "--finalists",
+        type=int,
+        default=1,
+        help="Mutations per round passed from the screener to the evaluator in cascade mode.",
+    )
+    parser.add_argument(
+        "--speculative",
+        action="store_true",
+        help="Generate the next round's mutations while the current round is scored.",
+    )
+    parser.add_argument(
+        "--variants-per-call",
+        type=int,
+        default=1,
+        help="Mutations of the same parent generated per LLM call (1 = one call each).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Number of inputs optimized at the same time.",
+    )
+    parser.add_argument(
+        "--max-calls-per-minute",
+        type=int,
+        help="Global limit on LLM calls across all concurrent inputs.",
+    )
+    parser.add_argument(
+        "--report-every",
+        type=float,
+        default=30.0,
+        help="Seconds between throughput reports.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics while running.",
+    )
+    return parser
+
+
+async def run_cli(args: argparse.Namespace):
+    """Stream ``args.input`` through a BulkRunner and log final throughput."""
+    template = OptimizerConfig(
+        input_text="",
+        categories=args.categories or list(DEFAULT_CATEGORIES),
+        iterations=args.iterations,
+        patience=args.patience,
+        population_size=args.population_size,
+        beam_width=args.beam_width,
+        strategy=args.strategy,
+        bypass_cache=args.bypass_cache,
+        noise_aware=args.noise_aware,
+        warm_start=args.warm_start,
+        max_samples=args.max_samples,
+        fast_scorer=args.fast_scorer,
+        cascade=args.cascade,
+        cascade_finalists=args.finalists,
+        speculative=args.speculative,
+        variants_per_call=args.variants_per_call,
+    )
+    runner = BulkRunner(
+        template,
+        output_path=args.output,
+        checkpoint_path=args.checkpoint,
+        max_concurrent_jobs=args.concurrency,
+        max_calls_per_minute=args.max_calls_per_minute,
+        report_every=args.report_every,
+    )
+    stats = await runner.run(iter_inputs(args.input))
+    logger.info(f"bulk finished: {json.dumps(stats)}")
+
+
+def main(argv: list[str] | None = None):
+    logging.basicConfig(level=logging.INFO)
+    args = build_parser().parse_args(argv)
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+    asyncio.run(run_cli(args))
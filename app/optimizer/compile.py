@@ -0,0 +1,301 @@
+import argparse
+import json
+import logging
+import random
+from collections.abc import Callable
+
+import dspy
+from dspy.utils.exceptions import AdapterParseError
+
+from app.artifacts import get_artifact_store
+from app.dspy_modules import (
+    PROGRAM_LM_ROLES,
+    PROGRAMS,
+    get_evaluator,
+    get_lm,
+    parse_batch_scores,
+    parse_scores,
+)
+from app.optimizer.store import get_result_store
+from app.optimizer.types import total_score
+from app.score_memo import normalize_category
+
+COMPILE_ROLES = ("generator", "evaluator", "batch_evaluator")
+BATCH_SIZE = 4
+AGREEMENT_THRESHOLD = 7 / 8
+
+logger = logging.getLogger(__name__)
+
+
+def score_agreement(gold: list[dict], predicted: list[dict]) -> float:
+    """
+    How closely ``predicted`` scores match ``gold``, from 0 to 1.
+
+    One minus the mean absolute error over the gold categories, divided by
+    the width of the 1-9 scale; a missing category counts as the worst error.
+    """
+    if not gold:
+        return 0.0
+    got = {normalize_category(s["category"]): s["score"] for s in predicted}
+    errors = [
+        abs(got[name] - s["score"]) if name in got else 8
+        for s, name in ((s, normalize_category(s["category"])) for s in gold)
+    ]
+    return max(0.0, 1 - sum(errors) / len(errors) / 8)
+
+
+def evaluator_metric(example: dspy.Example, pred: dspy.Prediction, trace=None):
+    """Agreement with the stored scores; bootstrapped demos need MAE <= 1."""
+    agreement = score_agreement(example.scores, parse_scores(pred.scores))
+    return agreement >= AGREEMENT_THRESHOLD if trace is not None else agreement
+
+
+def batch_evaluator_metric(example: dspy.Example, pred: dspy.Prediction, trace=None):
+    """Mean agreement over the batch's tweets (0 if the output cannot be matched)."""
+    score_lists = parse_batch_scores(pred.scores, len(example.tweets))
+    if score_lists is None:
+        return False if trace is not None else 0.0
+    agreement = sum(
+        score_agreement(gold, predicted)
+        for gold, predicted in zip(example.scores, score_lists)
+    ) / len(example.tweets)
+    return agreement >= AGREEMENT_THRESHOLD if trace is not None else agreement
+
+
+def generator_metric(judge) -> Callable:
+    """
+    Judge generated tweets with the evaluator.
+
+    Scores the share of the maximum total the tweet reaches; bootstrapped
+    demos must match the best tweet stored for their input.
+    """
+
+    def metric(example: dspy.Example, pred: dspy.Prediction, trace=None):
+        tweet = getattr(pred, "tweet", "") or ""
+        total = 0.0
+        if tweet.strip() and len(tweet) <= 280:
+            try:
+                result = judge(tweet=tweet, categories="; ".join(example.categories))
+                total = total_score(parse_scores(result.scores))
+            except AdapterParseError as e:
+                total = total_score(parse_scores(e.lm_response))
+        if trace is not None:
+            return total >= example.best_total
+        return total / (9 * len(example.categories))
+
+    return metric
+
+
+def build_trainsets(runs: list[dict]) -> dict[str, list[dspy.Example]]:
+    """
+    Turn stored runs into training examples per role.
+
+    The generator learns from each input's best tweet, the evaluators from
+    every stored candidate's scores (batches of up to BATCH_SIZE candidates
+    of the same run for the batch evaluator). Repeated inputs and candidates
+    are used once, newest first.
+    """
+    generator, evaluator, batch = [], [], []
+    seen_inputs: set[tuple[str, str]] = set()
+    seen_candidates: set[tuple[str, str]] = set()
+    for run in runs:
+        candidates = [c for c in run["candidates"] if c["scores"]]
+        if not candidates:
+            continue
+        categories = "; ".join(run["categories"])
+        key = (" ".join(run["input_text"].lower().split()), categories)
+        if key not in seen_inputs:
+            seen_inputs.add(key)
+            generator.append(
+                dspy.Example(
+                    input_text=run["input_text"],
+                    tweet=candidates[0]["tweet"],
+                    categories=run["categories"],
+                    best_total=candidates[0]["total"],
+                ).with_inputs("input_text")
+            )
+        fresh = []
+        for candidate in candidates:
+            if (candidate["tweet"], categories) in seen_candidates:
+                continue
+            seen_candidates.add((candidate["tweet"], categories))
+            fresh.append(candidate)
+            evaluator.append(
+                dspy.Example(
+                    tweet=candidate["tweet"],
+                    categories=categories,
+                    scores=candidate["scores"],
+                ).with_inputs("tweet", "categories")
+            )
+        for i in range(0, len(fresh), BATCH_SIZE):
+            chunk = fresh[i : i + BATCH_SIZE]
+            if len(chunk) > 1:
+                batch.append(
+                    dspy.Example(
+                        tweets=[c["tweet"] for c in chunk],
+                        categories=categories,
+                        scores=[c["scores"] for c in chunk],
+                    ).with_inputs("tweets", "categories")
+                )
+    return {"generator": generator, "evaluator": evaluator, "batch_evaluator": batch}
+
+
+def make_teleprompter(name: str, metric: Callable, max_demos: int, threads: int):
+    """BootstrapFewShot ("bootstrap") or MIPROv2 light ("mipro")."""
+    if name == "mipro":
+        return dspy.MIPROv2(
+            metric=metric,
+            auto="light",
+            max_bootstrapped_demos=max_demos,
+            max_labeled_demos=max_demos,
+            num_threads=threads,
+        )
+    return dspy.BootstrapFewShot(
+        metric=metric,
+        max_bootstrapped_demos=max_demos,
+        max_labeled_demos=max_demos,
+    )
+
+
+def compile_role(
+    role: str,
+    examples: list[dspy.Example],
+    metric: Callable,
+    args: argparse.Namespace,
+    lm: dspy.BaseLM,
+) -> dict:
+    """
+    Compile ``role`` on ``examples`` and save it if it does not score worse.
+
+    The program runs on ``lm``, the model of its LM role, so demos are
+    bootstrapped from the model that will use them.
+
+    Returns:
+        dict: Dataset sizes, validation scores before and after, and the
+        saved version (None if the compiled program was not kept).
+    """
+    examples = list(examples)
+    random.Random(args.seed).shuffle(examples)
+    val_size = max(1, int(len(examples) * args.val_fraction))
+    valset, trainset = examples[:val_size], examples[val_size:]
+    evaluate = dspy.Evaluate(
+        devset=valset, metric=metric, num_threads=args.threads, display_progress=False
+    )
+    program = PROGRAMS[role]()
+    teleprompter = make_teleprompter(
+        args.optimizer, metric, args.max_demos, args.threads
+    )
+    with dspy.context(lm=lm):
+        baseline = evaluate(program).score
+        if args.optimizer == "mipro":
+            compiled = teleprompter.compile(
+                program, trainset=trainset, valset=valset, seed=args.seed
+            )
+        else:
+            compiled = teleprompter.compile(program, trainset=trainset)
+        score = evaluate(compiled).score
+    summary = {
+        "role": role,
+        "trainset": len(trainset),
+        "valset": len(valset),
+        "baseline_score": baseline,
+        "score": score,
+        "version": None,
+    }
+    if score < baseline and not args.force:
+        logger.warning(
+            f"Compiled {role} scored {score:.1f} < {baseline:.1f} uncompiled; not saved."
+        )
+        return summary
+    summary["version"] = get_artifact_store().save(
+        role,
+        compiled,
+        {
+            "optimizer": args.optimizer,
+            "max_demos": args.max_demos,
+            "model": lm.model,
+            "dspy_version": dspy.__version__,
+            **{
+                k: summary[k] for k in ("trainset", "valset", "baseline_score", "score")
+            },
+        },
+    )
+    return summary
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.optimizer.compile",
+        description=(
+            "Compile the generator and evaluator prompts offline from stored run "
+            "history and save them as versioned artifacts the app loads at startup."
+        ),
+    )
+    parser.add_argument(
+        "--roles", nargs="+", choices=COMPILE_ROLES, default=list(COMPILE_ROLES)
+    )
+    parser.add_argument(
+        "--optimizer",
+        choices=["bootstrap", "mipro"],
+        default="bootstrap",
+        help="BootstrapFewShot (few demos, cheap) or MIPROv2 light (also rewrites instructions).",
+    )
+    parser.add_argument("--max-demos", type=int, default=4)
+    parser.add_argument(
+        "--max-runs",
+        type=int,
+        default=500,
+        help="Most recent stored runs to learn from.",
+    )
+    parser.add_argument("--min-examples", type=int, default=10)
+    parser.add_argument("--val-fraction", type=float, default=0.2)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Save the compiled program even if it scores worse than uncompiled.",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only report the dataset sizes."
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None):
+    logging.basicConfig(level=logging.INFO)
+    args = build_parser().parse_args(argv)
+    trainsets = build_trainsets(get_result_store().history(args.max_runs))
+    if args.dry_run:
+        logger.info(
+            f"compile dataset sizes: {json.dumps({r: len(trainsets[r]) for r in args.roles})}"
+        )
+        return
+    judge = get_evaluator()
+    metrics = {
+        "generator": generator_metric(judge),
+        "evaluator": evaluator_metric,
+        "batch_evaluator": batch_evaluator_metric,
+    }
+    results = []
+    for role in args.roles:
+        if len(trainsets[role]) < args.min_examples:
+            logger.warning(
+                f"Skipping {role}: {len(trainsets[role])} examples, "
+                f"need at least {args.min_examples}."
+            )
+            continue
+        results.append(
+            compile_role(
+                role,
+                trainsets[role],
+                metrics[role],
+                args,
+                get_lm(PROGRAM_LM_ROLES[role]),
+            )
+        )
+    logger.info(f"compile finished: {json.dumps(results)}")
+
+
+if __name__ == "__main__":
+    main()
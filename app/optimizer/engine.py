@@ -0,0 +1,588 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+from dspy.utils.exceptions import AdapterParseError
+
+from app.dspy_modules import (
+    get_batch_evaluator,
+    get_batch_screener,
+    get_evaluator,
+    get_fast_batch_evaluator,
+    get_fast_evaluator,
+    get_generator,
+    get_mutator,
+    get_screener,
+    get_variant_generator,
+    parse_variants,
+)
+from app.metrics import RunMetrics
+from app.optimizer.noise import NoiseModel
+from app.optimizer.prefilter import PreFilter
+from app.optimizer.scoring import Scorer
+from app.optimizer.store import ResultStore, get_result_store
+from app.optimizer.strategies import Proposal, SearchStrategy, make_strategy
+from app.optimizer.types import (
+    Candidate,
+    OptimizationResult,
+    OptimizerConfig,
+    ProgressEvent,
+)
+from app.score_memo import ScoreMemo, get_score_memo
+
+logger = logging.getLogger(__name__)
+
+
+class Optimizer:
+    """
+    Headless tweet hill climber.
+
+    Each round the strategy proposes ``population_size`` mutations (a parent
+    and optionally an instruction for the mutator), they are generated
+    concurrently, and the strategy scores them through a Scorer (memoized per
+    category, one batch evaluator call for what is missing). Finished runs
+    are saved to the ResultStore and every predictor call is recorded in
+    ``metrics``.
+
+    ``run`` yields a ProgressEvent after every step so callers (the Reflex
+    state, the CLI, benchmarks) can follow along. ``stop`` ends the run after
+    the round in flight; ``cancel`` ends it at once, aborting every LLM
+    request in flight. When ``on_partial`` is given, the initial tweet and
+    the first non-speculative mutation of each round stream their text into
+    it while they are generated.
+
+    The config options change a round as follows:
+
+    - ``warm_start``: the run starts from the best tweets known for the same
+      or a similar input.
+    - ``noise_aware``: a NoiseModel re-samples close calls and only
+      statistically dominant children can replace the best tweet.
+    - ``fast_scorer``: the default evaluators are the no-reasoning ones.
+    - ``cascade``: a Scorer on the cheap screener model ranks the mutations
+      first and only the top ``cascade_finalists`` go on to the evaluator.
+    - ``speculative``: the next round's mutations are generated while this
+      one is scored, from the proposals the strategy would make if the round
+      changed nothing; those whose parent is no longer proposed are
+      cancelled.
+    - ``variants_per_call`` above 1: mutations of the same parent are
+      requested that many per variant generator call, each keeping its own
+      instruction; variants that repeat the parent or each other are
+      dropped.
+    """
+
+    def __init__(
+        self,
+        config: OptimizerConfig,
+        strategy: SearchStrategy | None = None,
+        generator=None,
+        mutator=None,
+        variant_generator=None,
+        evaluator=None,
+        batch_evaluator=None,
+        screener=None,
+        batch_screener=None,
+        memo: ScoreMemo | None = None,
+        prefilter: PreFilter | None = None,
+        store: ResultStore | None = None,
+        on_partial: Callable[[str, bool], Awaitable[None]] | None = None,
+    ):
+        self.config = config
+        self.strategy = strategy or make_strategy(
+            config.strategy, beam_width=config.beam_width
+        )
+        self.generator = generator
+        self.mutator = mutator
+        self.variant_generator = variant_generator
+        self.evaluator = evaluator
+        self.batch_evaluator = batch_evaluator
+        self.screener = screener
+        self.batch_screener = batch_screener
+        self.memo = memo
+        self.prefilter = prefilter or (PreFilter() if config.prefilter else None)
+        self.store = store
+        self.on_partial = on_partial
+        self.scorer: Scorer | None = None
+        self.screen_scorer: Scorer | None = None
+        self.screened_out = 0
+        self.variants_dropped = 0
+        self.noise: NoiseModel | None = None
+        self.metrics = RunMetrics()
+        self._candidates: dict[str, Candidate] = {}
+        self.speculation_used = 0
+        self.speculation_discarded = 0
+        self._speculation: dict[str, list[tuple[Proposal, asyncio.Task]]] = {}
+        self._inflight: set[asyncio.Task] = set()
+        self._semaphore = asyncio.Semaphore(config.max_parallel_calls)
+        self._stopped = False
+        self._cancelled = False
+
+    def stop(self):
+        """Ask the run to finish after the current round."""
+        self._stopped = True
+
+    def cancel(self):
+        """
+        End the run now, cancelling every generation and evaluation in flight.
+
+        The run still records what it found and yields its "finished" event
+        with the best candidate so far; cancelled before its first candidate
+        was scored, it ends without yielding anything more.
+        """
+        self._stopped = self._cancelled = True
+        for task in list(self._inflight):
+            task.cancel()
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """Run ``coro`` as a task that ``cancel`` can abort."""
+        task = asyncio.create_task(coro)
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+        return task
+
+    async def _generate(
+        self,
+        parent: str,
+        fresh_sample: bool = True,
+        stream: bool = False,
+        instruction: str | None = None,
+    ) -> str:
+        """
+        Generate one mutation of ``parent``.
+
+        Generation only reads and writes the prediction cache when
+        ``fresh_sample`` is False (the initial tweet), since cached mutations
+        would all be identical.
+        With ``stream``, partial text is forwarded to ``on_partial``. An
+        ``instruction`` routes the rewrite through the mutator.
+        """
+        predictor = self.generator
+        inputs = {"input_text": parent}
+        if instruction is not None:
+            predictor = self.mutator
+            inputs["instruction"] = instruction
+        async with self._semaphore:
+            result = await predictor.acall(
+                bypass_cache=self.config.bypass_cache or fresh_sample,
+                store=not fresh_sample,
+                run_metrics=self.metrics,
+                on_partial=self.on_partial if stream else None,
+                **inputs,
+            )
+        return result.tweet
+
+    async def _generate_variants(
+        self, parent: str, instructions: list[str | None]
+    ) -> list[str | None]:
+        """
+        Generate one distinct mutation of ``parent`` per instruction in one call.
+
+        Malformed output is salvaged from the raw response rather than
+        aborting the round.
+
+        Returns:
+            list[str | None]: A tweet per instruction, in order; None where
+            the variant was missing or repeated the parent or another variant.
+        """
+        async with self._semaphore:
+            try:
+                result = await self.variant_generator.acall(
+                    bypass_cache=True,
+                    store=False,
+                    run_metrics=self.metrics,
+                    input_text=parent,
+                    variant_instructions=[
+                        instruction or "" for instruction in instructions
+                    ],
+                )
+                raw = result.tweets
+            except AdapterParseError as e:
+                raw = e.lm_response
+        variants = parse_variants(raw, parent, len(instructions))
+        self.variants_dropped += variants.count(None)
+        return variants
+
+    @staticmethod
+    async def _pick(group: asyncio.Task, index: int) -> str | None:
+        # Shielded, so cancelling one variant's task leaves its siblings'.
+        return (await asyncio.shield(group))[index]
+
+    def _split(self, group: asyncio.Task, count: int) -> list[asyncio.Task]:
+        """One task per variant of ``group``; the call is cancelled once all of them are."""
+        picks = [self._spawn(self._pick(group, i)) for i in range(count)]
+
+        def release(_):
+            if all(pick.cancelled() for pick in picks):
+                group.cancel()
+
+        for pick in picks:
+            pick.add_done_callback(release)
+        group.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return picks
+
+    def _launch(
+        self, proposals: list[Proposal], stream: bool = False
+    ) -> list[asyncio.Task]:
+        """
+        Start generating ``proposals``: one task per proposal, in order.
+
+        With ``variants_per_call`` above 1, proposals sharing a parent are
+        chunked into variant generator calls; a lone proposal still goes
+        through the generator or mutator. With ``stream``, the first of
+        those streams its text.
+        """
+        size = max(1, self.config.variants_per_call)
+        tasks: list[asyncio.Task | None] = [None] * len(proposals)
+        chunks: list[list[int]] = []
+        if size > 1:
+            by_parent: dict[str, list[int]] = {}
+            for i, proposal in enumerate(proposals):
+                by_parent.setdefault(proposal.parent["tweet"], []).append(i)
+            for indices in by_parent.values():
+                chunks += [indices[i : i + size] for i in range(0, len(indices), size)]
+        else:
+            chunks = [[i] for i in range(len(proposals))]
+        for chunk in chunks:
+            parent = proposals[chunk[0]].parent["tweet"]
+            if len(chunk) == 1:
+                tasks[chunk[0]] = self._spawn(
+                    self._generate(
+                        parent,
+                        stream=stream,
+                        instruction=proposals[chunk[0]].instruction,
+                    )
+                )
+                stream = False
+                continue
+            group = self._spawn(
+                self._generate_variants(
+                    parent, [proposals[i].instruction for i in chunk]
+                )
+            )
+            for i, task in zip(chunk, self._split(group, len(chunk))):
+                tasks[i] = task
+        return tasks
+
+    def _speculate(self, proposals: list[Proposal]):
+        """Start generating ``proposals`` ahead of the round that will need them."""
+        for proposal, task in zip(proposals, self._launch(proposals)):
+            self._speculation.setdefault(proposal.parent["tweet"], []).append(
+                (proposal, task)
+            )
+
+    def _discard_speculation(self):
+        """Cancel speculative generations no round is going to use."""
+        for pending in self._speculation.values():
+            for _, task in pending:
+                task.cancel()
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                self.speculation_discarded += 1
+        self._speculation.clear()
+
+    def _drop_failures(self, results: list) -> list[str | None]:
+        """
+        Replace failed generations with None so the round keeps the rest.
+
+        Returns:
+            list[str | None]: The generated tweets, None where a task raised.
+        """
+        tweets = []
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning("Mutation failed: %r", result)
+                tweets.append(None)
+            else:
+                tweets.append(result)
+        return tweets
+
+    def _generation_tasks(
+        self, proposals: list[Proposal]
+    ) -> tuple[list[Proposal], list[asyncio.Task]]:
+        """
+        One generation task per proposal, reusing speculative ones where possible.
+
+        A speculative generation replaces a proposal with the same parent
+        (keeping its own instruction, so strategies credit the right one).
+        The first proposal generated from scratch streams its text; leftover
+        speculation is discarded.
+
+        Returns:
+            tuple[list[Proposal], list[asyncio.Task]]: The round's proposals
+            and their generation tasks, in the same order.
+        """
+        planned = []
+        tasks: list[asyncio.Task | None] = []
+        fresh = []
+        for proposal in proposals:
+            pending = self._speculation.get(proposal.parent["tweet"])
+            if pending:
+                speculative, task = pending.pop(0)
+                planned.append(Proposal(proposal.parent, speculative.instruction))
+                tasks.append(task)
+                self.speculation_used += 1
+                continue
+            fresh.append(len(planned))
+            planned.append(proposal)
+            tasks.append(None)
+        launched = self._launch([planned[i] for i in fresh], stream=True)
+        for i, task in zip(fresh, launched):
+            tasks[i] = task
+        self._discard_speculation()
+        return planned, tasks
+
+    @property
+    def evaluations_saved(self) -> int:
+        """Candidates skipped by the pre-filter so far this run."""
+        return self.prefilter.evaluations_saved if self.prefilter else 0
+
+    async def _score_tweets(self, tweets: list[str]) -> list[Candidate]:
+        """Score ``tweets`` on the run's categories."""
+        return await self.scorer.score(tweets, self.config.categories)
+
+    async def _screen(self, tweets: list[str]) -> list[str]:
+        """Keep the ``cascade_finalists`` tweets the screener scores highest."""
+        finalists = max(1, self.config.cascade_finalists)
+        if self.screen_scorer is None or len(tweets) <= finalists:
+            return tweets
+        screened = await self.screen_scorer.score(tweets, self.config.categories)
+        kept = {
+            c["tweet"]
+            for c in sorted(screened, key=lambda c: c["total"], reverse=True)[
+                :finalists
+            ]
+        }
+        self.screened_out += len(tweets) - len(kept)
+        return [tweet for tweet in tweets if tweet in kept]
+
+    async def _evaluate(self, tweets: list[str | None]) -> list[Candidate]:
+        """
+        Pre-filter a round's mutations and let the strategy score the rest.
+
+        In cascade mode only the screener's finalists reach the strategy. In
+        noise-aware mode, children that look better than the current best
+        but do not dominate it statistically are dropped.
+        """
+        tweets = [tweet for tweet in tweets if tweet]
+        if self.prefilter is not None:
+            tweets = self.prefilter.filter(tweets)
+        tweets = await self._screen(tweets)
+        if not tweets:
+            return []
+        population = await self.strategy.evaluate(
+            tweets, self.scorer, self.config.categories
+        )
+        if self.noise is not None:
+            population = await self.noise.settle(population, self.strategy.best)
+        return population
+
+    async def _warm_start_tweets(self) -> list[str]:
+        """Best known tweets for this input and category set, if warm starts apply."""
+        if not self.config.warm_start or self.config.bypass_cache:
+            return []
+        return await asyncio.to_thread(
+            self.store.best_tweets, self.config.input_text, self.config.categories
+        )
+
+    def _remember(self, population: list[Candidate]):
+        for candidate in population:
+            self._candidates[candidate["tweet"]] = candidate
+
+    async def _save_run(self, keep: int = 10):
+        """Record the run's top ``keep`` candidates in the result store."""
+        top = sorted(self._candidates.values(), key=lambda c: c["total"], reverse=True)[
+            :keep
+        ]
+        try:
+            await asyncio.to_thread(
+                self.store.record_run,
+                self.config.input_text,
+                self.config.categories,
+                getattr(self.evaluator, "model", ""),
+                top,
+            )
+        except Exception:
+            logger.exception("Could not save optimization run")
+
+    @staticmethod
+    def _attach_children(
+        proposals: list[Proposal], tweets: list[str], population: list[Candidate]
+    ):
+        """Record on each proposal the scored candidate it produced, if any."""
+        by_tweet = {candidate["tweet"]: candidate for candidate in population}
+        for proposal, tweet in zip(proposals, tweets):
+            proposal.child = by_tweet.get(tweet)
+
+    async def run(self) -> AsyncIterator[ProgressEvent]:
+        """
+        Run the hill climb, yielding progress events as it goes.
+
+        Yields:
+            ProgressEvent: "initial", then "iteration_started"/"iteration" per
+            round, then "finished" with the best candidate found.
+        """
+        config = self.config
+        self.generator = self.generator or get_generator()
+        self.mutator = self.mutator or get_mutator()
+        if config.variants_per_call > 1:
+            self.variant_generator = self.variant_generator or get_variant_generator()
+        if config.fast_scorer:
+            self.evaluator = self.evaluator or get_fast_evaluator()
+            self.batch_evaluator = self.batch_evaluator or get_fast_batch_evaluator()
+        else:
+            self.evaluator = self.evaluator or get_evaluator()
+            self.batch_evaluator = self.batch_evaluator or get_batch_evaluator()
+        self.scorer = Scorer(
+            self.evaluator,
+            self.batch_evaluator,
+            self._semaphore,
+            memo=self.memo or get_score_memo(),
+            bypass_cache=config.bypass_cache,
+            run_metrics=self.metrics,
+            variant="fast" if config.fast_scorer else "",
+        )
+        if config.cascade:
+            self.screener = self.screener or get_screener()
+            self.batch_screener = self.batch_screener or get_batch_screener()
+            self.screen_scorer = Scorer(
+                self.screener,
+                self.batch_screener,
+                self._semaphore,
+                memo=self.memo or get_score_memo(),
+                bypass_cache=config.bypass_cache,
+                run_metrics=self.metrics,
+                variant="screen",
+            )
+
+        self.store = self.store or get_result_store()
+        try:
+            seeds = await self._spawn(self._warm_start_tweets())
+            if seeds:
+                seeded = await self._spawn(self._score_tweets(seeds))
+                initial = max(seeded, key=lambda c: c["total"])
+            else:
+                initial_tweet = await self._spawn(
+                    self._generate(config.input_text, fresh_sample=False, stream=True)
+                )
+                seeded = [initial] = await self._spawn(
+                    self._score_tweets([initial_tweet])
+                )
+        except asyncio.CancelledError:
+            if not self._cancelled:
+                self.cancel()
+                raise
+            # Cancelled before there was a candidate: nothing to report.
+            return
+        self._remember(seeded)
+        if config.noise_aware:
+            self.noise = NoiseModel(
+                self.scorer,
+                config.categories,
+                confidence=config.confidence,
+                max_samples=config.max_samples,
+            )
+            initial = self.noise.track(initial).candidate
+        if self.prefilter is not None:
+            for candidate in seeded:
+                self.prefilter.observe(candidate["tweet"])
+        self.strategy.reset(initial)
+        yield ProgressEvent(
+            "initial",
+            current=initial,
+            best=initial,
+            metrics=self.metrics.summary(),
+            warm_start=len(seeds),
+        )
+
+        patience_counter = 0
+        iteration = 0
+        for i in range(config.iterations):
+            if self._stopped:
+                break
+            iteration = i + 1
+            yield ProgressEvent(
+                "iteration_started",
+                iteration=iteration,
+                best=self.strategy.best,
+                patience_counter=patience_counter,
+            )
+            best_tweet = self.strategy.best["tweet"]
+            proposals, tasks = self._generation_tasks(
+                self.strategy.propose(config.population_size)
+            )
+            try:
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+                if self._cancelled:
+                    break
+                tweets = self._drop_failures(results)
+                if config.speculative and iteration < config.iterations:
+                    self._speculate(self.strategy.propose(config.population_size))
+                population = await self._spawn(self._evaluate(tweets))
+            except asyncio.CancelledError:
+                if not self._cancelled:
+                    self.cancel()
+                    raise
+                break
+            except Exception:
+                self.cancel()
+                raise
+            self._remember(population)
+            self.strategy.observe(population)
+            self._attach_children(proposals, tweets, population)
+            self.strategy.feedback(proposals)
+            improved = self.strategy.best["tweet"] != best_tweet
+            patience_counter = 0 if improved else patience_counter + 1
+            yield ProgressEvent(
+                "iteration",
+                iteration=iteration,
+                current=max(population, key=lambda c: c["total"], default=None),
+                best=self.strategy.best,
+                improved=improved,
+                patience_counter=patience_counter,
+                evaluations_saved=self.evaluations_saved,
+                screened_out=self.screened_out,
+                metrics=self.metrics.summary(),
+            )
+            if patience_counter >= config.patience:
+                break
+
+        self._discard_speculation()
+        await self._save_run()
+        yield ProgressEvent(
+            "finished",
+            iteration=iteration,
+            best=self.strategy.best,
+            patience_counter=patience_counter,
+            evaluations_saved=self.evaluations_saved,
+            screened_out=self.screened_out,
+            metrics=self.metrics.summary(),
+        )
+
+
+async def optimize(config: OptimizerConfig, **kwargs) -> OptimizationResult:
+    """
+    Run an Optimizer to completion and return its result.
+
+    Args:
+        config: Run settings.
+        **kwargs: Passed through to Optimizer (strategy or predictor overrides).
+
+    Returns:
+        OptimizationResult: Best candidate and how the run ended.
+
+    Raises:
+        RuntimeError: If the run ended before scoring the initial tweet.
+    """
+    optimizer = Optimizer(config, **kwargs)
+    last: ProgressEvent | None = None
+    async for event in optimizer.run():
+        last = event
+    if last is None:
+        raise RuntimeError("Optimization ended before scoring the initial tweet")
+    return OptimizationResult(
+        input_text=config.input_text,
+        best=last.best,
+        iterations_run=last.iteration,
+        stopped_early=last.iteration < config.iterations,
+        evaluations_saved=last.evaluations_saved,
+        screened_out=last.screened_out,
+        metrics=last.metrics,
+    )
@@ -0,0 +1,281 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import asdict
+
+from app.optimizer.types import OptimizerConfig, ProgressEvent
+
+DEFAULT_QUEUE_PATH = ".cache/jobs.sqlite3"
+DEFAULT_LEASE_S = 60.0
+JOB_POLL_INTERVAL_S = 0.2
+TERMINAL_STATUSES = ("finished", "failed", "cancelled")
+
+
+def use_job_queue() -> bool:
+    """Whether UI runs go through the job queue (TWEET_JOB_QUEUE=1) instead of in-process."""
+    return os.getenv("TWEET_JOB_QUEUE", "").strip().lower() in ("1", "true", "yes")
+
+
+class JobQueue:
+    """
+    Durable queue of optimization runs shared by web and worker processes.
+
+    A job is an OptimizerConfig; workers claim queued jobs, stream their
+    ProgressEvents back into the queue and mark them finished or failed.
+    Claimed jobs hold a lease renewed by ``heartbeat``: a job whose worker
+    stopped renewing for ``lease_s`` seconds (e.g. it was restarted) is
+    claimed again by another worker, up to ``max_attempts`` times. The
+    latest partial tweet text is kept on the job itself, overwritten on
+    every update, so streaming costs no event rows.
+
+    Backed by SQLite in WAL mode, which serves every process on one host
+    (or on a shared volume); the same methods are the seam for a networked
+    backend.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_QUEUE_PATH,
+        lease_s: float = DEFAULT_LEASE_S,
+        max_attempts: int = 3,
+    ):
+        self.path = path
+        self.lease_s = lease_s
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, config TEXT NOT NULL, status TEXT NOT NULL, "
+            "worker TEXT, attempts INTEGER NOT NULL DEFAULT 0, heartbeat REAL, "
+            "cancel_requested INTEGER NOT NULL DEFAULT 0, partial TEXT, error TEXT, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);"
+            "CREATE TABLE IF NOT EXISTS job_events ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT NOT NULL, "
+            "event TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS job_events_job ON job_events (job_id, seq);"
+        )
+        self._conn.commit()
+
+    def enqueue(self, config: OptimizerConfig) -> str:
+        """Queue a run of ``config``; returns its job id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, config, status, created_at, updated_at) "
+                "VALUES (?, ?, 'queued', ?, ?)",
+                (job_id, json.dumps(asdict(config)), now, now),
+            )
+            self._conn.commit()
+        return job_id
+
+    def claim(self, worker: str) -> tuple[str, OptimizerConfig] | None:
+        """
+        Claim the oldest queued job (or one whose lease expired) for ``worker``.
+
+        Jobs whose lease expired after ``max_attempts`` claims are failed
+        instead of being retried again, and cancelled ones are closed.
+
+        Returns:
+            tuple[str, OptimizerConfig] | None: The job id and its config,
+            or None if there is nothing to run.
+        """
+        now = time.time()
+        stale = now - self.lease_s
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = CASE WHEN cancel_requested THEN 'cancelled' "
+                "ELSE 'failed' END, error = CASE WHEN cancel_requested THEN NULL "
+                "ELSE 'Worker lost' END, updated_at = ? WHERE status = 'running' "
+                "AND heartbeat < ? AND (attempts >= ? OR cancel_requested)",
+                (now, stale, self.max_attempts),
+            )
+            row = self._conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, heartbeat = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ("
+                "SELECT id FROM jobs WHERE (status = 'queued' OR "
+                "(status = 'running' AND heartbeat < ?)) AND cancel_requested = 0 "
+                "ORDER BY created_at LIMIT 1) RETURNING id, config",
+                (worker, now, now, stale),
+            ).fetchone()
+            self._conn.commit()
+        if row is None:
+            return None
+        return row[0], OptimizerConfig(**json.loads(row[1]))
+
+    def heartbeat(self, job_id: str, worker: str) -> bool:
+        """
+        Renew ``worker``'s lease on a running job.
+
+        Returns:
+            bool: False if the job was cancelled or claimed by another
+            worker, so the run should stop.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE id = ? AND worker = ? "
+                "AND status = 'running' AND cancel_requested = 0",
+                (time.time(), job_id, worker),
+            )
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def cancel_requested(self, job_id: str) -> bool:
+        """Whether the job was asked to cancel (a cheap read, unlike ``heartbeat``)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def publish(self, job_id: str, event: ProgressEvent):
+        """Append a progress event to the job's stream."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO job_events (job_id, event) VALUES (?, ?)",
+                (job_id, json.dumps(asdict(event))),
+            )
+            self._conn.execute(
+                "UPDATE jobs SET partial = NULL, updated_at = ? WHERE id = ?",
+                (time.time(), job_id),
+            )
+            self._conn.commit()
+
+    def set_partial(self, job_id: str, text: str):
+        """Replace the job's partial tweet text (the tweet being generated)."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET partial = ? WHERE id = ?", (text, job_id)
+            )
+            self._conn.commit()
+
+    def finish(self, job_id: str, worker: str, error: str | None = None):
+        """Mark ``worker``'s job finished, failed (with ``error``) or cancelled."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = CASE WHEN ? IS NOT NULL THEN 'failed' "
+                "WHEN cancel_requested THEN 'cancelled' ELSE 'finished' END, "
+                "error = ?, partial = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (error, error, time.time(), job_id, worker),
+            )
+            self._conn.commit()
+
+    def cancel(self, job_id: str):
+        """Cancel a job: a queued job ends now, a running one once its worker notices."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = ?, "
+                "status = CASE WHEN status = 'queued' THEN 'cancelled' ELSE status END "
+                "WHERE id = ?",
+                (time.time(), job_id),
+            )
+            self._conn.commit()
+
+    def job(self, job_id: str) -> dict | None:
+        """
+        Current state of a job.
+
+        Returns:
+            dict | None: ``{"status", "worker", "attempts", "partial",
+            "error"}``, or None for an unknown job id.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, worker, attempts, partial, error FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("status", "worker", "attempts", "partial", "error"), row))
+
+    def events(self, job_id: str, after: int = 0) -> list[tuple[int, ProgressEvent]]:
+        """The job's progress events with a sequence number above ``after``, in order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, event FROM job_events WHERE job_id = ? AND seq > ? "
+                "ORDER BY seq",
+                (job_id, after),
+            ).fetchall()
+        return [(seq, ProgressEvent(**json.loads(event))) for seq, event in rows]
+
+    def prune(self, max_age_s: float = 86400.0) -> int:
+        """Delete ended jobs (and their events) last updated over ``max_age_s`` ago."""
+        cutoff = time.time() - max_age_s
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM job_events WHERE job_id IN (SELECT id FROM jobs "
+                "WHERE status IN ('finished', 'failed', 'cancelled') AND updated_at < ?)",
+                (cutoff,),
+            )
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('finished', 'failed', 'cancelled') "
+                "AND updated_at < ?",
+                (cutoff,),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    async def follow(
+        self,
+        job_id: str,
+        on_partial: Callable[[str, bool], Awaitable[None]] | None = None,
+        poll_interval: float = JOB_POLL_INTERVAL_S,
+    ) -> AsyncIterator[ProgressEvent]:
+        """
+        Yield a job's progress events as workers publish them, until it ends.
+
+        Partial tweet text is passed to ``on_partial`` whenever it changes.
+
+        Raises:
+            RuntimeError: If the job failed or does not exist.
+        """
+        seq = 0
+        partial = None
+        while True:
+            job = await asyncio.to_thread(self.job, job_id)
+            if job is None:
+                raise RuntimeError(f"Unknown job {job_id}")
+            for event_seq, event in await asyncio.to_thread(self.events, job_id, seq):
+                seq = event_seq
+                yield event
+            if job["status"] in TERMINAL_STATUSES:
+                if job["status"] == "failed":
+                    raise RuntimeError(job["error"] or "Job failed")
+                return
+            if on_partial is not None and job["partial"] not in (None, partial):
+                partial = job["partial"]
+                await on_partial(partial, False)
+            await asyncio.sleep(poll_interval)
+
+
+_queue: JobQueue | None = None
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Get or create the process-wide optimization job queue.
+
+    Stored at TWEET_JOB_QUEUE_PATH (default .cache/jobs.sqlite3), with leases
+    of TWEET_JOB_LEASE_S seconds (default 60).
+
+    Returns:
+        JobQueue: Shared job queue.
+    """
+    global _queue
+    if _queue is None:
+        _queue = JobQueue(
+            os.getenv("TWEET_JOB_QUEUE_PATH", DEFAULT_QUEUE_PATH),
+            lease_s=float(os.getenv("TWEET_JOB_LEASE_S", str(DEFAULT_LEASE_S))),
+        )
+    return _queue
@@ -0,0 +1,146 @@
+import math
+import statistics
+from dataclasses import dataclass, field
+
+from app.optimizer.scoring import Scorer
+from app.optimizer.types import Candidate
+
+
+@dataclass
+class ScoreEstimate:
+    """Every evaluation sample taken of one tweet."""
+
+    candidate: Candidate
+    totals: list[float] = field(default_factory=list)
+    category_sums: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def n(self) -> int:
+        return len(self.totals)
+
+    @property
+    def mean(self) -> float:
+        return statistics.fmean(self.totals)
+
+    def add(self, sample: Candidate):
+        """Fold one evaluation into the estimate and refresh ``candidate`` in place."""
+        self.totals.append(sample["total"])
+        for score in sample["scores"]:
+            self.category_sums[score["category"]] = (
+                self.category_sums.get(score["category"], 0.0) + score["score"]
+            )
+        self.candidate["scores"] = [
+            {"category": category, "score": round(total / self.n, 2)}
+            for category, total in self.category_sums.items()
+        ]
+        self.candidate["total"] = round(self.mean, 2)
+
+
+class NoiseModel:
+    """
+    Repeated-sampling estimate of evaluator noise for one run.
+
+    Every scored candidate is tracked with its running mean total. The
+    evaluator's noise is estimated as the pooled standard deviation of all
+    tweets sampled more than once (``prior_sd`` until ``min_dof`` degrees of
+    freedom have been seen). A challenger is accepted over the incumbent only
+    when it dominates it statistically: the mean difference exceeds ``z``
+    standard errors at one-sided ``confidence``. While the two are within
+    that margin, whichever has fewer samples is re-evaluated, up to
+    ``max_samples`` each.
+
+    Tracked candidate dicts are updated in place with their mean scores, so
+    a strategy holding them always sees the current estimate.
+    """
+
+    def __init__(
+        self,
+        scorer: Scorer,
+        categories: list[str],
+        confidence: float = 0.9,
+        max_samples: int = 4,
+        prior_sd: float = 1.0,
+        min_dof: int = 3,
+    ):
+        self.scorer = scorer
+        self.categories = categories
+        self.z = statistics.NormalDist().inv_cdf(confidence)
+        self.max_samples = max(1, max_samples)
+        self.prior_sd = prior_sd
+        self.min_dof = min_dof
+        self.resamples = 0
+        self._estimates: dict[str, ScoreEstimate] = {}
+
+    def track(self, candidate: Candidate) -> ScoreEstimate:
+        """Start (or continue) tracking ``candidate``, counting its current scores as a sample."""
+        estimate = self._estimates.get(candidate["tweet"])
+        if estimate is None:
+            estimate = ScoreEstimate(candidate)
+            self._estimates[candidate["tweet"]] = estimate
+            estimate.add(dict(candidate))
+        return estimate
+
+    def noise_sd(self) -> float:
+        """Pooled per-sample standard deviation of the total score."""
+        squares = 0.0
+        dof = 0
+        for estimate in self._estimates.values():
+            if estimate.n > 1:
+                mean = estimate.mean
+                squares += sum((t - mean) ** 2 for t in estimate.totals)
+                dof += estimate.n - 1
+        if dof < self.min_dof:
+            return self.prior_sd
+        return math.sqrt(squares / dof)
+
+    def margin(self, a: ScoreEstimate, b: ScoreEstimate) -> float:
+        """Difference in means needed before ``a`` counts as better than ``b``."""
+        return self.z * self.noise_sd() * math.sqrt(1 / a.n + 1 / b.n)
+
+    async def _resample(self, estimate: ScoreEstimate):
+        [sample] = await self.scorer.sample(
+            [estimate.candidate["tweet"]], self.categories
+        )
+        self.resamples += 1
+        estimate.add(sample)
+
+    async def dominates(self, challenger: Candidate, incumbent: Candidate) -> bool:
+        """
+        Whether ``challenger`` is confidently better than ``incumbent``.
+
+        Re-evaluates the less-sampled of the two while their difference is
+        inside the confidence margin and the sample budget allows.
+        """
+        a = self.track(challenger)
+        b = self.track(incumbent)
+        while True:
+            diff = a.mean - b.mean
+            margin = self.margin(a, b)
+            if diff > margin:
+                return True
+            if diff < -margin:
+                return False
+            target = a if a.n <= b.n else b
+            if target.n >= self.max_samples:
+                target = b if target is a else a
+                if target.n >= self.max_samples:
+                    return False
+            await self._resample(target)
+
+    async def settle(
+        self, population: list[Candidate], incumbent: Candidate
+    ) -> list[Candidate]:
+        """
+        Filter a scored population so only dominating children can displace ``incumbent``.
+
+        Children whose mean does not beat the incumbent pass through
+        unchanged (beam strategies may still keep them); children that look
+        better but do not dominate it after re-sampling are dropped.
+        """
+        kept = []
+        for child in sorted(population, key=lambda c: c["total"], reverse=True):
+            candidate = self.track(child).candidate
+            looks_better = candidate["total"] > self.track(incumbent).mean
+            if not looks_better or await self.dominates(candidate, incumbent):
+                kept.append(candidate)
+        return kept
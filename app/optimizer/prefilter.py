@@ -0,0 +1,131 @@
+import hashlib
+import re
+from collections.abc import Callable
+
+_HASHTAG_PATTERN = re.compile(r"(?<!\w)#\w+")
+_MASK = (1 << 64) - 1
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _shingles(text: str, size: int) -> set[str]:
+    text = _normalize(text)
+    if len(text) <= size:
+        return {text}
+    return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+class MinHasher:
+    """
+    Pure-Python MinHash over character shingles.
+
+    Signatures of ``num_perm`` 64-bit minima estimate the Jaccard similarity
+    of two texts' shingle sets without comparing the sets themselves.
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._salts = [
+            int.from_bytes(
+                hashlib.blake2b(f"{seed}:{i}".encode(), digest_size=8).digest()
+            )
+            for i in range(num_perm)
+        ]
+
+    def signature(self, text: str) -> list[int]:
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest())
+            for s in _shingles(text, self.shingle_size)
+        ]
+        return [min((h ^ salt) & _MASK for h in hashes) for salt in self._salts]
+
+    @staticmethod
+    def similarity(a: list[int], b: list[int]) -> float:
+        return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class PreFilter:
+    """
+    Cheap local screen run on generated candidates before any evaluator call.
+
+    Rejects candidates that break the 280-character limit, carry too many
+    hashtags, exactly repeat or closely resemble (MinHash similarity at or
+    above ``similarity_threshold``) a tweet already seen in this run, or score
+    below ``min_prescore`` on an optional local ``prescorer`` model. Rejected
+    candidates are tallied in ``evaluations_saved`` (one per candidate; with
+    the batch evaluator that is fewer than one call each) and by reason in
+    ``rejections``.
+
+    With 64 permutations similarity moves in steps of 1/64, so the 0.9
+    default sits a few steps below identical: appending a word to a tweet
+    lands above it, while swapping a word usually lands below it.
+    """
+
+    def __init__(
+        self,
+        max_chars: int = 280,
+        max_hashtags: int = 5,
+        similarity_threshold: float = 0.9,
+        prescorer: Callable[[str], float] | None = None,
+        min_prescore: float = 0.0,
+        hasher: MinHasher | None = None,
+    ):
+        self.max_chars = max_chars
+        self.max_hashtags = max_hashtags
+        self.similarity_threshold = similarity_threshold
+        self.prescorer = prescorer
+        self.min_prescore = min_prescore
+        self.hasher = hasher or MinHasher()
+        self.evaluations_saved = 0
+        self.rejections: dict[str, int] = {}
+        self._seen_texts: set[str] = set()
+        self._seen_signatures: list[list[int]] = []
+
+    def observe(self, tweet: str):
+        """Remember ``tweet`` so later near-duplicates of it are rejected."""
+        normalized = _normalize(tweet)
+        if normalized in self._seen_texts:
+            return
+        self._seen_texts.add(normalized)
+        self._seen_signatures.append(self.hasher.signature(tweet))
+
+    def reason(self, tweet: str) -> str | None:
+        """Why ``tweet`` should not be evaluated, or None if it should."""
+        if not tweet.strip():
+            return "empty"
+        if len(tweet) > self.max_chars:
+            return "too_long"
+        if len(_HASHTAG_PATTERN.findall(tweet)) > self.max_hashtags:
+            return "too_many_hashtags"
+        if _normalize(tweet) in self._seen_texts:
+            return "duplicate"
+        signature = self.hasher.signature(tweet)
+        if any(
+            MinHasher.similarity(signature, seen) >= self.similarity_threshold
+            for seen in self._seen_signatures
+        ):
+            return "near_duplicate"
+        if self.prescorer is not None and self.prescorer(tweet) < self.min_prescore:
+            return "low_prescore"
+        return None
+
+    def filter(self, tweets: list[str]) -> list[str]:
+        """
+        Return the tweets worth evaluating, in order.
+
+        Accepted tweets are observed immediately, so duplicates within the
+        same batch are rejected too.
+        """
+        accepted = []
+        for tweet in tweets:
+            reason = self.reason(tweet)
+            if reason is None:
+                accepted.append(tweet)
+                self.observe(tweet)
+            else:
+                self.evaluations_saved += 1
+                self.rejections[reason] = self.rejections.get(reason, 0) + 1
+        return accepted
@@ -0,0 +1,264 @@
+import asyncio
+import logging
+
+from dspy.utils.exceptions import AdapterParseError
+
+from app.dspy_modules import (
+    get_batch_evaluator,
+    get_evaluator,
+    get_fast_batch_evaluator,
+    get_fast_evaluator,
+    parse_batch_scores,
+    parse_scores,
+)
+from app.metrics import RunMetrics
+from app.optimizer.types import Candidate, Score, total_score
+from app.score_memo import ScoreMemo, get_score_memo, normalize_category
+
+logger = logging.getLogger(__name__)
+
+
+def align_scores(categories: list[str], raw: list[dict]) -> dict[str, int]:
+    """
+    Map evaluator output onto the requested categories.
+
+    Entries are matched by normalized category name, falling back to their
+    position when the model paraphrased a category (only if there is exactly
+    one entry per category, so dropped entries cannot shift the rest).
+    """
+    by_norm = {normalize_category(c): c for c in categories}
+    positional = len(raw) == len(categories)
+    aligned: dict[str, int] = {}
+    for i, item in enumerate(raw):
+        name = by_norm.get(normalize_category(str(item.get("category", ""))))
+        if name is None and positional:
+            name = categories[i]
+        if name is not None and name not in aligned:
+            aligned[name] = int(item.get("score", 0))
+    return aligned
+
+
+class Scorer:
+    """
+    Score tweets on a set of categories, one (tweet, category) pair at a time.
+
+    Scores already in the ScoreMemo are reused; only missing categories are
+    sent to the evaluator, grouped so tweets missing the same categories share
+    one batch call. Unless ``bypass_cache`` is set, re-scoring after a
+    category edit therefore only pays for the new categories. Scores this
+    Scorer produced itself are always reused, even with ``bypass_cache``.
+
+    Malformed evaluator output never aborts scoring: the valid entries are
+    repaired out of the raw text (``parse_scores``), and only the categories
+    still missing are asked for again, once, with a fresh call. ``repaired``
+    and ``retried`` count both events. Pass a ``variant`` (e.g. "fast") when
+    the evaluators are not the default ones, so their scores are memoized
+    apart; a compiled evaluator's artifact version is appended the same way.
+    """
+
+    def __init__(
+        self,
+        evaluator,
+        batch_evaluator,
+        semaphore: asyncio.Semaphore,
+        memo: ScoreMemo | None = None,
+        bypass_cache: bool = False,
+        run_metrics: RunMetrics | None = None,
+        variant: str = "",
+    ):
+        self.evaluator = evaluator
+        self.batch_evaluator = batch_evaluator
+        self.semaphore = semaphore
+        self.memo = memo
+        self.bypass_cache = bypass_cache
+        self.run_metrics = run_metrics
+        self.repaired = 0
+        self.retried = 0
+        self._scored: dict[tuple[str, str], int] = {}
+        self.model = getattr(evaluator, "model", "")
+        if variant:
+            self.model = f"{self.model}#{variant}"
+        if getattr(evaluator, "version", ""):
+            self.model = f"{self.model}@{evaluator.version}"
+
+    async def _evaluate(
+        self, tweet: str, categories: list[str], fresh: bool = False
+    ) -> list[dict]:
+        """Score a single tweet on ``categories``; invalid entries are dropped."""
+        async with self.semaphore:
+            try:
+                eval_result = await self.evaluator.acall(
+                    tweet=tweet,
+                    categories="; ".join(categories),
+                    bypass_cache=self.bypass_cache or fresh,
+                    store=not fresh,
+                    run_metrics=self.run_metrics,
+                )
+            except AdapterParseError as e:
+                self.repaired += 1
+                return parse_scores(e.lm_response)
+        return parse_scores(eval_result.scores)
+
+    async def _evaluate_many(
+        self, tweets: list[str], categories: list[str], fresh: bool = False
+    ) -> list[list[dict]]:
+        """
+        Score ``tweets`` with one batch evaluator call.
+
+        A truncated batch output keeps the tweets it covered (the rest come
+        back empty). A single tweet, or a batch whose output cannot be matched
+        to the tweets at all, is scored with concurrent per-tweet calls instead.
+        """
+        if len(tweets) > 1:
+            async with self.semaphore:
+                try:
+                    batch_result = await self.batch_evaluator.acall(
+                        tweets=tweets,
+                        categories="; ".join(categories),
+                        bypass_cache=self.bypass_cache or fresh,
+                        store=not fresh,
+                        run_metrics=self.run_metrics,
+                    )
+                    raw = batch_result.scores
+                except AdapterParseError as e:
+                    self.repaired += 1
+                    raw = e.lm_response
+            score_lists = parse_batch_scores(raw, len(tweets))
+            if score_lists is not None:
+                return score_lists
+            logger.warning(
+                "Batch evaluation output did not parse, falling back to per-tweet calls."
+            )
+        return await asyncio.gather(
+            *(self._evaluate(tweet, categories, fresh) for tweet in tweets)
+        )
+
+    async def _evaluate_aligned(
+        self, tweets: list[str], categories: list[str], fresh: bool = False
+    ) -> list[dict[str, int]]:
+        """
+        Score ``tweets`` and map the output onto ``categories``.
+
+        Tweets left with missing categories (dropped or unrepairable entries)
+        get one targeted, fresh retry for just those categories; whatever is
+        still missing afterwards is left out.
+        """
+        raw_lists = await self._evaluate_many(tweets, categories, fresh)
+        aligned = [align_scores(categories, raw) for raw in raw_lists]
+        groups: dict[tuple[str, ...], list[int]] = {}
+        for i, scores in enumerate(aligned):
+            missing = tuple(c for c in categories if c not in scores)
+            if missing:
+                groups.setdefault(missing, []).append(i)
+
+        async def retry(missing: tuple[str, ...], indexes: list[int]):
+            self.retried += len(indexes)
+            retried = await self._evaluate_many(
+                [tweets[i] for i in indexes], list(missing), fresh=True
+            )
+            for i, raw in zip(indexes, retried):
+                aligned[i].update(align_scores(list(missing), raw))
+                if len(aligned[i]) < len(categories):
+                    logger.warning(
+                        f"Evaluator gave no valid score for some categories of {tweets[i]!r}."
+                    )
+
+        await asyncio.gather(*(retry(m, idx) for m, idx in groups.items()))
+        return aligned
+
+    async def score(self, tweets: list[str], categories: list[str]) -> list[Candidate]:
+        """
+        Score every tweet on every category, evaluating only what is not memoized.
+
+        Returns:
+            list[Candidate]: One candidate per tweet, scores in ``categories`` order.
+        """
+        if self.memo is None or self.bypass_cache:
+            known: list[dict[str, int]] = [{} for _ in tweets]
+        else:
+            known = [
+                await asyncio.to_thread(self.memo.get_many, self.model, t, categories)
+                for t in tweets
+            ]
+        for tweet, scores in zip(tweets, known):
+            for c in categories:
+                score = self._scored.get((tweet, normalize_category(c)))
+                if score is not None:
+                    scores.setdefault(c, score)
+
+        groups: dict[tuple[str, ...], list[int]] = {}
+        for i, scores in enumerate(known):
+            missing = tuple(c for c in categories if c not in scores)
+            if missing:
+                groups.setdefault(missing, []).append(i)
+
+        async def fill(missing: tuple[str, ...], indexes: list[int]):
+            aligned_lists = await self._evaluate_aligned(
+                [tweets[i] for i in indexes], list(missing)
+            )
+            for i, aligned in zip(indexes, aligned_lists):
+                known[i].update(aligned)
+                for c, score in aligned.items():
+                    self._scored[(tweets[i], normalize_category(c))] = score
+                if self.memo is not None:
+                    await asyncio.to_thread(
+                        self.memo.put_many, self.model, tweets[i], aligned
+                    )
+
+        await asyncio.gather(*(fill(m, idx) for m, idx in groups.items()))
+
+        candidates: list[Candidate] = []
+        for tweet, scores in zip(tweets, known):
+            ordered: list[Score] = [
+                {"category": c, "score": scores.get(c, 0)} for c in categories
+            ]
+            candidates.append(
+                {"tweet": tweet, "scores": ordered, "total": total_score(ordered)}
+            )
+        return candidates
+
+    async def sample(self, tweets: list[str], categories: list[str]) -> list[Candidate]:
+        """
+        Take one fresh evaluation of every tweet, ignoring caches and the memo.
+
+        Used to estimate evaluator noise; the samples are not memoized.
+        """
+        aligned_lists = await self._evaluate_aligned(tweets, categories, fresh=True)
+        candidates: list[Candidate] = []
+        for tweet, aligned in zip(tweets, aligned_lists):
+            ordered: list[Score] = [
+                {"category": c, "score": aligned.get(c, 0)} for c in categories
+            ]
+            candidates.append(
+                {"tweet": tweet, "scores": ordered, "total": total_score(ordered)}
+            )
+        return candidates
+
+
+async def rescore(
+    tweets: list[str],
+    categories: list[str],
+    bypass_cache: bool = False,
+    fast_scorer: bool = False,
+) -> list[Candidate]:
+    """
+    Re-score existing tweets after a category edit.
+
+    Memoized categories are reused and removed ones simply drop out, so only
+    newly added categories cost an evaluator call. Pass the ``fast_scorer``
+    setting of the run that scored the tweets, so they are re-scored by the
+    same evaluators and their memoized scores are found.
+
+    Returns:
+        list[Candidate]: Candidates sorted best first.
+    """
+    scorer = Scorer(
+        get_fast_evaluator() if fast_scorer else get_evaluator(),
+        get_fast_batch_evaluator() if fast_scorer else get_batch_evaluator(),
+        asyncio.Semaphore(8),
+        memo=get_score_memo(),
+        bypass_cache=bypass_cache,
+        variant="fast" if fast_scorer else "",
+    )
+    candidates = await scorer.score(tweets, categories)
+    return sorted(candidates, key=lambda c: c["total"], reverse=True)
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from app.optimizer.prefilter import MinHasher
+from app.optimizer.types import Candidate
+from app.score_memo import normalize_category
+
+DEFAULT_STORE_PATH = ".cache/results.sqlite3"
+LSH_BANDS = 16
+
+
+def normalize_input(text: str) -> str:
+    """Canonical form of an input text: lowercased, whitespace collapsed."""
+    return " ".join(text.lower().split())
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def categories_key(categories: list[str]) -> str:
+    """Order-insensitive key of a category set."""
+    return _sha("\x1f".join(sorted(normalize_category(c) for c in categories)))
+
+
+class ResultStore:
+    """
+    Server-side store of finished optimization runs and their best candidates.
+
+    Runs are indexed by the hash of their normalized input text and category
+    set, plus a MinHash LSH index over the input text (``LSH_BANDS`` bands),
+    so later runs on the same or a near-identical input with the same
+    categories can warm-start from the tweets that already scored best.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, hasher: MinHasher | None = None):
+        self.path = path
+        self.hasher = hasher or MinHasher()
+        self._rows_per_band = self.hasher.num_perm // LSH_BANDS
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "id INTEGER PRIMARY KEY, input_key TEXT NOT NULL, input_text TEXT NOT NULL, "
+            "categories_key TEXT NOT NULL, categories TEXT NOT NULL, model TEXT NOT NULL, "
+            "signature TEXT NOT NULL, best_total REAL NOT NULL, created_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS runs_input ON runs (input_key, categories_key);"
+            "CREATE TABLE IF NOT EXISTS candidates ("
+            "run_id INTEGER NOT NULL REFERENCES runs (id), tweet TEXT NOT NULL, "
+            "total REAL NOT NULL, scores TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS candidates_run ON candidates (run_id);"
+            "CREATE TABLE IF NOT EXISTS input_bands ("
+            "band INTEGER NOT NULL, bucket TEXT NOT NULL, run_id INTEGER NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS input_bands_bucket ON input_bands (band, bucket);"
+        )
+        self._conn.commit()
+
+    def _buckets(self, signature: list[int]) -> list[tuple[int, str]]:
+        rows = self._rows_per_band
+        return [
+            (band, _sha(",".join(map(str, signature[band * rows : (band + 1) * rows]))))
+            for band in range(LSH_BANDS)
+        ]
+
+    def record_run(
+        self,
+        input_text: str,
+        categories: list[str],
+        model: str,
+        candidates: list[Candidate],
+    ) -> int | None:
+        """Store a finished run and its candidates; returns the run id (None if empty)."""
+        if not candidates:
+            return None
+        normalized = normalize_input(input_text)
+        signature = self.hasher.signature(normalized)
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (input_key, input_text, categories_key, categories, "
+                "model, signature, best_total, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    _sha(normalized),
+                    input_text,
+                    categories_key(categories),
+                    json.dumps(categories),
+                    model,
+                    json.dumps(signature),
+                    max(c["total"] for c in candidates),
+                    time.time(),
+                ),
+            )
+            run_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO candidates VALUES (?, ?, ?, ?)",
+                [
+                    (run_id, c["tweet"], c["total"], json.dumps(c["scores"]))
+                    for c in candidates
+                ],
+            )
+            self._conn.executemany(
+                "INSERT INTO input_bands VALUES (?, ?, ?)",
+                [(band, bucket, run_id) for band, bucket in self._buckets(signature)],
+            )
+            self._conn.commit()
+        return run_id
+
+    def similar_runs(
+        self, input_text: str, categories: list[str], min_similarity: float = 0.8
+    ) -> list[tuple[int, float]]:
+        """
+        Runs on the same or a similar input with the same categories.
+
+        Returns:
+            list[tuple[int, float]]: ``(run_id, similarity)`` pairs, most
+            similar first; exact input matches have similarity 1.0.
+        """
+        normalized = normalize_input(input_text)
+        cat_key = categories_key(categories)
+        signature = self.hasher.signature(normalized)
+        buckets = self._buckets(signature)
+        with self._lock:
+            exact = self._conn.execute(
+                "SELECT id FROM runs WHERE input_key = ? AND categories_key = ?",
+                (_sha(normalized), cat_key),
+            ).fetchall()
+            clause = " OR ".join("(b.band = ? AND b.bucket = ?)" for _ in buckets)
+            near = self._conn.execute(
+                "SELECT DISTINCT r.id, r.signature FROM input_bands b "
+                "JOIN runs r ON r.id = b.run_id "
+                f"WHERE r.categories_key = ? AND ({clause})",
+                (cat_key, *(value for pair in buckets for value in pair)),
+            ).fetchall()
+        matches = {run_id: 1.0 for (run_id,) in exact}
+        for run_id, stored in near:
+            if run_id not in matches:
+                similarity = MinHasher.similarity(signature, json.loads(stored))
+                if similarity >= min_similarity:
+                    matches[run_id] = similarity
+        return sorted(matches.items(), key=lambda item: item[1], reverse=True)
+
+    def best_tweets(
+        self,
+        input_text: str,
+        categories: list[str],
+        limit: int = 3,
+        min_similarity: float = 0.8,
+    ) -> list[str]:
+        """Distinct best-scoring tweets from runs on the same or a similar input."""
+        run_ids = [
+            run_id
+            for run_id, _ in self.similar_runs(input_text, categories, min_similarity)
+        ]
+        if not run_ids:
+            return []
+        placeholders = ", ".join("?" for _ in run_ids)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT tweet, MAX(total) AS best FROM candidates "
+                f"WHERE run_id IN ({placeholders}) GROUP BY tweet "
+                "ORDER BY best DESC LIMIT ?",
+                (*run_ids, limit),
+            ).fetchall()
+        return [tweet for tweet, _ in rows]
+
+    def history(self, limit: int = 500) -> list[dict]:
+        """
+        The most recent runs with their stored candidates, newest first.
+
+        Returns:
+            list[dict]: ``{"input_text", "categories", "model", "candidates"}``
+            per run; candidates are sorted best first.
+        """
+        with self._lock:
+            runs = self._conn.execute(
+                "SELECT id, input_text, categories, model FROM runs "
+                "ORDER BY created_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+            rows = self._conn.execute(
+                "SELECT run_id, tweet, total, scores FROM candidates "
+                "WHERE run_id IN (SELECT id FROM runs ORDER BY created_at DESC LIMIT ?) "
+                "ORDER BY total DESC",
+                (limit,),
+            ).fetchall()
+        candidates: dict[int, list[Candidate]] = {}
+        for run_id, tweet, total, scores in rows:
+            candidates.setdefault(run_id, []).append(
+                {"tweet": tweet, "total": total, "scores": json.loads(scores)}
+            )
+        return [
+            {
+                "input_text": input_text,
+                "categories": json.loads(categories),
+                "model": model,
+                "candidates": candidates.get(run_id, []),
+            }
+            for run_id, input_text, categories, model in runs
+        ]
+
+
+_store: ResultStore | None = None
+
+
+def get_result_store() -> ResultStore:
+    """
+    Get or create the process-wide optimization result store.
+
+    Stored at TWEET_RESULT_STORE_PATH (default .cache/results.sqlite3) and
+    shared by every session and bulk job in the process.
+
+    Returns:
+        ResultStore: Shared run and candidate store.
+    """
+    global _store
+    if _store is None:
+        _store = ResultStore(os.getenv("TWEET_RESULT_STORE_PATH", DEFAULT_STORE_PATH))
+    return _store
@@ -0,0 +1,285 @@
+import math
+import random
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from app.optimizer.types import Candidate
+
+if TYPE_CHECKING:
+    from app.optimizer.scoring import Scorer
+
+MUTATION_PROMPTS = [
+    "Sharpen the hook in the first few words.",
+    "Make it more concise without losing the key point.",
+    "Make the tone more energetic and engaging.",
+    "Use fewer, more relevant hashtags.",
+    "Add a concrete detail, example or number.",
+    "Rewrite it from a different angle.",
+]
+
+
+@dataclass
+class Proposal:
+    """
+    One mutation planned by a strategy.
+
+    ``instruction`` selects the instructed mutator instead of the plain
+    generator. The engine fills in ``child`` after scoring; it stays None
+    when generation failed or the pre-filter rejected the mutation.
+    """
+
+    parent: Candidate
+    instruction: str | None = None
+    child: Candidate | None = None
+
+
+class SearchStrategy(ABC):
+    """
+    Decides which tweets are mutated each round and which candidates are kept.
+
+    The engine calls ``reset`` with the scored initial tweet, then once per
+    round: ``propose`` to plan mutations, ``evaluate`` to score the surviving
+    ones, ``observe`` with the scored population and ``feedback`` with the
+    proposals (children filled in). ``best`` must always be the
+    highest-scoring candidate seen that the strategy is keeping.
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def reset(self, initial: Candidate):
+        """Start over from the scored initial tweet."""
+
+    @abstractmethod
+    def propose(self, k: int) -> list[Proposal]:
+        """Plan ``k`` mutations for the next round."""
+
+    async def evaluate(
+        self, tweets: list[str], scorer: "Scorer", categories: list[str]
+    ) -> list[Candidate]:
+        """Score ``tweets``; strategies may return only the ones worth keeping."""
+        return await scorer.score(tweets, categories)
+
+    @abstractmethod
+    def observe(self, population: list[Candidate]):
+        """Take in the round's scored population."""
+
+    def feedback(self, proposals: list[Proposal]):
+        """Learn from how each proposal turned out (no-op by default)."""
+
+    @property
+    @abstractmethod
+    def best(self) -> Candidate:
+        """Highest-scoring candidate the strategy is keeping."""
+
+
+class BeamSearch(SearchStrategy):
+    """
+    Keep the top ``width`` candidates and mutate them round-robin.
+
+    With ``width=1`` this is plain greedy hill climbing.
+    """
+
+    name = "beam"
+
+    def __init__(self, width: int = 1):
+        self.width = max(1, width)
+        self.beam: list[Candidate] = []
+
+    def reset(self, initial: Candidate):
+        self.beam = [initial]
+
+    def propose(self, k: int) -> list[Proposal]:
+        return [Proposal(self.beam[i % len(self.beam)]) for i in range(k)]
+
+    def observe(self, population: list[Candidate]):
+        self.beam = sorted(
+            self.beam + population, key=lambda c: c["total"], reverse=True
+        )[: self.width]
+
+    @property
+    def best(self) -> Candidate:
+        return self.beam[0]
+
+
+class SimulatedAnnealing(SearchStrategy):
+    """
+    Hill climbing that sometimes moves to a worse candidate.
+
+    Each round the best child replaces the current tweet if it scores at
+    least as well, or otherwise with probability ``exp(delta / T)``. The
+    temperature starts at ``initial_temperature`` (in total-score points)
+    and is multiplied by ``cooling`` every round, so the search explores
+    early and settles into greedy climbing later.
+    """
+
+    name = "annealing"
+
+    def __init__(
+        self,
+        initial_temperature: float = 2.0,
+        cooling: float = 0.85,
+        seed: int | None = None,
+    ):
+        self.initial_temperature = initial_temperature
+        self.cooling = cooling
+        self.temperature = initial_temperature
+        self._rng = random.Random(seed)
+        self.current: Candidate | None = None
+        self._best: Candidate | None = None
+
+    def reset(self, initial: Candidate):
+        self.current = self._best = initial
+        self.temperature = self.initial_temperature
+
+    def propose(self, k: int) -> list[Proposal]:
+        return [Proposal(self.current) for _ in range(k)]
+
+    def observe(self, population: list[Candidate]):
+        if population:
+            child = max(population, key=lambda c: c["total"])
+            delta = child["total"] - self.current["total"]
+            if delta >= 0 or self._rng.random() < math.exp(
+                delta / max(self.temperature, 1e-9)
+            ):
+                self.current = child
+            if child["total"] > self._best["total"]:
+                self._best = child
+        self.temperature *= self.cooling
+
+    @property
+    def best(self) -> Candidate:
+        return self._best
+
+
+class SuccessiveHalving(BeamSearch):
+    """
+    Beam search that screens each population on a few categories first.
+
+    Candidates are scored on a growing prefix of the categories; after each
+    rung only the top ``1 / eta`` survive, and only the final survivors are
+    scored on every category. Thanks to the per-category score memo a
+    survivor's earlier rungs are not paid for again, so most weak mutations
+    cost one category's worth of evaluation instead of all of them. Needs a
+    population of at least ``eta`` to cut anything.
+
+    Every rung is one batch evaluator call, so a round takes up to
+    ``rungs + 1`` calls where the other strategies take one. What it saves is
+    scored (tweet, category) pairs, i.e. completion tokens, which pays off
+    with large populations and an evaluator that reasons at length about
+    each pair; with small populations beam search is cheaper.
+    """
+
+    name = "halving"
+
+    def __init__(self, width: int = 1, eta: int = 2):
+        super().__init__(width)
+        self.eta = max(2, eta)
+
+    async def evaluate(
+        self, tweets: list[str], scorer: "Scorer", categories: list[str]
+    ) -> list[Candidate]:
+        rungs = min(len(categories), math.ceil(math.log(max(len(tweets), 1), self.eta)))
+        survivors = tweets
+        for rung in range(1, rungs + 1):
+            if len(survivors) <= 1:
+                break
+            subset = categories[: max(1, len(categories) * rung // (rungs + 1))]
+            ranked = sorted(
+                await scorer.score(survivors, subset),
+                key=lambda c: c["total"],
+                reverse=True,
+            )
+            keep = max(1, math.ceil(len(ranked) / self.eta))
+            survivors = [c["tweet"] for c in ranked[:keep]]
+        return await scorer.score(survivors, categories)
+
+
+class UCBBandit(BeamSearch):
+    """
+    Beam search that learns which mutation prompt works best (UCB1).
+
+    Each proposal picks the instruction from MUTATION_PROMPTS with the
+    highest upper confidence bound ``mean + c * sqrt(2 ln N / n)`` on its
+    reward: 1 when the child beat its parent, 0 otherwise (including
+    children rejected by the pre-filter). Untried prompts go first, and
+    prompts already chosen this round count as pulled so a round spreads
+    over several arms.
+    """
+
+    name = "bandit"
+
+    def __init__(
+        self,
+        width: int = 1,
+        prompts: list[str] | None = None,
+        exploration: float = 1.0,
+    ):
+        super().__init__(width)
+        self.prompts = list(prompts or MUTATION_PROMPTS)
+        self.exploration = exploration
+        self.pulls = {prompt: 0 for prompt in self.prompts}
+        self.rewards = {prompt: 0.0 for prompt in self.prompts}
+
+    def _ucb(self, prompt: str, pending: dict[str, int], total: int) -> float:
+        n = self.pulls[prompt] + pending[prompt]
+        if n == 0:
+            return math.inf
+        mean = self.rewards[prompt] / max(self.pulls[prompt], 1)
+        return mean + self.exploration * math.sqrt(2 * math.log(max(total, 1)) / n)
+
+    def propose(self, k: int) -> list[Proposal]:
+        pending = {prompt: 0 for prompt in self.prompts}
+        total = sum(self.pulls.values())
+        proposals = []
+        for parent in super().propose(k):
+            prompt = max(self.prompts, key=lambda p: self._ucb(p, pending, total + 1))
+            pending[prompt] += 1
+            total += 1
+            parent.instruction = prompt
+            proposals.append(parent)
+        return proposals
+
+    def feedback(self, proposals: list[Proposal]):
+        for proposal in proposals:
+            if proposal.instruction not in self.pulls:
+                continue
+            self.pulls[proposal.instruction] += 1
+            if (
+                proposal.child is not None
+                and proposal.child["total"] > proposal.parent["total"]
+            ):
+                self.rewards[proposal.instruction] += 1.0
+
+
+STRATEGIES: dict[str, type[SearchStrategy]] = {
+    BeamSearch.name: BeamSearch,
+    SimulatedAnnealing.name: SimulatedAnnealing,
+    SuccessiveHalving.name: SuccessiveHalving,
+    UCBBandit.name: UCBBandit,
+}
+
+
+def make_strategy(name: str, beam_width: int = 1) -> SearchStrategy:
+    """
+    Build a search strategy by name.
+
+    Args:
+        name: Key into STRATEGIES (e.g. "beam", "annealing", "halving", "bandit").
+        beam_width: Number of candidates kept by beam-style strategies.
+
+    Returns:
+        SearchStrategy: Fresh strategy instance.
+
+    Raises:
+        ValueError: If ``name`` is not a known strategy.
+    """
+    strategy_cls: type[SearchStrategy] | None = STRATEGIES.get(name)
+    if strategy_cls is None:
+        raise ValueError(
+            f"Unknown search strategy {name!r}. Choose one of: {', '.join(STRATEGIES)}"
+        )
+    if issubclass(strategy_cls, BeamSearch):
+        return strategy_cls(width=beam_width)
+    return strategy_cls()
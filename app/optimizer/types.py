@@ -0,0 +1,126 @@
+from dataclasses import dataclass, field
+from typing import TypedDict
+
+DEFAULT_CATEGORIES = [
+    "Clarity and conciseness",
+    "Engagement and hook",
+    "Hashtag relevance",
+]
+
+
+class Score(TypedDict):
+    category: str
+    score: float
+
+
+class Candidate(TypedDict):
+    tweet: str
+    scores: list[Score]
+    total: float
+
+
+def total_score(scores: list[Score]) -> float:
+    """Sum the per-category scores of one evaluation."""
+    return sum(s.get("score", 0) for s in scores)
+
+
+@dataclass
+class OptimizerConfig:
+    """
+    Settings for one hill-climbing run.
+
+    Attributes:
+        input_text: Text the first tweet is generated from.
+        categories: Scoring categories, each scored by the evaluator.
+        iterations: Maximum number of rounds.
+        patience: Rounds without improvement before the run stops early.
+        population_size: Mutations generated and scored per round.
+        beam_width: Candidates kept by beam-style strategies.
+        strategy: Search strategy name (see ``STRATEGIES``).
+        bypass_cache: Skip the prediction cache, score memo and warm start.
+        prefilter: Drop over-long, hashtag-heavy and near-duplicate
+            candidates before scoring them (see PreFilter).
+        noise_aware: Re-evaluate close candidates up to ``max_samples``
+            times and only accept a new best that beats the old one at
+            ``confidence`` (see NoiseModel).
+        warm_start: Start from the best known tweets of earlier runs on the
+            same or a similar input with the same categories.
+        fast_scorer: Score with the no-reasoning evaluators: fewer tokens
+            per evaluation, noisier scores.
+        cascade: Rank each round's mutations with the cheap screener model
+            and score only the top ``cascade_finalists`` with the evaluator.
+        cascade_finalists: Mutations per round that reach the evaluator.
+        speculative: Generate the next round's mutations while the current
+            round is scored, so a round takes about as long as the slower
+            of the two.
+        variants_per_call: Mutations of the same parent requested per
+            variant generator call; 1 uses one mutator call each.
+        confidence: Confidence a noise-aware acceptance must reach.
+        max_samples: Evaluations per candidate with ``noise_aware``.
+        max_parallel_calls: LLM calls in flight at once for this run.
+    """
+
+    input_text: str
+    categories: list[str] = field(default_factory=lambda: list(DEFAULT_CATEGORIES))
+    iterations: int = 10
+    patience: int = 3
+    population_size: int = 1
+    beam_width: int = 1
+    strategy: str = "beam"
+    bypass_cache: bool = False
+    prefilter: bool = True
+    noise_aware: bool = False
+    warm_start: bool = True
+    fast_scorer: bool = False
+    cascade: bool = False
+    cascade_finalists: int = 1
+    speculative: bool = False
+    variants_per_call: int = 1
+    confidence: float = 0.9
+    max_samples: int = 4
+    max_parallel_calls: int = 8
+
+    @property
+    def category_str(self) -> str:
+        """Categories joined the way the evaluator signatures expect them."""
+        return "; ".join(self.categories)
+
+
+@dataclass
+class ProgressEvent:
+    """
+    One step of an optimization run, emitted by ``Optimizer.run``.
+
+    ``kind`` is one of "initial" (first tweet scored), "iteration_started",
+    "iteration" (a round finished; ``current`` is the round's best candidate,
+    or None if the pre-filter rejected every mutation) and "finished".
+    ``evaluations_saved`` counts candidates the pre-filter skipped,
+    ``screened_out`` the mutations the cascade screener kept from the
+    evaluator, and ``metrics`` holds the run's call totals so far (see ``RunMetrics.summary``).
+    ``warm_start`` is the number of known tweets from earlier runs the
+    initial candidate was chosen from (0 for a cold start).
+    """
+
+    kind: str
+    iteration: int = 0
+    current: Candidate | None = None
+    best: Candidate | None = None
+    improved: bool = False
+    patience_counter: int = 0
+    evaluations_saved: int = 0
+    screened_out: int = 0
+    metrics: dict[str, float] = field(default_factory=dict)
+    warm_start: int = 0
+
+
+@dataclass
+class OptimizationResult:
+    """Outcome of a completed run."""
+
+    input_text: str
+    best: Candidate
+    iterations_run: int
+    stopped_early: bool
+    evaluations_saved: int = 0
+    screened_out: int = 0
+    metrics: dict[str, float] = field(default_factory=dict)
@@ -0,0 +1,182 @@
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+import time
+
+from app.dspy_modules import PREDICTOR_GETTERS
+from app.optimizer.engine import Optimizer
+from app.optimizer.jobs import JobQueue, get_job_queue
+
+PARTIAL_UPDATE_INTERVAL_S = 0.1
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    Pull optimization jobs from a JobQueue and run them.
+
+    Up to ``concurrency`` jobs run at once in this process, sharing its
+    predictors and LM scheduler. Every ProgressEvent is published back to
+    the queue and the tweet being generated is streamed as the job's partial
+    text (at most every PARTIAL_UPDATE_INTERVAL_S seconds). The job's lease
+    is renewed every third of the queue's lease. A cancelled job is checked
+    for every ``poll_interval`` seconds and aborted mid-round, calls in
+    flight included; one another worker took over is stopped after its
+    current round.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        worker_id: str | None = None,
+        concurrency: int = 2,
+        poll_interval: float = 0.5,
+    ):
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.completed = 0
+        self.failed = 0
+
+    async def _keep_lease(self, job_id: str, optimizer: Optimizer):
+        renew_interval = self.queue.lease_s / 3
+        interval = min(self.poll_interval, renew_interval)
+        renewed = time.monotonic()
+        while True:
+            await asyncio.sleep(interval)
+            if await asyncio.to_thread(self.queue.cancel_requested, job_id):
+                optimizer.cancel()
+                return
+            if time.monotonic() - renewed < renew_interval:
+                continue
+            renewed = time.monotonic()
+            if not await asyncio.to_thread(
+                self.queue.heartbeat, job_id, self.worker_id
+            ):
+                # Cancelled in between, or the lease was lost to another worker.
+                if await asyncio.to_thread(self.queue.cancel_requested, job_id):
+                    optimizer.cancel()
+                else:
+                    optimizer.stop()
+                return
+
+    async def execute(self, job_id: str, config):
+        """Run one claimed job to completion, publishing its progress."""
+        last_partial = 0.0
+
+        async def publish_partial(text: str, complete: bool):
+            nonlocal last_partial
+            now = time.monotonic()
+            if not complete and now - last_partial < PARTIAL_UPDATE_INTERVAL_S:
+                return
+            last_partial = now
+            await asyncio.to_thread(self.queue.set_partial, job_id, text)
+
+        optimizer = Optimizer(config, on_partial=publish_partial)
+        lease = asyncio.create_task(self._keep_lease(job_id, optimizer))
+        error = None
+        try:
+            async for event in optimizer.run():
+                await asyncio.to_thread(self.queue.publish, job_id, event)
+            self.completed += 1
+        except Exception as e:
+            logger.exception(f"Error running job {job_id}")
+            error = str(e) or type(e).__name__
+            self.failed += 1
+        finally:
+            lease.cancel()
+            await asyncio.to_thread(self.queue.finish, job_id, self.worker_id, error)
+
+    async def _slot(self, stop: asyncio.Event):
+        while not stop.is_set():
+            job = await asyncio.to_thread(self.queue.claim, self.worker_id)
+            if job is None:
+                try:
+                    await asyncio.wait_for(stop.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.execute(*job)
+
+    async def run(self, stop: asyncio.Event | None = None):
+        """
+        Claim and run jobs until ``stop`` is set (forever by default).
+
+        The predictors are built up front, so the first job does not wait
+        for them.
+        """
+        for getter in PREDICTOR_GETTERS:
+            getter()
+        await asyncio.to_thread(self.queue.prune)
+        stop = stop or asyncio.Event()
+        logger.info(
+            f"Worker {self.worker_id} polling {self.queue.path} "
+            f"with {self.concurrency} slots"
+        )
+        await asyncio.gather(*(self._slot(stop) for _ in range(self.concurrency)))
+
+
+def _run_process(concurrency: int, poll_interval: float):
+    logging.basicConfig(level=logging.INFO)
+    worker = Worker(
+        get_job_queue(), concurrency=concurrency, poll_interval=poll_interval
+    )
+    asyncio.run(worker.run())
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.optimizer.worker",
+        description=(
+            "Run optimization jobs queued by the web app (TWEET_JOB_QUEUE=1) "
+            "from the shared job queue at TWEET_JOB_QUEUE_PATH."
+        ),
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Worker processes to start, e.g. one per core.",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=2, help="Jobs run at once per process."
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=0.5,
+        help="Seconds between queue polls while idle, and between cancel checks.",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None):
+    logging.basicConfig(level=logging.INFO)
+    args = build_parser().parse_args(argv)
+    if args.processes <= 1:
+        _run_process(args.concurrency, args.poll_interval)
+        return
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(
+            target=_run_process, args=(args.concurrency, args.poll_interval)
+        )
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import dspy
+import pydantic
+
+from app.metrics import CallRecord, MetricsRegistry, RunMetrics, usage_cost
+from app.scheduler import LMScheduler, estimate_tokens
+
+DEFAULT_CACHE_PATH = ".cache/predictions.sqlite3"
+DEFAULT_MAX_ENTRIES = 50_000
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+EVICTION_INTERVAL = 100
+
+
+def _to_json(value: Any) -> Any:
+    """``json.dumps`` fallback for typed (pydantic) prediction outputs."""
+    if isinstance(value, pydantic.BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Cannot cache a value of type {type(value).__name__}")
+
+
+class PredictionCache:
+    """
+    On-disk, content-addressed store of DSPy prediction outputs.
+
+    Entries are keyed by a hash of the signature, the model, the compiled
+    program version (if any) and the inputs,
+    expire after ``ttl_seconds`` and are evicted least-recently-used once the
+    store holds more than ``max_entries`` rows. The row count is checked
+    every ``eviction_interval`` puts, so the store may briefly run that many
+    rows over. Safe to share across the worker threads used by
+    ``asyncio.to_thread``.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        eviction_interval: int = EVICTION_INTERVAL,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.eviction_interval = max(1, eviction_interval)
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS predictions_accessed_at "
+            "ON predictions (accessed_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        signature: type[dspy.Signature], model: str, inputs: dict, version: str = ""
+    ) -> str:
+        """Hash the signature definition, model name, program version and inputs into a cache key."""
+        key = {
+            "signature": signature.signature,
+            "instructions": signature.instructions,
+            "model": model,
+            "inputs": inputs,
+        }
+        if version:
+            key["version"] = version
+        payload = json.dumps(key, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the stored outputs for ``key``, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM predictions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM predictions WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE predictions SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(value)
+
+    def put(self, key: str, outputs: dict[str, Any]):
+        """Store ``outputs`` under ``key``, evicting the LRU overflow when due."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)",
+                (key, json.dumps(outputs, default=_to_json), now, now),
+            )
+            self._puts += 1
+            if self._puts % self.eviction_interval == 0:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop the least recently used rows beyond ``max_entries`` (lock held)."""
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM predictions").fetchone()
+        if count <= self.max_entries:
+            return
+        self._conn.execute(
+            "DELETE FROM predictions WHERE key IN ("
+            "SELECT key FROM predictions ORDER BY accessed_at LIMIT ?)",
+            (count - self.max_entries,),
+        )
+
+    def clear(self):
+        """Remove every cached prediction."""
+        with self._lock:
+            self._conn.execute("DELETE FROM predictions")
+            self._conn.commit()
+
+
+class CachedPredictor:
+    """
+    Wrap a DSPy predictor so identical calls are answered from a PredictionCache.
+
+    Call it exactly like the wrapped predictor, or await ``acall`` for the
+    async-native path; pass ``bypass_cache=True`` to force a fresh LLM call
+    (the fresh result still refreshes the cache) and ``store=False`` to keep
+    a result out of the cache, e.g. a sample that is never read back. When ``scheduler`` is given,
+    async LLM requests go through it for rate limiting and retries. When
+    ``metrics`` is given, every call's latency, token usage, cost, retries and
+    cache outcome is recorded under ``role``, and also into ``run_metrics``
+    when the caller passes one. Passing ``on_partial`` to ``acall`` streams
+    ``stream_field`` as it is generated (see ``_stream``). ``adapter``
+    overrides the DSPy adapter for this predictor's calls only. ``version``
+    tags a compiled program (see ``app.artifacts``) so its predictions are
+    cached apart from the uncompiled program's. ``lane`` names the scheduler
+    lane (the LM role) its requests queue in. Typed output
+    fields are validated again when read back from the cache; entries that
+    no longer validate count as misses. Cancelling an ``acall`` task aborts
+    the in-flight request and is recorded as a cancelled call.
+    """
+
+    def __init__(
+        self,
+        predictor: dspy.Module,
+        signature: type[dspy.Signature],
+        model: str,
+        cache: PredictionCache,
+        scheduler: LMScheduler | None = None,
+        role: str = "",
+        metrics: MetricsRegistry | None = None,
+        stream_field: str | None = None,
+        adapter: dspy.Adapter | None = None,
+        version: str = "",
+        lane: str = "",
+    ):
+        self.predictor = predictor
+        self.signature = signature
+        self.model = model
+        self.cache = cache
+        self.scheduler = scheduler
+        self.role = role or signature.__name__
+        self.metrics = metrics
+        self.stream_field = stream_field
+        self.adapter = adapter
+        self.version = version
+        self.lane = lane
+        self._output_types = {
+            name: pydantic.TypeAdapter(field.annotation)
+            for name, field in signature.output_fields.items()
+            if field.annotation is not str
+        }
+
+    def _context(self):
+        """DSPy settings overrides for this predictor's calls."""
+        if self.adapter is None:
+            return contextlib.nullcontext()
+        return dspy.context(adapter=self.adapter)
+
+    def _restore(self, cached: dict[str, Any]) -> dspy.Prediction | None:
+        """Rebuild a cached prediction with typed fields re-validated (None if invalid)."""
+        outputs = dict(cached)
+        for name, output_type in self._output_types.items():
+            if name not in outputs:
+                continue
+            value = outputs[name]
+            try:
+                outputs[name] = (
+                    output_type.validate_json(value)
+                    if isinstance(value, str)
+                    else output_type.validate_python(value)
+                )
+            except pydantic.ValidationError:
+                return None
+        return dspy.Prediction(**outputs)
+
+    def _record(
+        self,
+        record: CallRecord,
+        prediction: dspy.Prediction | None,
+        run_metrics: RunMetrics | None,
+    ):
+        if prediction is not None and not record.cache_hit:
+            usage = (prediction.get_lm_usage() or {}).get(self.model, {})
+            record.prompt_tokens = usage.get("prompt_tokens", 0) or 0
+            record.completion_tokens = usage.get("completion_tokens", 0) or 0
+            record.cost_usd = usage_cost(self.model, usage)
+        if self.metrics is not None:
+            self.metrics.record(record)
+        if run_metrics is not None:
+            run_metrics.record(record)
+
+    def __call__(
+        self,
+        bypass_cache: bool = False,
+        run_metrics: RunMetrics | None = None,
+        store: bool = True,
+        **inputs,
+    ) -> dspy.Prediction:
+        started = time.perf_counter()
+        record = CallRecord(self.role, 0.0)
+        prediction = None
+        key = PredictionCache.make_key(self.signature, self.model, inputs, self.version)
+        try:
+            if not bypass_cache:
+                cached = self.cache.get(key)
+                restored = self._restore(cached) if cached is not None else None
+                if restored is not None:
+                    record.cache_hit = True
+                    return restored
+            with self._context():
+                prediction = self.predictor(**inputs)
+            if store:
+                self.cache.put(key, prediction.toDict())
+            return prediction
+        except Exception:
+            record.error = True
+            raise
+        finally:
+            record.latency_s = time.perf_counter() - started
+            self._record(record, prediction, run_metrics)
+
+    async def _stream(
+        self, on_partial: Callable[[str, bool], Awaitable[None]], inputs: dict
+    ) -> dspy.Prediction:
+        """
+        Run the predictor under ``dspy.streamify`` and report ``stream_field`` as it grows.
+
+        ``on_partial(text, complete)`` receives the accumulated field text
+        after every chunk; ``complete`` is True on the field's last chunk, so
+        callers that throttle updates never miss the final text. LMs that
+        cannot stream simply produce the final prediction.
+
+        Raises:
+            RuntimeError: If the stream ended without yielding a prediction.
+        """
+        program = dspy.streamify(
+            self.predictor,
+            stream_listeners=[
+                dspy.streaming.StreamListener(signature_field_name=self.stream_field)
+            ],
+            is_async_program=True,
+        )
+        text = ""
+        prediction = None
+        async for value in program(**inputs):
+            if isinstance(value, dspy.Prediction):
+                prediction = value
+            elif isinstance(value, dspy.streaming.StreamResponse):
+                text += value.chunk
+                await on_partial(text, value.is_last_chunk)
+        if prediction is None:
+            raise RuntimeError(f"{self.role} stream ended without a prediction")
+        return prediction
+
+    async def acall(
+        self,
+        bypass_cache: bool = False,
+        run_metrics: RunMetrics | None = None,
+        on_partial: Callable[[str, bool], Awaitable[None]] | None = None,
+        store: bool = True,
+        **inputs,
+    ) -> dspy.Prediction:
+        started = time.perf_counter()
+        record = CallRecord(self.role, 0.0)
+        prediction = None
+        key = PredictionCache.make_key(self.signature, self.model, inputs, self.version)
+        try:
+            if not bypass_cache:
+                cached = await asyncio.to_thread(self.cache.get, key)
+                restored = self._restore(cached) if cached is not None else None
+                if restored is not None:
+                    record.cache_hit = True
+                    return restored
+
+            async def call() -> dspy.Prediction:
+                with self._context():
+                    if on_partial is not None and self.stream_field:
+                        return await self._stream(on_partial, inputs)
+                    return await self.predictor.acall(**inputs)
+
+            if self.scheduler is None:
+                prediction = await call()
+            else:
+
+                def count_retry():
+                    record.retries += 1
+
+                prediction = await self.scheduler.run(
+                    call,
+                    estimated_tokens=estimate_tokens(inputs),
+                    on_retry=count_retry,
+                    lane=self.lane or None,
+                )
+            if store:
+                await asyncio.to_thread(self.cache.put, key, prediction.toDict())
+            return prediction
+        except asyncio.CancelledError:
+            record.cancelled = True
+            raise
+        except Exception:
+            record.error = True
+            raise
+        finally:
+            record.latency_s = time.perf_counter() - started
+            self._record(record, prediction, run_metrics)
+
+
+_cache: PredictionCache | None = None
+
+
+def get_prediction_cache() -> PredictionCache:
+    """
+    Get or create the process-wide prediction cache.
+
+    Configured through TWEET_CACHE_PATH, TWEET_CACHE_MAX_ENTRIES and
+    TWEET_CACHE_TTL_SECONDS; the defaults keep up to 50k predictions for a week.
+
+    Returns:
+        PredictionCache: Shared on-disk prediction cache.
+    """
+    global _cache
+    if _cache is None:
+        _cache = PredictionCache(
+            path=os.getenv("TWEET_CACHE_PATH", DEFAULT_CACHE_PATH),
+            max_entries=int(
+                os.getenv("TWEET_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES))
+            ),
+            ttl_seconds=float(
+                os.getenv("TWEET_CACHE_TTL_SECONDS", str(DEFAULT_TTL_SECONDS))
+            ),
+        )
+    return _cache
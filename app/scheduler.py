@@ -0,0 +1,312 @@
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import random
+import time
+from collections.abc import Awaitable, Callable
+from enum import IntEnum
+from typing import TypeVar
+
+import httpx
+import litellm
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+MAX_IN_FLIGHT = int(os.getenv("TWEET_LM_MAX_IN_FLIGHT", "32"))
+
+TRANSIENT_ERRORS: tuple[type[BaseException], ...] = (
+    litellm.RateLimitError,
+    litellm.Timeout,
+    litellm.APIConnectionError,
+    litellm.ServiceUnavailableError,
+    litellm.InternalServerError,
+    httpx.TransportError,
+    asyncio.TimeoutError,
+)
+
+
+class Priority(IntEnum):
+    """Admission priority; lower values are served first."""
+
+    INTERACTIVE = 0
+    BULK = 1
+
+
+current_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "current_priority", default=Priority.INTERACTIVE
+)
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at ``rate_per_minute``.
+
+    A ``rate_per_minute`` of None disables the limit.
+    """
+
+    def __init__(self, rate_per_minute: float | None, capacity: float | None = None):
+        self.rate_per_minute = rate_per_minute
+        self.capacity = capacity or rate_per_minute or 0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate_per_minute:
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) * self.rate_per_minute / 60,
+            )
+        self._updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until ``amount`` tokens are available (0 if they are now)."""
+        if not self.rate_per_minute:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self._tokens >= amount:
+            return 0.0
+        return (amount - self._tokens) * 60 / self.rate_per_minute
+
+    def take(self, amount: float):
+        if self.rate_per_minute:
+            self._refill()
+            self._tokens -= min(amount, self.capacity)
+
+
+def estimate_tokens(inputs: dict, completion_allowance: int = 600) -> float:
+    """
+    Rough token cost of one prediction, charged before the call is made.
+
+    Uses ~4 characters per token for the inputs plus a fixed allowance for
+    the signature prompt and the ChainOfThought completion.
+    """
+    chars = sum(len(str(value)) for value in inputs.values())
+    return chars / 4 + completion_allowance
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether ``error`` is worth retrying (rate limits, timeouts, 5xx, dropped connections)."""
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+class LMScheduler:
+    """
+    Process-wide gate in front of every LLM request.
+
+    Requests are admitted in priority order (interactive sessions ahead of
+    bulk jobs) once both the request and token buckets allow them, and at most
+    ``max_in_flight`` run concurrently. Transient failures are retried with
+    exponential backoff and full jitter; a provider rate limit also pauses
+    admission for everyone. Each attempt gets ``attempt_timeout`` seconds and
+    the whole call, retries included, must finish within ``call_deadline``.
+    Requests may also name a ``lane`` (the LM role, e.g. "generator"); a lane
+    listed in ``lane_limits`` never has more than that many requests admitted
+    or in flight, so one model's traffic cannot crowd out another's.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        max_retries: int = 5,
+        base_backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        attempt_timeout: float = 60.0,
+        call_deadline: float = 180.0,
+        lane_limits: dict[str, int] | None = None,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.attempt_timeout = attempt_timeout
+        self.call_deadline = call_deadline
+        self.lane_limits = dict(lane_limits or {})
+        self.retries = 0
+        self._in_flight: asyncio.Semaphore | None = None
+        self._cond: asyncio.Condition | None = None
+        self._lanes: dict[str, asyncio.Semaphore] = {}
+        self._waiting: list[tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+
+    @classmethod
+    def from_env(cls) -> "LMScheduler":
+        """
+        Build a scheduler from TWEET_LM_* environment variables.
+
+        Reads TWEET_LM_RPM, TWEET_LM_TPM, TWEET_LM_MAX_IN_FLIGHT,
+        TWEET_LM_MAX_RETRIES, TWEET_LM_ATTEMPT_TIMEOUT_S,
+        TWEET_LM_CALL_DEADLINE_S and per-lane TWEET_LM_MAX_IN_FLIGHT_<LANE>
+        (e.g. TWEET_LM_MAX_IN_FLIGHT_EVALUATOR); unset limits mean unlimited.
+        """
+        rpm = os.getenv("TWEET_LM_RPM")
+        tpm = os.getenv("TWEET_LM_TPM")
+        prefix = "TWEET_LM_MAX_IN_FLIGHT_"
+        lane_limits = {
+            name[len(prefix) :].lower(): int(value)
+            for name, value in os.environ.items()
+            if name.startswith(prefix) and value
+        }
+        return cls(
+            requests_per_minute=float(rpm) if rpm else None,
+            tokens_per_minute=float(tpm) if tpm else None,
+            max_in_flight=MAX_IN_FLIGHT,
+            max_retries=int(os.getenv("TWEET_LM_MAX_RETRIES", "5")),
+            attempt_timeout=float(os.getenv("TWEET_LM_ATTEMPT_TIMEOUT_S", "60")),
+            call_deadline=float(os.getenv("TWEET_LM_CALL_DEADLINE_S", "180")),
+            lane_limits=lane_limits,
+        )
+
+    def set_limits(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+    ):
+        """Replace the request and token rate limits (None leaves one unchanged)."""
+        if requests_per_minute is not None:
+            self.requests = TokenBucket(requests_per_minute)
+        if tokens_per_minute is not None:
+            self.tokens = TokenBucket(tokens_per_minute)
+
+    def _primitives(self) -> tuple[asyncio.Semaphore, asyncio.Condition]:
+        if self._in_flight is None:
+            self._in_flight = asyncio.Semaphore(self.max_in_flight)
+            self._cond = asyncio.Condition()
+        return self._in_flight, self._cond
+
+    def _lane(self, lane: str | None):
+        """Concurrency gate of ``lane`` (a no-op for unnamed or unlimited lanes)."""
+        limit = self.lane_limits.get(lane) if lane else None
+        if not limit:
+            return contextlib.nullcontext()
+        if lane not in self._lanes:
+            self._lanes[lane] = asyncio.Semaphore(limit)
+        return self._lanes[lane]
+
+    async def _admit(self, priority: Priority, tokens: float):
+        """Wait until this request is first in line and both buckets allow it."""
+        _, cond = self._primitives()
+        entry = (int(priority), next(self._seq))
+        async with cond:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    if self._waiting[0] == entry:
+                        wait = max(
+                            self._paused_until - time.monotonic(),
+                            self.requests.time_until(1),
+                            self.tokens.time_until(tokens),
+                        )
+                        if wait <= 0:
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            return
+                        try:
+                            await asyncio.wait_for(cond.wait(), wait)
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        await cond.wait()
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                cond.notify_all()
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * 2**attempt))
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        estimated_tokens: float = 0,
+        priority: Priority | None = None,
+        on_retry: Callable[[], None] | None = None,
+        lane: str | None = None,
+    ) -> T:
+        """
+        Run ``call`` under the rate limits, retrying transient failures.
+
+        Args:
+            call: Zero-argument coroutine factory issuing one LLM request.
+            estimated_tokens: Prompt plus expected completion tokens, charged
+                against the token bucket.
+            priority: Admission priority; defaults to ``current_priority``.
+            on_retry: Called before each retry, e.g. to count retries per call.
+            lane: Lane whose concurrency limit applies (see ``lane_limits``).
+
+        Returns:
+            The result of ``call``.
+
+        Raises:
+            Exception: The last error once it is not transient, retries are
+                exhausted, or the call deadline would be exceeded.
+        """
+        priority = current_priority.get() if priority is None else priority
+        in_flight, _ = self._primitives()
+        deadline = time.monotonic() + self.call_deadline
+        attempt = 0
+        while True:
+            try:
+                async with self._lane(lane):
+                    await self._admit(priority, estimated_tokens)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError("LLM call deadline exceeded")
+                    async with in_flight:
+                        return await asyncio.wait_for(
+                            call(), min(self.attempt_timeout, remaining)
+                        )
+            except Exception as e:
+                if not is_transient(e) or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+                if time.monotonic() + delay >= deadline:
+                    raise
+                if isinstance(e, litellm.RateLimitError):
+                    self._paused_until = max(
+                        self._paused_until, time.monotonic() + delay
+                    )
+                attempt += 1
+                self.retries += 1
+                if on_retry is not None:
+                    on_retry()
+                logger.warning(
+                    f"Transient LLM error ({type(e).__name__}: {e}); "
+                    f"retry {attempt}/{self.max_retries} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+
+_scheduler: LMScheduler | None = None
+
+
+def get_scheduler() -> LMScheduler:
+    """
+    Get or create the process-wide LLM request scheduler.
+
+    Returns:
+        LMScheduler: Shared scheduler configured from the environment.
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LMScheduler.from_env()
+    return _scheduler
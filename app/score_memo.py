@@ -0,0 +1,147 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_MEMO_PATH = ".cache/scores.sqlite3"
+DEFAULT_MEMO_MAX_ENTRIES = 200_000
+DEFAULT_MEMO_TTL_SECONDS = 30 * 24 * 60 * 60
+MEMO_EVICTION_INTERVAL = 100
+
+
+def _tweet_key(tweet: str) -> str:
+    return hashlib.sha256(tweet.strip().encode("utf-8")).hexdigest()
+
+
+def normalize_category(category: str) -> str:
+    """Canonical form used to match categories across edits and model echoes."""
+    return " ".join(category.lower().split())
+
+
+class ScoreMemo:
+    """
+    Persistent per-(model, tweet, category) score store.
+
+    Unlike the prediction cache, which keys a whole evaluation on the joined
+    category string, this keeps every category's score separately, so adding a
+    category only requires scoring that category and removing one needs no
+    LLM call at all.
+
+    Like the prediction cache, scores expire after ``ttl_seconds`` and the
+    least recently used are evicted once the store holds more than
+    ``max_entries`` (tweet, category) rows, checked every
+    ``eviction_interval`` writes.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_MEMO_PATH,
+        max_entries: int = DEFAULT_MEMO_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_MEMO_TTL_SECONDS,
+        eviction_interval: int = MEMO_EVICTION_INTERVAL,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.eviction_interval = max(1, eviction_interval)
+        self._puts = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            "model TEXT NOT NULL, tweet_key TEXT NOT NULL, category TEXT NOT NULL, "
+            "score INTEGER NOT NULL, updated_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL, "
+            "PRIMARY KEY (model, tweet_key, category))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS scores_accessed_at ON scores (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get_many(self, model: str, tweet: str, categories: list[str]) -> dict[str, int]:
+        """Return the unexpired memoized scores of ``tweet`` for whichever ``categories`` are known."""
+        by_norm = {normalize_category(c): c for c in categories}
+        if not by_norm:
+            return {}
+        now = time.time()
+        key = _tweet_key(tweet)
+        placeholders = ", ".join("?" for _ in by_norm)
+        params = (model, key, *by_norm)
+        where = f"model = ? AND tweet_key = ? AND category IN ({placeholders})"
+        with self._lock:
+            self._conn.execute(
+                f"DELETE FROM scores WHERE {where} AND updated_at < ?",
+                (*params, now - self.ttl_seconds),
+            )
+            rows = self._conn.execute(
+                f"SELECT category, score FROM scores WHERE {where}", params
+            ).fetchall()
+            if rows:
+                self._conn.execute(
+                    f"UPDATE scores SET accessed_at = ? WHERE {where}", (now, *params)
+                )
+            self._conn.commit()
+        return {by_norm[category]: score for category, score in rows}
+
+    def put_many(self, model: str, tweet: str, scores: dict[str, int]):
+        """Memoize ``scores`` (category -> score) for ``tweet``, evicting the LRU overflow when due."""
+        now = time.time()
+        key = _tweet_key(tweet)
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO scores "
+                "(model, tweet_key, category, score, updated_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (model, key, normalize_category(category), int(score), now, now)
+                    for category, score in scores.items()
+                ],
+            )
+            self._puts += 1
+            if self._puts % self.eviction_interval == 0:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop the least recently used rows beyond ``max_entries`` (lock held)."""
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()
+        if count <= self.max_entries:
+            return
+        self._conn.execute(
+            "DELETE FROM scores WHERE rowid IN ("
+            "SELECT rowid FROM scores ORDER BY accessed_at LIMIT ?)",
+            (count - self.max_entries,),
+        )
+
+
+_memo: ScoreMemo | None = None
+
+
+def get_score_memo() -> ScoreMemo:
+    """
+    Get or create the process-wide score memo.
+
+    Stored at TWEET_SCORE_MEMO_PATH (default .cache/scores.sqlite3) and
+    bounded by TWEET_SCORE_MEMO_MAX_ENTRIES and TWEET_SCORE_MEMO_TTL_SECONDS;
+    the defaults keep up to 200k category scores for 30 days.
+
+    Returns:
+        ScoreMemo: Shared per-category score store.
+    """
+    global _memo
+    if _memo is None:
+        _memo = ScoreMemo(
+            os.getenv("TWEET_SCORE_MEMO_PATH", DEFAULT_MEMO_PATH),
+            max_entries=int(
+                os.getenv("TWEET_SCORE_MEMO_MAX_ENTRIES", str(DEFAULT_MEMO_MAX_ENTRIES))
+            ),
+            ttl_seconds=float(
+                os.getenv("TWEET_SCORE_MEMO_TTL_SECONDS", str(DEFAULT_MEMO_TTL_SECONDS))
+            ),
+        )
+    return _memo
@@ -1,18 +1,32 @@
 import reflex as rx
-from typing import TypedDict
+from typing import TYPE_CHECKING, TypedDict
+import asyncio
 import json
 import logging
-import asyncio
-from app.dspy_modules import get_generator, get_evaluator
+import time
+from app.history import HistoryRecord, HistoryRing, tweet_id
+from app.optimizer.jobs import get_job_queue, use_job_queue
+from app.optimizer.types import (
+    DEFAULT_CATEGORIES,
+    OptimizerConfig,
+    ProgressEvent,
+    Score,
+)
 
+if TYPE_CHECKING:
+    from app.optimizer.engine import Optimizer
 
-class Category(TypedDict):
-    description: str
+STREAM_UPDATE_INTERVAL_S = 0.1
 
+logger = logging.getLogger(__name__)
 
-class Score(TypedDict):
-    category: str
-    score: int
+# Optimizers running in this process, by client token, so stop_processing
+# can cancel their in-flight requests (they cannot live in state vars).
+_active_runs: dict[str, "Optimizer"] = {}
+
+
+class Category(TypedDict):
+    description: str
 
 
 class DSPyState(rx.State):
@@ -25,12 +39,32 @@ class DSPyState(rx.State):
     )
     iterations: int = 10
     patience: int = 3
+    population_size: int = 1
+    beam_width: int = 1
+    strategy: str = "beam"
+    bypass_cache: bool = False
+    prefilter: bool = True
+    noise_aware: bool = False
+    warm_start: bool = True
+    fast_scorer: bool = False
+    cascade: bool = False
+    cascade_finalists: int = 1
+    speculative: bool = False
+    multi_variant: bool = False
     current_tweet: str = ""
     best_tweet: str = ""
     current_scores: list[Score] = []
     best_scores: list[Score] = []
     iteration_count: int = 0
     patience_counter: int = 0
+    evaluations_saved: int = 0
+    screened_out: int = 0
+    warm_start_seeds: int = 0
+    run_metrics: dict[str, float] = rx.field(default_factory=dict)
+    score_history: list[dict[str, float]] = rx.field(default_factory=list)
+    _history: HistoryRing = rx.field(default_factory=HistoryRing)
+    _job_id: str = ""
+    _scored_fast: bool = False
 
     @rx.var
     def categories(self) -> list[Category]:
@@ -45,14 +79,33 @@ class DSPyState(rx.State):
                 return self._default_categories()
         return self._default_categories()
 
-    def _default_categories(self) -> list[Category]:
-        """Return default categories."""
+    @rx.var
+    def metric_tiles(self) -> list[dict[str, str]]:
+        """Format the current run's call metrics for display."""
+        m = self.run_metrics
+        if not m:
+            return []
         return [
-            {"description": "Clarity and conciseness"},
-            {"description": "Engagement and hook"},
-            {"description": "Hashtag relevance"},
+            {
+                "label": "LLM calls",
+                "value": f"{int(m['calls'])} ({int(m['cache_hits'])} cached)",
+            },
+            {
+                "label": "Tokens in / out",
+                "value": f"{int(m['prompt_tokens']):,} / {int(m['completion_tokens']):,}",
+            },
+            {"label": "Cost", "value": f"${m['cost_usd']:.4f}"},
+            {
+                "label": "Latency p50 / p99",
+                "value": f"{m['latency_p50_s']:.2f}s / {m['latency_p99_s']:.2f}s",
+            },
+            {"label": "Retries", "value": str(int(m["retries"]))},
         ]
 
+    def _default_categories(self) -> list[Category]:
+        """Return default categories."""
+        return [{"description": description} for description in DEFAULT_CATEGORIES]
+
     def _save_categories(self, new_categories: list[Category]):
         """Save categories to local storage as a JSON string."""
         self.categories_json = json.dumps(new_categories)
@@ -65,6 +118,7 @@ class DSPyState(rx.State):
             current_categories.append({"description": self.new_category.strip()})
             self._save_categories(current_categories)
             self.new_category = ""
+            return DSPyState.rescore_candidates
 
     @rx.event
     def remove_category(self, index: int):
@@ -73,78 +127,189 @@ class DSPyState(rx.State):
         if 0 <= index < len(current_categories):
             current_categories.pop(index)
             self._save_categories(current_categories)
+            return DSPyState.rescore_candidates
+
+    @rx.event(background=True)
+    async def rescore_candidates(self):
+        """Re-rank the current and best tweets after a category edit.
+
+        Only categories without a memoized score are evaluated; removed ones
+        simply drop out of the totals.
+        """
+        async with self:
+            if self.processing or not self.best_scores:
+                return
+            tweets = [self.best_tweet]
+            if self.current_scores and self.current_tweet != self.best_tweet:
+                tweets.append(self.current_tweet)
+            categories = [cat["description"] for cat in self.categories]
+            fast_scorer = self._scored_fast
+        # Deferred import: DSPy stays off the startup path (see app.warmup).
+        from app.optimizer.scoring import rescore
+
+        try:
+            ranked = await rescore(tweets, categories, fast_scorer=fast_scorer)
+        except Exception:
+            logger.exception("Error re-scoring candidates")
+            return
+        by_tweet = {candidate["tweet"]: candidate for candidate in ranked}
+        async with self:
+            self.best_tweet = ranked[0]["tweet"]
+            self.best_scores = ranked[0]["scores"]
+            if self.current_tweet in by_tweet:
+                self.current_scores = by_tweet[self.current_tweet]["scores"]
+
+    def _set_changed(self, name: str, value):
+        """Assign a var only when its value changed, keeping it out of the delta otherwise."""
+        if getattr(self, name) != value:
+            setattr(self, name, value)
+
+    def _apply_event(self, event: ProgressEvent):
+        """
+        Mirror an optimizer progress event into the UI state.
+
+        Only vars whose value changed are assigned, so each event's delta
+        carries just what is new. Scored rounds go into the bounded history
+        ring and ``score_history`` is rebuilt from it. Reflex sends a changed
+        var whole (appending to a list var resends the list too), so every
+        scored round deliberately resends the chart; the ring caps it at
+        ``DEFAULT_HISTORY_CAPACITY`` points, so the payload stays the same
+        size however long the run.
+        """
+        if event.kind == "iteration_started":
+            self.iteration_count = event.iteration
+            return
+        if event.kind == "initial":
+            self.warm_start_seeds = event.warm_start
+        if event.current is not None:
+            self._set_changed("current_tweet", event.current["tweet"])
+            self._set_changed("current_scores", event.current["scores"])
+            if event.kind in ("initial", "iteration"):
+                self._history.append(
+                    HistoryRecord(
+                        iteration=event.iteration,
+                        tweet_id=tweet_id(event.current["tweet"]),
+                        total=event.current["total"],
+                        accepted=event.improved or event.kind == "initial",
+                    )
+                )
+                self.score_history = self._history.chart_points()
+        if event.best is not None:
+            self._set_changed("best_tweet", event.best["tweet"])
+            self._set_changed("best_scores", event.best["scores"])
+        self._set_changed("patience_counter", event.patience_counter)
+        if event.metrics:
+            self.run_metrics = event.metrics
+        if event.kind in ("iteration", "finished"):
+            self._set_changed("evaluations_saved", event.evaluations_saved)
+            self._set_changed("screened_out", event.screened_out)
 
     @rx.event(background=True)
     async def start_processing(self):
-        """Starts the tweet optimization hill climbing process."""
+        """Starts the tweet optimization hill climbing process.
+
+        Runs an ``app.optimizer.Optimizer`` configured from the sidebar and
+        mirrors its progress events into state as they arrive. Tweets being
+        generated stream into ``current_tweet``, at most one state update
+        every STREAM_UPDATE_INTERVAL_S seconds. With TWEET_JOB_QUEUE=1 the run
+        is queued for a worker process (``python -m app.optimizer.worker``)
+        instead, and its events are followed from the job queue.
+        """
         async with self:
             if self.processing:
                 return
             self.processing = True
             self.iteration_count = 0
             self.patience_counter = 0
+            self.evaluations_saved = 0
+            self.screened_out = 0
+            self.warm_start_seeds = 0
+            self._scored_fast = self.fast_scorer
+            self.run_metrics = {}
+            self._history.clear()
+            self.score_history = []
             self.best_tweet = ""
             self.best_scores = []
-        generator = get_generator()
-        evaluator = get_evaluator()
-        category_str = "; ".join([cat["description"] for cat in self.categories])
-        async with self:
             self.current_tweet = "Generating initial tweet..."
-        yield
-        try:
-            initial_result = await asyncio.to_thread(
-                generator, input_text=self.input_text
+            config = OptimizerConfig(
+                input_text=self.input_text,
+                categories=[cat["description"] for cat in self.categories],
+                iterations=self.iterations,
+                patience=self.patience,
+                population_size=self.population_size,
+                beam_width=self.beam_width,
+                strategy=self.strategy,
+                bypass_cache=self.bypass_cache,
+                prefilter=self.prefilter,
+                noise_aware=self.noise_aware,
+                warm_start=self.warm_start,
+                fast_scorer=self.fast_scorer,
+                cascade=self.cascade,
+                cascade_finalists=self.cascade_finalists,
+                speculative=self.speculative,
+                variants_per_call=self.population_size if self.multi_variant else 1,
             )
-            initial_tweet = initial_result.tweet
-            eval_result = await asyncio.to_thread(
-                evaluator, tweet=initial_tweet, categories=category_str
-            )
-            initial_scores = json.loads(eval_result.scores)
+            client_token = self.router.session.client_token
+        yield
+        last_partial = 0.0
+
+        async def show_partial(text: str, complete: bool):
+            nonlocal last_partial
+            now = time.monotonic()
+            if not complete and now - last_partial < STREAM_UPDATE_INTERVAL_S:
+                return
+            last_partial = now
             async with self:
-                self.best_tweet = self.current_tweet = initial_tweet
-                self.best_scores = self.current_scores = initial_scores
-            best_total_score = sum((s.get("score", 0) for s in initial_scores))
-            for i in range(self.iterations):
-                if not self.processing:
-                    break
-                async with self:
-                    self.iteration_count = i + 1
-                yield
-                new_result = await asyncio.to_thread(
-                    generator, input_text=self.best_tweet
-                )
-                new_tweet = new_result.tweet
-                eval_result = await asyncio.to_thread(
-                    evaluator, tweet=new_tweet, categories=category_str
-                )
-                new_scores = json.loads(eval_result.scores)
-                new_total_score = sum((s.get("score", 0) for s in new_scores))
+                if self.processing:
+                    self.current_tweet = text
+
+        if use_job_queue():
+            queue = get_job_queue()
+            job_id = await asyncio.to_thread(queue.enqueue, config)
+            async with self:
+                self._job_id = job_id
+                if self.current_tweet == "Generating initial tweet...":
+                    self.current_tweet = "Queued for a worker..."
+            events = queue.follow(job_id, on_partial=show_partial)
+            stop = None
+        else:
+            from app.optimizer.engine import Optimizer
+
+            optimizer = Optimizer(config, on_partial=show_partial)
+            _active_runs[client_token] = optimizer
+            events = optimizer.run()
+            stop = optimizer.stop
+        try:
+            async for event in events:
                 async with self:
-                    self.current_tweet = new_tweet
-                    self.current_scores = new_scores
-                    if new_total_score > best_total_score:
-                        self.best_tweet = new_tweet
-                        self.best_scores = new_scores
-                        best_total_score = new_total_score
-                        self.patience_counter = 0
-                    else:
-                        self.patience_counter += 1
-                    if self.patience_counter >= self.patience:
-                        self.processing = False
-                        break
+                    if not self.processing and stop is not None:
+                        stop()
+                    self._apply_event(event)
                 yield
         except Exception as e:
             logging.exception(f"Error during DSPy processing: {e}")
             async with self:
                 self.current_tweet = f"Error: {e}"
         finally:
+            _active_runs.pop(client_token, None)
             async with self:
                 self.processing = False
+                self._job_id = ""
 
     @rx.event
     def stop_processing(self):
-        """Stops the tweet optimization process."""
+        """
+        Stops the tweet optimization process.
+
+        An in-process run is cancelled at once, aborting its LLM requests in
+        flight; in queue mode its job is cancelled.
+        """
         self.processing = False
+        optimizer = _active_runs.get(self.router.session.client_token)
+        if optimizer is not None:
+            optimizer.cancel()
+        if self._job_id:
+            get_job_queue().cancel(self._job_id)
 
     @rx.event
     def toggle_sidebar(self):
@@ -165,7 +330,67 @@ class DSPyState(rx.State):
         """Set the patience value from the slider."""
         self.patience = int(value)
 
+    @rx.event
+    def set_population_size(self, value: str):
+        """Set the number of candidates generated in parallel per round."""
+        self.population_size = int(value)
+
+    @rx.event
+    def set_beam_width(self, value: str):
+        """Set how many top tweets are kept as parents for the next round."""
+        self.beam_width = int(value)
+
+    @rx.event
+    def set_strategy(self, value: str):
+        """Set the search strategy used for the next run."""
+        self.strategy = value
+
+    @rx.event
+    def toggle_bypass_cache(self):
+        """Toggle whether runs ignore previously cached predictions."""
+        self.bypass_cache = not self.bypass_cache
+
+    @rx.event
+    def toggle_prefilter(self):
+        """Toggle the local pre-filter that screens candidates before evaluation."""
+        self.prefilter = not self.prefilter
+
+    @rx.event
+    def toggle_warm_start(self):
+        """Toggle starting from the best known tweets of earlier runs on similar inputs."""
+        self.warm_start = not self.warm_start
+
+    @rx.event
+    def toggle_noise_aware(self):
+        """Toggle re-sampling close scores and accepting only confident improvements."""
+        self.noise_aware = not self.noise_aware
+
+    @rx.event
+    def toggle_fast_scorer(self):
+        """Toggle scoring without the evaluator's reasoning step."""
+        self.fast_scorer = not self.fast_scorer
+
+    @rx.event
+    def toggle_speculative(self):
+        """Toggle generating the next round's mutations while scoring the current one."""
+        self.speculative = not self.speculative
+
+    @rx.event
+    def toggle_multi_variant(self):
+        """Toggle generating each round's mutations of a tweet in one call."""
+        self.multi_variant = not self.multi_variant
+
+    @rx.event
+    def toggle_cascade(self):
+        """Toggle screening mutations with the cheap model before final scoring."""
+        self.cascade = not self.cascade
+
+    @rx.event
+    def set_cascade_finalists(self, value: str):
+        """Set how many screened mutations per round reach the evaluator."""
+        self.cascade_finalists = int(value)
+
     @rx.event
     def set_new_category(self, text: str):
         """Update the new category input field."""
-        self.new_category = text
\ No newline at end of file
+        self.new_category = text
@@ -0,0 +1,73 @@
+import asyncio
+import importlib
+import logging
+import os
+import time
+
+# Modules the first optimization run imports; DSPy and litellm load with them.
+WARMUP_MODULES = ("app.optimizer.engine", "app.optimizer.scoring")
+
+logger = logging.getLogger(__name__)
+
+
+def warmup_enabled() -> bool:
+    """Whether the server warms up at startup (TWEET_WARMUP, on unless 0/false/no)."""
+    return os.getenv("TWEET_WARMUP", "1").strip().lower() not in ("0", "false", "no")
+
+
+def warm_up() -> float:
+    """
+    Do the one-time work of the first optimization run ahead of time.
+
+    Imports the optimizer (and with it DSPy and litellm), builds every LM
+    and predictor, loading their compiled artifacts, and opens the score
+    memo and result store. Blocking.
+
+    Returns:
+        float: Seconds taken.
+    """
+    start = time.perf_counter()
+    for module in WARMUP_MODULES:
+        importlib.import_module(module)
+    from app.dspy_modules import PREDICTOR_GETTERS
+    from app.optimizer.store import get_result_store
+    from app.score_memo import get_score_memo
+
+    for getter in PREDICTOR_GETTERS:
+        getter()
+    get_score_memo()
+    get_result_store()
+    return time.perf_counter() - start
+
+
+async def preconnect():
+    """Open a pooled keep-alive connection to OpenRouter (no-op for other backends)."""
+    if os.getenv("TWEET_LM_BACKEND", "openrouter") != "openrouter":
+        return
+    import litellm
+
+    from app.dspy_modules import OPENROUTER_API_BASE
+
+    if litellm.aclient_session is not None:
+        await litellm.aclient_session.head(OPENROUTER_API_BASE)
+
+
+async def warm_up_on_startup():
+    """
+    Reflex lifespan task: warm up in the background when the server starts.
+
+    The blocking part runs in a thread, so the server accepts connections
+    at once; a run started meanwhile builds whatever is not ready yet.
+    Failures (e.g. a missing API key) are logged and left to the first run.
+    """
+    if not warmup_enabled():
+        return
+    try:
+        elapsed = await asyncio.to_thread(warm_up)
+        await preconnect()
+    except Exception:
+        logger.warning(
+            "Warm-up failed, predictors will be built on first use", exc_info=True
+        )
+        return
+    logger.info(f"Warmed up predictors in {elapsed:.2f}s")
@@ -0,0 +1,328 @@
+"""
+Benchmark the hill-climbing loop against the deterministic MockLM.
+
+Runs the headless optimizer over a grid of search strategy, iteration,
+patience and population settings and reports, per setting:
+
+- wall-clock time, mean round time and the worst event-loop stall seen by a
+  heartbeat task;
+- LM calls per accepted improvement, best score reached and score gained
+  per LM call (the figure strategies are compared on);
+- the noise-free score of the final best tweet (to judge noise-aware
+  acceptance under --score-noise);
+- LM calls until the best total first reached --target-total (to compare
+  compiled programs against uncompiled ones, see TWEET_ARTIFACT_VERSION);
+- tokens per run and evaluator outputs that were repaired or retried (see
+  --malformed-rate and --fast-scorer);
+- screener calls and mutations it kept from the evaluator (see --cascade);
+- speculative generations used, discarded and cancelled in flight (see
+  --speculative);
+- variants dropped as duplicates (see --variants-per-call) and candidates
+  the pre-filter dropped as near-duplicates (see --similarity-threshold);
+- the cost of mirroring progress events into DSPyState (apply + delta +
+  JSON, and the largest single delta, which should stay flat however many
+  iterations run).
+
+Usage:
+    python -m benchmarks.bench_optimizer --latency-ms 20 --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from itertools import product
+
+_BENCH_DIR = tempfile.mkdtemp()
+os.environ.setdefault("TWEET_CACHE_PATH", os.path.join(_BENCH_DIR, "bench.sqlite3"))
+os.environ.setdefault(
+    "TWEET_SCORE_MEMO_PATH", os.path.join(_BENCH_DIR, "scores.sqlite3")
+)
+os.environ.setdefault(
+    "TWEET_RESULT_STORE_PATH", os.path.join(_BENCH_DIR, "results.sqlite3")
+)
+
+from reflex.utils import format
+
+from app.dspy_modules import set_lm
+from app.mock_lm import MockLM
+from app.optimizer import STRATEGIES, Optimizer, OptimizerConfig, PreFilter
+from app.states.dspy_state import DSPyState
+
+INPUT_TEXT = (
+    "Reflex is a web framework that allows you to build web apps in pure Python."
+)
+
+
+async def _heartbeat(interval: float, stalls: list[float], stop: asyncio.Event):
+    """Record how late each wake-up is; large values mean the loop was blocked."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        stalls.append(max(0.0, loop.time() - start - interval))
+
+
+async def run_once(
+    config: OptimizerConfig,
+    lm: MockLM,
+    target_total: float | None = None,
+    screener: MockLM | None = None,
+    similarity_threshold: float | None = None,
+) -> dict:
+    """
+    Run one optimization and collect timing, call and state-update figures.
+
+    LM calls count both models when a separate ``screener`` is used.
+    """
+    state = DSPyState(_reflex_internal_init=True)
+    stalls: list[float] = []
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(0.001, stalls, stop))
+    lms = [lm] if screener is None else [lm, screener]
+    calls_before = sum(m.calls for m in lms)
+    improvements = 0
+    state_times: list[float] = []
+    delta_bytes = 0
+    max_delta_bytes = 0
+    initial_total = 0
+    best_total = 0
+    best_tweet = ""
+    calls_to_target = None
+    round_started = 0.0
+    round_times: list[float] = []
+
+    started = time.perf_counter()
+    prefilter = None
+    if similarity_threshold is not None:
+        prefilter = PreFilter(similarity_threshold=similarity_threshold)
+    optimizer = Optimizer(config, prefilter=prefilter)
+    async for event in optimizer.run():
+        if event.kind == "initial":
+            initial_total = event.best["total"]
+        if event.best:
+            best_total, best_tweet = event.best["total"], event.best["tweet"]
+            if (
+                calls_to_target is None
+                and target_total is not None
+                and best_total >= target_total
+            ):
+                calls_to_target = sum(m.calls for m in lms) - calls_before
+        if event.kind == "iteration_started":
+            round_started = time.perf_counter()
+        elif event.kind == "iteration":
+            round_times.append(time.perf_counter() - round_started)
+        improvements += event.improved
+        t0 = time.perf_counter()
+        state._apply_event(event)
+        payload = format.json_dumps(state.get_delta())
+        state._clean()
+        state_times.append(time.perf_counter() - t0)
+        delta_bytes += len(payload)
+        max_delta_bytes = max(max_delta_bytes, len(payload))
+    wall = time.perf_counter() - started
+    stop.set()
+    await heartbeat
+
+    calls = sum(m.calls for m in lms) - calls_before
+    metrics = optimizer.metrics.summary()
+    return {
+        "wall_clock_s": wall,
+        "lm_calls": calls,
+        "improvements": improvements,
+        "calls_per_improvement": calls / improvements if improvements else None,
+        "best_total": best_total,
+        "true_best_total": sum(
+            lm.score(best_tweet, c, noisy=False) for c in config.categories
+        ),
+        "score_gain_per_call": (best_total - initial_total) / calls if calls else None,
+        "calls_to_target": calls_to_target,
+        "prompt_tokens": metrics["prompt_tokens"],
+        "completion_tokens": metrics["completion_tokens"],
+        "repaired_outputs": optimizer.scorer.repaired,
+        "retried_tweets": optimizer.scorer.retried,
+        "screened_out": optimizer.screened_out,
+        "near_duplicates": (
+            optimizer.prefilter.rejections.get("near_duplicate", 0)
+            if optimizer.prefilter
+            else 0
+        ),
+        "round_mean_s": statistics.mean(round_times) if round_times else None,
+        "speculation_used": optimizer.speculation_used,
+        "speculation_discarded": optimizer.speculation_discarded,
+        "cancelled_calls": metrics["cancelled"],
+        "variants_dropped": optimizer.variants_dropped,
+        "loop_max_stall_ms": max(stalls, default=0.0) * 1000,
+        "state_update_mean_us": statistics.mean(state_times) * 1e6,
+        "state_delta_bytes": delta_bytes,
+        "state_delta_max_bytes": max_delta_bytes,
+        "events": len(state_times),
+    }
+
+
+def summarize(runs: list[dict]) -> dict:
+    """Average numeric fields across repeats (None-aware)."""
+    summary = {}
+    for key in runs[0]:
+        values = [r[key] for r in runs if r[key] is not None]
+        summary[key] = statistics.mean(values) if values else None
+    return summary
+
+
+async def run_grid(args: argparse.Namespace) -> dict:
+    lm = MockLM(
+        seed=args.seed,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        latency_distribution=args.latency_distribution,
+        failure_rate=0.0,
+        score_mode=args.score_mode,
+        score_noise=args.score_noise,
+        malformed_rate=args.malformed_rate,
+    )
+    set_lm(lm)
+    screener = None
+    if args.cascade:
+        screener = MockLM(
+            seed=args.seed,
+            latency_ms=args.screener_latency_ms,
+            score_mode=args.score_mode,
+            score_noise=args.screener_score_noise,
+            malformed_rate=args.malformed_rate,
+            model="mock/tweet-lm-screener",
+        )
+        set_lm(screener, role="screener")
+    results = []
+    for strategy, iterations, patience, population in product(
+        args.strategy, args.iterations, args.patience, args.population
+    ):
+        config = OptimizerConfig(
+            input_text=INPUT_TEXT,
+            iterations=iterations,
+            patience=patience,
+            population_size=population,
+            strategy=strategy,
+            bypass_cache=True,
+            noise_aware=args.noise_aware,
+            fast_scorer=args.fast_scorer,
+            cascade=args.cascade,
+            cascade_finalists=args.finalists,
+            speculative=args.speculative,
+            variants_per_call=args.variants_per_call,
+        )
+        runs = [
+            await run_once(
+                config, lm, args.target_total, screener, args.similarity_threshold
+            )
+            for _ in range(args.repeats)
+        ]
+        results.append(
+            {
+                "strategy": strategy,
+                "iterations": iterations,
+                "patience": patience,
+                "population_size": population,
+                **summarize(runs),
+            }
+        )
+    return {
+        "benchmark": "optimizer_loop",
+        "timestamp": time.time(),
+        "python": sys.version.split()[0],
+        "lm": {
+            "latency_ms": args.latency_ms,
+            "latency_jitter_ms": args.latency_jitter_ms,
+            "latency_distribution": args.latency_distribution,
+            "score_mode": args.score_mode,
+            "score_noise": args.score_noise,
+            "malformed_rate": args.malformed_rate,
+            "seed": args.seed,
+        },
+        "repeats": args.repeats,
+        "noise_aware": args.noise_aware,
+        "fast_scorer": args.fast_scorer,
+        "speculative": args.speculative,
+        "variants_per_call": args.variants_per_call,
+        "cascade": (
+            {
+                "finalists": args.finalists,
+                "screener_latency_ms": args.screener_latency_ms,
+                "screener_score_noise": args.screener_score_noise,
+            }
+            if args.cascade
+            else None
+        ),
+        "target_total": args.target_total,
+        "artifact_version": os.getenv("TWEET_ARTIFACT_VERSION", "latest"),
+        "results": results,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--strategy", nargs="+", choices=sorted(STRATEGIES), default=["beam"]
+    )
+    parser.add_argument("--iterations", type=int, nargs="+", default=[5, 10])
+    parser.add_argument("--patience", type=int, nargs="+", default=[3, 10])
+    parser.add_argument("--population", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=5.0)
+    parser.add_argument(
+        "--latency-distribution",
+        choices=["fixed", "uniform", "lognormal"],
+        default="uniform",
+    )
+    parser.add_argument("--score-mode", choices=["hash", "climb"], default="climb")
+    parser.add_argument("--score-noise", type=int, default=0)
+    parser.add_argument("--noise-aware", action="store_true")
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--fast-scorer", action="store_true")
+    parser.add_argument(
+        "--cascade",
+        action="store_true",
+        help="Screen mutations with a faster, noisier mock model first.",
+    )
+    parser.add_argument("--finalists", type=int, default=1)
+    parser.add_argument("--screener-latency-ms", type=float, default=5.0)
+    parser.add_argument("--screener-score-noise", type=int, default=1)
+    parser.add_argument(
+        "--speculative",
+        action="store_true",
+        help="Generate each next round while the current one is scored.",
+    )
+    parser.add_argument(
+        "--variants-per-call",
+        type=int,
+        default=1,
+        help="Mutations of the same parent generated per LLM call.",
+    )
+    parser.add_argument(
+        "--similarity-threshold",
+        type=float,
+        help="Pre-filter near-duplicate MinHash threshold (default: PreFilter's).",
+    )
+    parser.add_argument("--target-total", type=float)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results here instead of stdout.")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    report = asyncio.run(run_grid(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
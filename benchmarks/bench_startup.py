@@ -0,0 +1,137 @@
+"""
+Benchmark app startup time and the latency of the first optimization run.
+
+Each measurement runs in a fresh interpreter, so nothing is imported or
+built yet. Reports the median time to import the Reflex app module (what
+every backend worker start and hot reload pays), to import the optimizer
+engine (DSPy and litellm, deferred until the first run or the warm-up),
+and for a first run against the MockLM: time to its first progress event
+and to completion, cold (built on first use, as a click on a fresh server)
+and after ``app.warmup.warm_up`` (as with TWEET_WARMUP, its own time is
+reported separately since it runs in the background at server start).
+
+Usage:
+    python -m benchmarks.bench_startup --latency-ms 20 --output startup.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+INPUT_TEXT = (
+    "Reflex is a web framework that allows you to build web apps in pure Python."
+)
+IMPORT_TARGETS = {"app_import_s": "app.app", "engine_import_s": "app.optimizer.engine"}
+
+
+def _child_env(args: argparse.Namespace) -> dict[str, str]:
+    """Environment of a fresh process: mock backend and empty caches."""
+    directory = tempfile.mkdtemp()
+    return {
+        **os.environ,
+        "TWEET_LM_BACKEND": "mock",
+        "MOCK_LM_LATENCY_MS": str(args.latency_ms),
+        "TWEET_CACHE_PATH": os.path.join(directory, "cache.sqlite3"),
+        "TWEET_SCORE_MEMO_PATH": os.path.join(directory, "scores.sqlite3"),
+        "TWEET_RESULT_STORE_PATH": os.path.join(directory, "results.sqlite3"),
+        "TWEET_ARTIFACT_DIR": os.path.join(directory, "artifacts"),
+    }
+
+
+def _run_child(args: argparse.Namespace, child_args: list[str]) -> dict:
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        output = f.name
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", *child_args, output],
+        env=_child_env(args),
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    with open(output, encoding="utf-8") as f:
+        return json.load(f)
+
+
+async def _first_run(iterations: int) -> dict[str, float]:
+    """Time a run from the optimizer import to its first and last event."""
+    start = time.perf_counter()
+    from app.optimizer.engine import Optimizer
+    from app.optimizer.types import OptimizerConfig
+
+    optimizer = Optimizer(
+        OptimizerConfig(input_text=INPUT_TEXT, iterations=iterations, warm_start=False)
+    )
+    first_event = None
+    async for _ in optimizer.run():
+        if first_event is None:
+            first_event = time.perf_counter() - start
+    return {"first_event_s": first_event, "total_s": time.perf_counter() - start}
+
+
+def child(mode: str, iterations: int, output: str):
+    """Take one measurement in this (fresh) process and write it to ``output``."""
+    if mode in IMPORT_TARGETS.values():
+        start = time.perf_counter()
+        __import__(mode)
+        result = {"import_s": time.perf_counter() - start}
+    else:
+        result = {}
+        if mode == "warm":
+            from app.warmup import warm_up
+
+            result["warmup_s"] = warm_up()
+        result.update(asyncio.run(_first_run(iterations)))
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+def _median(samples: list[dict], key: str) -> float:
+    return round(statistics.median(s[key] for s in samples), 4)
+
+
+def run(args: argparse.Namespace) -> dict:
+    report = {"repeats": args.repeats, "latency_ms": args.latency_ms}
+    for key, module in IMPORT_TARGETS.items():
+        samples = [_run_child(args, ["--child", module]) for _ in range(args.repeats)]
+        report[key] = _median(samples, "import_s")
+    for mode in ("cold", "warm"):
+        samples = [
+            _run_child(args, ["--child", mode, "--iterations", str(args.iterations)])
+            for _ in range(args.repeats)
+        ]
+        report[f"first_run_{mode}"] = {key: _median(samples, key) for key in samples[0]}
+    return report
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--output", help="Write JSON results here instead of stdout.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("child_output", nargs="?", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.child:
+        child(args.child, args.iterations, args.child_output)
+        return
+    text = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+import os
+
+# Keep imports offline: litellm reads its bundled price map and the app's
+# predictors default to the deterministic MockLM.
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+os.environ.setdefault("TWEET_LM_BACKEND", "mock")
+
+# Keep the shared stores in memory so tests never touch the working tree.
+os.environ.setdefault("TWEET_CACHE_PATH", ":memory:")
+os.environ.setdefault("TWEET_SCORE_MEMO_PATH", ":memory:")
+os.environ.setdefault("TWEET_RESULT_STORE_PATH", ":memory:")
@@ -0,0 +1,78 @@
+import asyncio
+
+import dspy
+
+from app.dspy_modules import parse_batch_scores
+from app.optimizer.scoring import Scorer
+
+CATEGORIES = ["Clarity", "Engagement"]
+
+
+def scores(clarity: int, engagement: int) -> list[dict]:
+    return [
+        {"category": "Clarity", "score": clarity},
+        {"category": "Engagement", "score": engagement},
+    ]
+
+
+class ScriptedPredictor:
+    """Answers every call with the next scripted ``scores`` output."""
+
+    def __init__(self, *outputs):
+        self.outputs = list(outputs)
+        self.calls: list[dict] = []
+
+    async def acall(self, **inputs):
+        self.calls.append(inputs)
+        return dspy.Prediction(scores=self.outputs.pop(0))
+
+
+def test_batch_scores_keep_one_list_per_tweet():
+    assert parse_batch_scores([scores(7, 6), scores(5, 4)], 2) == [
+        scores(7, 6),
+        scores(5, 4),
+    ]
+
+
+def test_truncated_batch_pads_missing_tweets():
+    assert parse_batch_scores([scores(7, 6)], 3) == [scores(7, 6), [], []]
+
+
+def test_batch_with_too_many_lists_is_rejected():
+    assert parse_batch_scores([scores(7, 6), scores(5, 4)], 1) is None
+
+
+def test_batch_that_is_not_a_list_of_lists_is_rejected():
+    assert parse_batch_scores(scores(7, 6), 2) is None
+    assert parse_batch_scores([], 2) is None
+    assert parse_batch_scores("no scores here", 2) is None
+
+
+def test_population_is_scored_with_one_batch_call():
+    single = ScriptedPredictor()
+    batch = ScriptedPredictor([scores(7, 6), scores(5, 4)])
+    scorer = Scorer(single, batch, asyncio.Semaphore(4))
+    ranked = asyncio.run(scorer.score(["first", "second"], CATEGORIES))
+    assert [c["total"] for c in ranked] == [13, 9]
+    assert len(batch.calls) == 1
+    assert batch.calls[0]["tweets"] == ["first", "second"]
+    assert single.calls == []
+
+
+def test_unmatched_batch_falls_back_to_per_tweet_calls():
+    single = ScriptedPredictor(scores(7, 6), scores(5, 4))
+    batch = ScriptedPredictor([scores(1, 1), scores(1, 1), scores(1, 1)])
+    scorer = Scorer(single, batch, asyncio.Semaphore(4))
+    ranked = asyncio.run(scorer.score(["first", "second"], CATEGORIES))
+    assert sorted(c["total"] for c in ranked) == [9, 13]
+    assert len(batch.calls) == 1
+    assert sorted(call["tweet"] for call in single.calls) == ["first", "second"]
+
+
+def test_single_tweet_skips_the_batch_evaluator():
+    single = ScriptedPredictor(scores(7, 6))
+    batch = ScriptedPredictor()
+    scorer = Scorer(single, batch, asyncio.Semaphore(4))
+    [candidate] = asyncio.run(scorer.score(["only"], CATEGORIES))
+    assert candidate["total"] == 13
+    assert batch.calls == []
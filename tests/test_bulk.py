@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+import pytest
+
+from app.optimizer.bulk import BulkRunner, iter_inputs
+from app.optimizer.types import OptimizerConfig
+from app.scheduler import Priority, current_priority, get_scheduler
+
+TEXTS = [
+    "Our new release halves scoring latency.",
+    "Join the community call on Friday.",
+    "The docs now cover batch optimization.",
+]
+
+
+def make_runner(tmp_path, **kwargs) -> BulkRunner:
+    template = OptimizerConfig(
+        input_text="", iterations=1, warm_start=False, bypass_cache=True
+    )
+    return BulkRunner(
+        template, str(tmp_path / "out.jsonl"), max_concurrent_jobs=2, **kwargs
+    )
+
+
+def test_run_writes_one_result_per_input_and_resumes(tmp_path):
+    source = tmp_path / "inputs.txt"
+    source.write_text("\n".join(TEXTS) + "\n", encoding="utf-8")
+
+    stats = asyncio.run(make_runner(tmp_path).run(iter_inputs(str(source))))
+    assert stats["completed"] == len(TEXTS)
+    lines = (tmp_path / "out.jsonl").read_text(encoding="utf-8").splitlines()
+    assert sorted(json.loads(line)["input_text"] for line in lines) == sorted(TEXTS)
+
+    stats = asyncio.run(make_runner(tmp_path).run(iter_inputs(str(source))))
+    assert stats["completed"] == 0
+    assert stats["skipped"] == len(TEXTS)
+
+
+def test_run_restores_priority_and_limits(tmp_path):
+    scheduler = get_scheduler()
+    requests = scheduler.requests
+
+    async def run():
+        runner = make_runner(tmp_path, max_calls_per_minute=600)
+        await runner.run([("a", TEXTS[0])])
+        return current_priority.get()
+
+    assert asyncio.run(run()) != Priority.BULK
+    assert scheduler.requests is requests
+
+
+def test_failed_write_stops_the_run(tmp_path, monkeypatch):
+    def broken_write(out, checkpoint, record):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(BulkRunner, "_write", staticmethod(broken_write))
+    inputs = [(str(i), f"{TEXTS[0]} #{i}") for i in range(10)]
+
+    async def run():
+        await asyncio.wait_for(make_runner(tmp_path).run(inputs), timeout=30)
+
+    with pytest.raises(OSError):
+        asyncio.run(run())
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from app.dspy_modules import get_generator, get_mutator
+from app.optimizer.engine import Optimizer, optimize
+from app.optimizer.store import ResultStore
+from app.optimizer.types import OptimizerConfig
+from app.score_memo import ScoreMemo
+
+INPUT = "We shipped a faster tweet optimizer with batch scoring and caching."
+
+
+class FlakyPredictor:
+    """Wraps a predictor and raises on every other call."""
+
+    def __init__(self, predictor):
+        self.predictor = predictor
+        self.calls = 0
+
+    async def acall(self, **kwargs):
+        self.calls += 1
+        if self.calls % 2 == 0:
+            raise RuntimeError("provider error")
+        return await self.predictor.acall(**kwargs)
+
+
+def make_config(**overrides) -> OptimizerConfig:
+    settings = {
+        "input_text": INPUT,
+        "iterations": 3,
+        "patience": 3,
+        "population_size": 2,
+        "warm_start": False,
+    }
+    settings.update(overrides)
+    return OptimizerConfig(**settings)
+
+
+def stores() -> dict:
+    return {"memo": ScoreMemo(":memory:"), "store": ResultStore(":memory:")}
+
+
+async def collect(optimizer: Optimizer) -> list:
+    return [event async for event in optimizer.run()]
+
+
+def test_run_reports_progress_and_keeps_the_best():
+    config = make_config()
+    events = asyncio.run(collect(Optimizer(config, **stores())))
+
+    kinds = [event.kind for event in events]
+    assert kinds[0] == "initial"
+    assert kinds[-1] == "finished"
+    assert kinds.count("iteration") == config.iterations
+    initial = events[0].best["total"]
+    assert all(event.best["total"] >= initial for event in events[1:])
+
+
+def test_optimize_returns_the_final_best():
+    config = make_config(iterations=2)
+    result = asyncio.run(optimize(config, **stores()))
+
+    assert result.input_text == INPUT
+    assert result.iterations_run == 2
+    assert not result.stopped_early
+    assert result.best["tweet"]
+
+
+def test_failed_mutations_are_dropped_from_the_round(caplog):
+    generator = FlakyPredictor(get_generator())
+    mutator = FlakyPredictor(get_mutator())
+    config = make_config(population_size=4)
+    optimizer = Optimizer(config, generator=generator, mutator=mutator, **stores())
+
+    events = asyncio.run(collect(optimizer))
+
+    assert events[-1].kind == "finished"
+    assert "Mutation failed" in caplog.text
+
+
+def test_optimize_raises_when_the_run_yields_nothing(monkeypatch):
+    async def no_events(self):
+        return
+        yield
+
+    monkeypatch.setattr(Optimizer, "run", no_events)
+    with pytest.raises(RuntimeError):
+        asyncio.run(optimize(make_config(), **stores()))
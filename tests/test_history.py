@@ -0,0 +1,49 @@
+from app.history import HistoryRecord, HistoryRing, tweet_id
+
+
+def record(iteration: int, total: float, accepted: bool = False) -> HistoryRecord:
+    return HistoryRecord(iteration, tweet_id(f"tweet {iteration}"), total, accepted)
+
+
+def test_ring_keeps_the_most_recent_records_in_order():
+    ring = HistoryRing(capacity=3)
+    for i in range(5):
+        ring.append(record(i, float(i)))
+    assert len(ring) == 3
+    assert [r.iteration for r in ring] == [2, 3, 4]
+
+
+def test_clear_empties_the_ring():
+    ring = HistoryRing(capacity=2)
+    ring.append(record(0, 1.0))
+    ring.clear()
+    assert len(ring) == 0
+    assert ring.chart_points() == []
+    ring.append(record(1, 2.0))
+    assert [r.iteration for r in ring] == [1]
+
+
+def test_chart_best_only_moves_on_accepted_rounds():
+    ring = HistoryRing()
+    ring.append(record(0, 10.0, accepted=True))
+    ring.append(record(1, 12.0))
+    ring.append(record(2, 14.0, accepted=True))
+    assert ring.chart_points() == [
+        {"iteration": 0, "total": 10.0, "best": 10.0},
+        {"iteration": 1, "total": 12.0, "best": 10.0},
+        {"iteration": 2, "total": 14.0, "best": 14.0},
+    ]
+
+
+def test_chart_best_starts_from_the_oldest_record_kept():
+    ring = HistoryRing(capacity=2)
+    ring.append(record(0, 20.0, accepted=True))
+    ring.append(record(1, 11.0))
+    ring.append(record(2, 12.0))
+    assert [p["best"] for p in ring.chart_points()] == [11.0, 11.0]
+
+
+def test_tweet_ids_are_stable_32_bit_ints():
+    assert tweet_id("hello") == tweet_id("hello")
+    assert tweet_id("hello") != tweet_id("hello!")
+    assert 0 <= tweet_id("hello") < 2**32
@@ -0,0 +1,71 @@
+import time
+
+from app.optimizer.jobs import JobQueue
+from app.optimizer.types import OptimizerConfig, ProgressEvent
+
+CONFIG = OptimizerConfig(input_text="Reflex builds web apps in pure Python.")
+
+
+def test_claim_returns_oldest_job_once():
+    queue = JobQueue(":memory:")
+    first = queue.enqueue(CONFIG)
+    second = queue.enqueue(OptimizerConfig(input_text="Second."))
+    job_id, config = queue.claim("worker-a")
+    assert job_id == first
+    assert config == CONFIG
+    assert queue.claim("worker-b")[0] == second
+    assert queue.claim("worker-c") is None
+    assert queue.job(first)["status"] == "running"
+
+
+def test_finished_job_publishes_events_in_order():
+    queue = JobQueue(":memory:")
+    job_id = queue.enqueue(CONFIG)
+    queue.claim("worker-a")
+    queue.publish(job_id, ProgressEvent("initial"))
+    queue.publish(job_id, ProgressEvent("finished"))
+    queue.finish(job_id, "worker-a")
+    assert [event.kind for _, event in queue.events(job_id)] == ["initial", "finished"]
+    assert queue.job(job_id)["status"] == "finished"
+
+
+def test_expired_lease_is_claimed_by_another_worker():
+    queue = JobQueue(":memory:", lease_s=0.05)
+    job_id = queue.enqueue(CONFIG)
+    queue.claim("worker-a")
+    assert queue.claim("worker-b") is None
+    time.sleep(0.1)
+    assert queue.claim("worker-b")[0] == job_id
+    assert queue.job(job_id)["attempts"] == 2
+    assert not queue.heartbeat(job_id, "worker-a")
+    assert queue.heartbeat(job_id, "worker-b")
+
+
+def test_job_fails_after_max_attempts():
+    queue = JobQueue(":memory:", lease_s=0.05, max_attempts=1)
+    job_id = queue.enqueue(CONFIG)
+    queue.claim("worker-a")
+    time.sleep(0.1)
+    assert queue.claim("worker-b") is None
+    assert queue.job(job_id)["status"] == "failed"
+    assert queue.job(job_id)["error"] == "Worker lost"
+
+
+def test_cancelled_queued_job_is_never_claimed():
+    queue = JobQueue(":memory:")
+    job_id = queue.enqueue(CONFIG)
+    queue.cancel(job_id)
+    assert queue.job(job_id)["status"] == "cancelled"
+    assert queue.claim("worker-a") is None
+
+
+def test_cancelled_running_job_ends_cancelled():
+    queue = JobQueue(":memory:")
+    job_id = queue.enqueue(CONFIG)
+    queue.claim("worker-a")
+    assert not queue.cancel_requested(job_id)
+    queue.cancel(job_id)
+    assert queue.cancel_requested(job_id)
+    assert not queue.heartbeat(job_id, "worker-a")
+    queue.finish(job_id, "worker-a")
+    assert queue.job(job_id)["status"] == "cancelled"
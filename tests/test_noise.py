@@ -0,0 +1,55 @@
+import asyncio
+
+from app.optimizer.noise import NoiseModel
+
+CATEGORY = "Clarity"
+
+
+def candidate(tweet: str, total: float) -> dict:
+    return {
+        "tweet": tweet,
+        "scores": [{"category": CATEGORY, "score": total}],
+        "total": total,
+    }
+
+
+class SequenceScorer:
+    """Returns each tweet's next scripted total on every fresh sample."""
+
+    def __init__(self, totals: dict[str, list[float]]):
+        self.totals = {tweet: iter(values) for tweet, values in totals.items()}
+
+    async def sample(self, tweets, categories):
+        return [candidate(t, next(self.totals[t])) for t in tweets]
+
+
+def dominates(noise: NoiseModel, challenger: dict, incumbent: dict) -> bool:
+    return asyncio.run(noise.dominates(challenger, incumbent))
+
+
+def test_clear_winner_is_accepted_without_resampling():
+    noise = NoiseModel(SequenceScorer({}), [CATEGORY])
+    assert dominates(noise, candidate("new", 20), candidate("old", 10))
+    assert noise.resamples == 0
+
+
+def test_clear_loser_is_rejected_without_resampling():
+    noise = NoiseModel(SequenceScorer({}), [CATEGORY])
+    assert not dominates(noise, candidate("new", 5), candidate("old", 10))
+    assert noise.resamples == 0
+
+
+def test_close_call_is_resampled_then_rejected_when_it_regresses():
+    scorer = SequenceScorer({"new": [9, 11, 9], "old": [10, 10, 10]})
+    noise = NoiseModel(scorer, [CATEGORY], max_samples=4)
+    challenger = candidate("new", 11)
+    assert not dominates(noise, challenger, candidate("old", 10))
+    assert noise.resamples == 6
+    assert challenger["total"] == 10
+
+
+def test_close_call_is_accepted_once_samples_confirm_it():
+    scorer = SequenceScorer({"new": [11, 11, 11], "old": [10, 10, 10]})
+    noise = NoiseModel(scorer, [CATEGORY], max_samples=4)
+    assert dominates(noise, candidate("new", 11), candidate("old", 10))
+    assert 0 < noise.resamples <= 6
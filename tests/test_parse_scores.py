@@ -0,0 +1,50 @@
+from app.dspy_modules import CategoryScore, parse_scores
+
+
+def test_typed_scores_pass_through():
+    typed = [CategoryScore(category="Clarity", score=7)]
+    assert parse_scores(typed) == [{"category": "Clarity", "score": 7}]
+
+
+def test_fenced_json_is_unwrapped():
+    raw = '```json\n[{"category": "Clarity", "score": 7}]\n```'
+    assert parse_scores(raw) == [{"category": "Clarity", "score": 7}]
+
+
+def test_truncated_json_keeps_the_complete_entries():
+    raw = '[{"category": "Clarity", "score": 7}, {"category": "Engagement", "sco'
+    assert parse_scores(raw) == [{"category": "Clarity", "score": 7}]
+
+
+def test_out_of_range_scores_are_rounded_and_clamped():
+    raw = (
+        '[{"category": "Clarity", "score": 12}, {"category": "Tone", "score": 0},'
+        ' {"category": "Hook", "score": "6.6"}]'
+    )
+    assert parse_scores(raw) == [
+        {"category": "Clarity", "score": 9},
+        {"category": "Tone", "score": 1},
+        {"category": "Hook", "score": 7},
+    ]
+
+
+def test_entries_without_a_valid_score_are_dropped():
+    raw = (
+        '[{"category": "Clarity"}, {"category": "Tone", "score": "high"},'
+        ' {"category": "Hook", "score": true}, {"category": "Hashtags", "score": 5}]'
+    )
+    assert parse_scores(raw) == [{"category": "Hashtags", "score": 5}]
+
+
+def test_scores_section_is_cut_out_of_an_adapter_response():
+    raw = (
+        "[[ ## reasoning ## ]]\nShort and clear.\n\n"
+        '[[ ## scores ## ]]\n[{"category": "Clarity", "score": 8}]\n\n'
+        "[[ ## completed ## ]]"
+    )
+    assert parse_scores(raw) == [{"category": "Clarity", "score": 8}]
+
+
+def test_unparseable_output_yields_no_scores():
+    assert parse_scores("I cannot score this tweet.") == []
+    assert parse_scores("[[ ## reasoning ## ]]\nno scores given") == []
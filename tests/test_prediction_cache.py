@@ -0,0 +1,104 @@
+import asyncio
+
+import dspy
+
+from app.prediction_cache import CachedPredictor, PredictionCache
+
+
+class TweetSignature(dspy.Signature):
+    """Write a tweet."""
+
+    input_text: str = dspy.InputField()
+    tweet: str = dspy.OutputField()
+
+
+INPUTS = {"input_text": "Reflex builds web apps in pure Python."}
+
+
+def test_same_call_has_same_key():
+    assert PredictionCache.make_key(
+        TweetSignature, "model-a", INPUTS
+    ) == PredictionCache.make_key(TweetSignature, "model-a", dict(INPUTS))
+
+
+def test_model_change_invalidates_key():
+    assert PredictionCache.make_key(
+        TweetSignature, "model-a", INPUTS
+    ) != PredictionCache.make_key(TweetSignature, "model-b", INPUTS)
+
+
+def test_instruction_change_invalidates_key():
+    reworded = TweetSignature.with_instructions("Write a short, punchy tweet.")
+    assert PredictionCache.make_key(
+        TweetSignature, "model-a", INPUTS
+    ) != PredictionCache.make_key(reworded, "model-a", INPUTS)
+
+
+def test_program_version_change_invalidates_key():
+    assert PredictionCache.make_key(
+        TweetSignature, "model-a", INPUTS, "v1"
+    ) != PredictionCache.make_key(TweetSignature, "model-a", INPUTS, "v2")
+
+
+def test_input_change_invalidates_key():
+    assert PredictionCache.make_key(
+        TweetSignature, "model-a", INPUTS
+    ) != PredictionCache.make_key(TweetSignature, "model-a", {"input_text": "Other."})
+
+
+def test_cache_round_trip_and_hit_counts():
+    cache = PredictionCache(":memory:")
+    key = PredictionCache.make_key(TweetSignature, "model-a", INPUTS)
+    assert cache.get(key) is None
+    cache.put(key, {"tweet": "Build web apps in pure Python."})
+    assert cache.get(key) == {"tweet": "Build web apps in pure Python."}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_overflow_is_evicted_least_recently_used_first():
+    cache = PredictionCache(":memory:", max_entries=2, eviction_interval=1)
+    for key in ("a", "b"):
+        cache.put(key, {"tweet": key})
+    cache.get("a")
+    cache.put("c", {"tweet": "c"})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"tweet": "a"}
+    assert cache.get("c") == {"tweet": "c"}
+
+
+def test_eviction_waits_for_the_interval():
+    cache = PredictionCache(":memory:", max_entries=1, eviction_interval=3)
+    cache.put("a", {"tweet": "a"})
+    cache.put("b", {"tweet": "b"})
+    assert cache.get("a") is not None
+    cache.put("c", {"tweet": "c"})
+    assert [cache.get(key) is not None for key in ("a", "b", "c")] == [
+        False,
+        False,
+        True,
+    ]
+
+
+class CountingPredictor:
+    """Stands in for a DSPy predictor; answers with a numbered tweet."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def acall(self, **inputs):
+        self.calls += 1
+        return dspy.Prediction(tweet=f"tweet {self.calls}")
+
+
+def test_fresh_samples_are_not_stored():
+    cache = PredictionCache(":memory:")
+    predictor = CountingPredictor()
+    cached = CachedPredictor(predictor, TweetSignature, "model-a", cache)
+
+    async def main():
+        await cached.acall(bypass_cache=True, store=False, **INPUTS)
+        assert (await cached.acall(**INPUTS)).tweet == "tweet 2"
+        assert (await cached.acall(**INPUTS)).tweet == "tweet 2"
+
+    asyncio.run(main())
+    assert predictor.calls == 2
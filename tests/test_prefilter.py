@@ -0,0 +1,60 @@
+from app.optimizer.prefilter import MinHasher, PreFilter
+
+BASE = (
+    "Reflex lets you build full-stack web apps in pure Python, "
+    "no JavaScript required. Ship your next idea this weekend."
+)
+UNRELATED = "Three lessons from a year of running a small open-source project."
+
+
+def test_identical_signatures_are_fully_similar():
+    hasher = MinHasher()
+    assert MinHasher.similarity(hasher.signature(BASE), hasher.signature(BASE)) == 1
+
+
+def test_unrelated_tweets_are_dissimilar():
+    hasher = MinHasher()
+    similarity = MinHasher.similarity(
+        hasher.signature(BASE), hasher.signature(UNRELATED)
+    )
+    assert similarity < 0.2
+
+
+def test_near_duplicates_rejected_at_or_above_threshold():
+    edited = BASE + " Really."
+    hasher = MinHasher()
+    similarity = MinHasher.similarity(hasher.signature(BASE), hasher.signature(edited))
+    assert 0.5 < similarity < 1
+
+    strict = PreFilter(similarity_threshold=similarity)
+    strict.observe(BASE)
+    assert strict.reason(edited) == "near_duplicate"
+
+    loose = PreFilter(similarity_threshold=similarity + 0.01)
+    loose.observe(BASE)
+    assert loose.reason(edited) is None
+
+
+def test_default_threshold_keeps_one_word_swaps():
+    prefilter = PreFilter()
+    prefilter.observe(BASE)
+    assert prefilter.reason(BASE.replace("weekend", "month")) is None
+    assert prefilter.reason(UNRELATED) is None
+
+
+def test_default_threshold_rejects_one_word_appends():
+    prefilter = PreFilter()
+    prefilter.observe(BASE)
+    assert prefilter.reason(BASE + " Really.") == "near_duplicate"
+
+
+def test_filter_rejects_duplicates_within_a_batch_and_counts_them():
+    prefilter = PreFilter()
+    tweets = [BASE, "  " + BASE.upper(), "#a #b #c #d #e #f", "x" * 281, UNRELATED]
+    assert prefilter.filter(tweets) == [BASE, UNRELATED]
+    assert prefilter.evaluations_saved == 3
+    assert prefilter.rejections == {
+        "duplicate": 1,
+        "too_many_hashtags": 1,
+        "too_long": 1,
+    }
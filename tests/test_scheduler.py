@@ -0,0 +1,96 @@
+import asyncio
+
+import litellm
+import pytest
+
+from app.scheduler import LMScheduler, Priority, TokenBucket
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate_per_minute=60)
+    assert bucket.time_until(1) == 0
+    bucket.take(60)
+    assert bucket.time_until(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_token_bucket_without_rate_never_waits():
+    bucket = TokenBucket(rate_per_minute=None)
+    bucket.take(1_000)
+    assert bucket.time_until(1_000) == 0
+
+
+def test_interactive_requests_are_admitted_before_bulk():
+    scheduler = LMScheduler(requests_per_minute=600)
+    order = []
+
+    def call(name):
+        async def request():
+            order.append(name)
+
+        return request
+
+    async def main():
+        scheduler.requests.take(600)
+        bulk = asyncio.create_task(scheduler.run(call("bulk"), priority=Priority.BULK))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(
+            scheduler.run(call("interactive"), priority=Priority.INTERACTIVE)
+        )
+        await asyncio.gather(bulk, interactive)
+
+    asyncio.run(main())
+    assert order == ["interactive", "bulk"]
+
+
+def test_transient_errors_are_retried():
+    scheduler = LMScheduler(base_backoff=0)
+    attempts = []
+    retries = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise litellm.ServiceUnavailableError(
+                "overloaded", llm_provider="test", model="test"
+            )
+        return "ok"
+
+    result = asyncio.run(scheduler.run(flaky, on_retry=lambda: retries.append(1)))
+    assert result == "ok"
+    assert len(attempts) == 3
+    assert scheduler.retries == len(retries) == 2
+
+
+def test_other_errors_are_not_retried():
+    scheduler = LMScheduler(base_backoff=0)
+    attempts = []
+
+    async def broken():
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.run(broken))
+    assert len(attempts) == 1
+    assert scheduler.retries == 0
+
+
+def test_retries_stop_after_max_retries():
+    scheduler = LMScheduler(base_backoff=0, max_retries=2)
+
+    async def down():
+        raise litellm.ServiceUnavailableError("down", llm_provider="test", model="test")
+
+    with pytest.raises(litellm.ServiceUnavailableError):
+        asyncio.run(scheduler.run(down))
+    assert scheduler.retries == 2
+
+
+def test_call_past_its_deadline_times_out():
+    scheduler = LMScheduler(base_backoff=0, call_deadline=0)
+
+    async def request():
+        return "ok"
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(scheduler.run(request))
@@ -0,0 +1,54 @@
+from app.score_memo import ScoreMemo
+
+TWEET = "Build web apps in pure Python with Reflex."
+
+
+def test_hit_matches_categories_case_insensitively():
+    memo = ScoreMemo(":memory:")
+    memo.put_many("model-a", TWEET, {"Clarity and conciseness": 7})
+    assert memo.get_many("model-a", TWEET, ["clarity  and Conciseness"]) == {
+        "clarity  and Conciseness": 7
+    }
+
+
+def test_only_known_categories_hit():
+    memo = ScoreMemo(":memory:")
+    memo.put_many("model-a", TWEET, {"Clarity": 7})
+    assert memo.get_many("model-a", TWEET, ["Clarity", "Engagement"]) == {"Clarity": 7}
+    assert memo.get_many("model-a", "Another tweet.", ["Clarity"]) == {}
+
+
+def test_namespaces_do_not_share_scores():
+    memo = ScoreMemo(":memory:")
+    memo.put_many("model-a", TWEET, {"Clarity": 7})
+    memo.put_many("model-a#fast", TWEET, {"Clarity": 4})
+    assert memo.get_many("model-a", TWEET, ["Clarity"]) == {"Clarity": 7}
+    assert memo.get_many("model-a#fast", TWEET, ["Clarity"]) == {"Clarity": 4}
+    assert memo.get_many("model-b", TWEET, ["Clarity"]) == {}
+
+
+def test_expired_scores_miss():
+    memo = ScoreMemo(":memory:", ttl_seconds=-1)
+    memo.put_many("model-a", TWEET, {"Clarity": 7})
+    assert memo.get_many("model-a", TWEET, ["Clarity"]) == {}
+
+
+def test_least_recently_used_scores_are_evicted():
+    memo = ScoreMemo(":memory:", max_entries=2, eviction_interval=1)
+    memo.put_many("model-a", "first", {"Clarity": 1})
+    memo.put_many("model-a", "second", {"Clarity": 2})
+    memo.get_many("model-a", "first", ["Clarity"])
+    memo.put_many("model-a", "third", {"Clarity": 3})
+    assert memo.get_many("model-a", "first", ["Clarity"]) == {"Clarity": 1}
+    assert memo.get_many("model-a", "second", ["Clarity"]) == {}
+    assert memo.get_many("model-a", "third", ["Clarity"]) == {"Clarity": 3}
+
+
+def test_eviction_waits_for_the_interval():
+    memo = ScoreMemo(":memory:", max_entries=1, eviction_interval=3)
+    memo.put_many("model-a", "first", {"Clarity": 1})
+    memo.put_many("model-a", "second", {"Clarity": 2})
+    assert memo.get_many("model-a", "first", ["Clarity"]) == {"Clarity": 1}
+    memo.put_many("model-a", "third", {"Clarity": 3})
+    assert memo.get_many("model-a", "second", ["Clarity"]) == {}
+    assert memo.get_many("model-a", "third", ["Clarity"]) == {"Clarity": 3}
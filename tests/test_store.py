@@ -0,0 +1,49 @@
+from app.optimizer.store import ResultStore
+
+INPUT = "Reflex 0.8 ships faster hot reload and a new component library for dashboards."
+CATEGORIES = ["Clarity", "Engagement"]
+
+
+def candidate(tweet: str, total: float) -> dict:
+    return {"tweet": tweet, "scores": [], "total": total}
+
+
+def test_empty_runs_are_not_recorded():
+    store = ResultStore(":memory:")
+    assert store.record_run(INPUT, CATEGORIES, "model-a", []) is None
+    assert store.similar_runs(INPUT, CATEGORIES) == []
+
+
+def test_exact_input_matches_ignore_case_whitespace_and_category_order():
+    store = ResultStore(":memory:")
+    run_id = store.record_run(INPUT, CATEGORIES, "model-a", [candidate("t", 10)])
+
+    matches = store.similar_runs(
+        "  " + INPUT.upper().replace(" ", "  "), list(reversed(CATEGORIES))
+    )
+    assert matches == [(run_id, 1.0)]
+
+
+def test_near_identical_inputs_match_and_unrelated_ones_do_not():
+    store = ResultStore(":memory:")
+    run_id = store.record_run(INPUT, CATEGORIES, "model-a", [candidate("t", 10)])
+
+    [(match, similarity)] = store.similar_runs(INPUT + " Try it.", CATEGORIES)
+    assert match == run_id
+    assert 0.8 <= similarity < 1.0
+    assert store.similar_runs("A recipe for sourdough bread.", CATEGORIES) == []
+    assert store.similar_runs(INPUT, ["Clarity"]) == []
+
+
+def test_best_tweets_are_distinct_and_best_first_across_runs():
+    store = ResultStore(":memory:")
+    store.record_run(
+        INPUT, CATEGORIES, "model-a", [candidate("a", 10), candidate("b", 14)]
+    )
+    store.record_run(
+        INPUT, CATEGORIES, "model-a", [candidate("a", 16), candidate("c", 12)]
+    )
+
+    assert store.best_tweets(INPUT, CATEGORIES) == ["a", "b", "c"]
+    assert store.best_tweets(INPUT, CATEGORIES, limit=1) == ["a"]
+    assert store.best_tweets("Something else entirely.", CATEGORIES) == []
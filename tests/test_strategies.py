@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from app.optimizer.strategies import (
+    MUTATION_PROMPTS,
+    BeamSearch,
+    SearchStrategy,
+    SimulatedAnnealing,
+    SuccessiveHalving,
+    UCBBandit,
+    make_strategy,
+)
+
+CATEGORIES = ["Clarity", "Engagement", "Hashtags", "Tone"]
+
+
+def candidate(tweet: str, total: float) -> dict:
+    return {"tweet": tweet, "scores": [], "total": total}
+
+
+class RecordingScorer:
+    """Scores a tweet by its length; records each (tweets, categories) call."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def score(self, tweets, categories):
+        self.calls.append((list(tweets), list(categories)))
+        return [candidate(t, len(t) * len(categories)) for t in tweets]
+
+
+def test_search_strategy_is_abstract():
+    with pytest.raises(TypeError):
+        SearchStrategy()
+
+
+def test_beam_keeps_the_top_width_candidates():
+    beam = BeamSearch(width=2)
+    beam.reset(candidate("start", 10))
+    parents = [p.parent["tweet"] for p in beam.propose(3)]
+    assert parents == ["start", "start", "start"]
+
+    beam.observe([candidate("a", 12), candidate("b", 8), candidate("c", 11)])
+    assert [c["tweet"] for c in beam.beam] == ["a", "c"]
+    assert beam.best["tweet"] == "a"
+    assert [p.parent["tweet"] for p in beam.propose(3)] == ["a", "c", "a"]
+
+
+def test_annealing_keeps_the_best_even_after_moving_down():
+    annealing = SimulatedAnnealing(initial_temperature=1e9, seed=0)
+    annealing.reset(candidate("start", 10))
+    annealing.observe([candidate("worse", 5)])
+    assert annealing.current["tweet"] == "worse"
+    assert annealing.best["tweet"] == "start"
+
+
+def test_halving_scores_rungs_on_category_prefixes_and_keeps_survivors():
+    halving = SuccessiveHalving(eta=2)
+    scorer = RecordingScorer()
+    tweets = ["a", "bbbb", "cc", "ddd"]
+
+    population = asyncio.run(halving.evaluate(tweets, scorer, CATEGORIES))
+
+    assert [call[1] for call in scorer.calls] == [
+        CATEGORIES[:1],
+        CATEGORIES[:2],
+        CATEGORIES,
+    ]
+    assert scorer.calls[1][0] == ["bbbb", "ddd"]
+    assert [c["tweet"] for c in population] == ["bbbb"]
+
+
+def test_halving_scores_a_single_tweet_once():
+    scorer = RecordingScorer()
+    asyncio.run(SuccessiveHalving().evaluate(["only"], scorer, CATEGORIES))
+    assert scorer.calls == [(["only"], CATEGORIES)]
+
+
+def test_bandit_spreads_a_round_over_untried_prompts_and_learns():
+    bandit = UCBBandit()
+    bandit.reset(candidate("start", 10))
+    proposals = bandit.propose(len(MUTATION_PROMPTS))
+    assert {p.instruction for p in proposals} == set(MUTATION_PROMPTS)
+
+    winner = proposals[0]
+    winner.child = candidate("better", 12)
+    bandit.feedback(proposals)
+    assert bandit.rewards[winner.instruction] == 1.0
+    assert all(pulls == 1 for pulls in bandit.pulls.values())
+    assert bandit.propose(1)[0].instruction == winner.instruction
+
+
+def test_make_strategy_passes_beam_width_and_rejects_unknown_names():
+    assert make_strategy("halving", beam_width=3).width == 3
+    assert isinstance(make_strategy("annealing"), SimulatedAnnealing)
+    with pytest.raises(ValueError):
+        make_strategy("random")
@@ -0,0 +1,72 @@
+import asyncio
+
+from dspy.utils.exceptions import AdapterParseError
+
+from app.dspy_modules import TweetVariantsSignature, parse_variants
+from app.optimizer.engine import Optimizer
+from app.optimizer.store import ResultStore
+from app.optimizer.types import OptimizerConfig
+from app.score_memo import ScoreMemo
+
+PARENT = "Reflex lets you build web apps in pure Python."
+
+
+def test_typed_variants_keep_their_order():
+    assert parse_variants(["One.", "Two."], PARENT, 2) == ["One.", "Two."]
+
+
+def test_blank_and_repeated_variants_become_none():
+    raw = ["", "  " + PARENT.upper(), "New take.", "new  TAKE.", "Another."]
+    assert parse_variants(raw, PARENT, 5) == [None, None, "New take.", None, "Another."]
+
+
+def test_missing_variants_are_padded_and_extra_ones_dropped():
+    assert parse_variants(["Only one."], PARENT, 3) == ["Only one.", None, None]
+    assert parse_variants(["A.", "B.", "C."], PARENT, 2) == ["A.", "B."]
+
+
+def test_truncated_json_text_keeps_the_complete_variants():
+    assert parse_variants('["First.", "Second.", "Thi', PARENT, 3) == [
+        "First.",
+        "Second.",
+        "Thi",
+    ]
+
+
+def test_tweets_section_is_cut_out_of_an_adapter_response():
+    raw = (
+        "[[ ## reasoning ## ]]\nTwo angles.\n\n"
+        '[[ ## tweets ## ]]\n["First.", "Second."]\n\n[[ ## completed ## ]]'
+    )
+    assert parse_variants(raw, PARENT, 2) == ["First.", "Second."]
+    assert parse_variants("[[ ## reasoning ## ]]\nnone", PARENT, 2) == [None, None]
+
+
+def test_unparseable_output_yields_no_variants():
+    assert parse_variants("Sorry, I can't.", PARENT, 2) == [None, None]
+    assert parse_variants(None, PARENT, 1) == [None]
+
+
+class MalformedVariantGenerator:
+    """Fails to parse like a ChatAdapter without the JSON fallback."""
+
+    async def acall(self, **kwargs):
+        raise AdapterParseError(
+            "ChatAdapter",
+            TweetVariantsSignature,
+            '[[ ## tweets ## ]]\n["Python-only web apps.", "Ship a web app',
+        )
+
+
+def test_malformed_variant_output_is_salvaged_not_raised():
+    optimizer = Optimizer(
+        OptimizerConfig(input_text=PARENT, warm_start=False),
+        variant_generator=MalformedVariantGenerator(),
+        memo=ScoreMemo(":memory:"),
+        store=ResultStore(":memory:"),
+    )
+
+    variants = asyncio.run(optimizer._generate_variants(PARENT, [None, None, None]))
+
+    assert variants == ["Python-only web apps.", "Ship a web app", None]
+    assert optimizer.variants_dropped == 1